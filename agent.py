@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Coroutine, Dict
 from enum import Enum
+import threading
+import time
 import uuid
 import models
 
@@ -24,6 +26,7 @@ from python.helpers.dirty_json import DirtyJson
 from python.helpers.defer import DeferredTask
 from typing import Callable
 from python.helpers.localization import Localization
+from python.helpers.chat_index import ChatIndexEntry
 from python.helpers.extension import call_extensions
 
 class AgentContextType(Enum):
@@ -35,6 +38,10 @@ class AgentContextType(Enum):
 class AgentContext:
 
     _contexts: dict[str, "AgentContext"] = {}
+    _unloaded: dict[str, "ChatIndexEntry"] = {}  # saved chats loaded on first access by get()
+    _loading: dict[str, threading.Event] = {}  # saved chats get() is loading, set once done
+    _hydrating = threading.local()  # id of the chat this thread loads, get() publishes it
+    _lock = threading.RLock()
     _counter: int = 0
     _notification_manager = None
 
@@ -66,25 +73,114 @@ class AgentContext:
         self.no = AgentContext._counter
         # set to start of unix epoch
         self.last_message = last_message or datetime.now(timezone.utc)
+        self.last_access = time.monotonic()
 
-        existing = self._contexts.get(self.id, None)
-        if existing:
-            AgentContext.remove(self.id)
-        self._contexts[self.id] = self
+        if getattr(AgentContext._hydrating, "id", None) == self.id:
+            return  # get() publishes it once loaded
+        with AgentContext._lock:
+            existing = self._contexts.get(self.id, None)
+            if existing:
+                AgentContext.remove(self.id)
+            AgentContext._unloaded.pop(self.id, None)
+            self._contexts[self.id] = self
 
     @staticmethod
     def get(id: str):
-        return AgentContext._contexts.get(id, None)
+        while True:
+            with AgentContext._lock:
+                context = AgentContext._contexts.get(id, None)
+                entry = AgentContext._unloaded.get(id, None)
+                if context or entry is None:
+                    if context:
+                        context.last_access = time.monotonic()
+                    return context
+                loading = AgentContext._loading.get(id, None)
+                if loading is None:
+                    loading = AgentContext._loading[id] = threading.Event()
+                    break
+            loading.wait()  # another thread loads the chat, look again once it is done
+
+        # read outside the lock, a cold chat must not stall other threads
+        try:
+            context = AgentContext._hydrate(entry)
+            with AgentContext._lock:
+                if AgentContext._unloaded.get(id, None) is not entry:
+                    # removed or replaced while loading
+                    context = AgentContext._contexts.get(id, None)
+                else:
+                    del AgentContext._unloaded[id]
+                    if context:
+                        context.no = entry.no
+                        AgentContext._contexts[id] = context
+                if context:
+                    context.last_access = time.monotonic()
+                return context
+        finally:
+            with AgentContext._lock:
+                del AgentContext._loading[id]
+            loading.set()
 
     @staticmethod
     def first():
-        if not AgentContext._contexts:
-            return None
-        return list(AgentContext._contexts.values())[0]
+        with AgentContext._lock:
+            if AgentContext._contexts:
+                return next(iter(AgentContext._contexts.values()))
+            if not AgentContext._unloaded:
+                return None
+            id = next(iter(AgentContext._unloaded))
+        return AgentContext.get(id)
 
     @staticmethod
     def all():
-        return list(AgentContext._contexts.values())
+        """Loaded contexts, see unloaded() for the saved chats not loaded yet."""
+        with AgentContext._lock:
+            return list(AgentContext._contexts.values())
+
+    @staticmethod
+    def unloaded() -> list["ChatIndexEntry"]:
+        with AgentContext._lock:
+            return list(AgentContext._unloaded.values())
+
+    @staticmethod
+    def add_unloaded(entry: "ChatIndexEntry"):
+        """Register a saved chat to be loaded on first access, replacing a loaded one."""
+        with AgentContext._lock:
+            AgentContext.remove(entry.id)
+            AgentContext._counter += 1
+            entry.no = AgentContext._counter
+            AgentContext._unloaded[entry.id] = entry
+
+    @staticmethod
+    def unload(context: "AgentContext", entry: "ChatIndexEntry", idle_seconds: float) -> bool:
+        """Drop a saved idle context from memory, it is loaded again on next access.
+
+        Nothing happens if the context was accessed within idle_seconds or is busy.
+        """
+        with AgentContext._lock:
+            if (
+                AgentContext._contexts.get(context.id) is not context
+                or time.monotonic() - context.last_access < idle_seconds
+                or context.paused
+                or (context.task and context.task.is_alive())
+            ):
+                return False
+            del AgentContext._contexts[context.id]
+            entry.no = context.no
+            AgentContext._unloaded[context.id] = entry
+            return True
+
+    @staticmethod
+    def _hydrate(entry: "ChatIndexEntry"):
+        from python.helpers import persist_chat
+
+        AgentContext._hydrating.id = entry.id
+        try:
+            return persist_chat.load_chat(entry.id)
+        except Exception as e:
+            PrintStyle.error(f"Error loading chat {entry.id}: {errors.format_error(e)}")
+            return None
+        finally:
+            AgentContext._hydrating.id = None
 
     @classmethod
     def get_notification_manager(cls):
@@ -95,7 +191,9 @@ class AgentContext:
 
     @staticmethod
     def remove(id: str):
-        context = AgentContext._contexts.pop(id, None)
+        with AgentContext._lock:
+            AgentContext._unloaded.pop(id, None)
+            context = AgentContext._contexts.pop(id, None)
         if context and context.task:
             context.task.kill()
         return context
@@ -341,7 +439,7 @@ class Agent:
                             if chunk == full:
                                 printer.print("Response: ")  # start of response
                             printer.stream(chunk)
-                            await self.handle_response_stream(full)
+                            await self.handle_response_stream(full, chunk)
 
                         # call main LLM
                         agent_response, _reasoning = await self.call_chat_model(
@@ -750,11 +848,18 @@ class Agent:
             text=stream,
         )
 
-    async def handle_response_stream(self, stream: str):
+    async def handle_response_stream(self, stream: str, chunk: str | None = None):
         try:
+            # one incremental parser per streamed response, fed only the new chunk
+            parser = self.loop_data.params_temporary.get("response_parser")
+            if parser is None or chunk is None or chunk == stream:
+                parser = DirtyJson()
+                self.loop_data.params_temporary["response_parser"] = parser
+                response = parser.feed(stream)
+            else:
+                response = parser.feed(chunk)
             if len(stream) < 25:
                 return  # no reason to try
-            response = DirtyJson.parse_string(stream)
             if isinstance(response, dict):
                 await self.call_extensions(
                     "response_stream",
@@ -770,28 +875,10 @@ class Agent:
         self, name: str, method: str | None, args: dict, message: str, loop_data: LoopData | None, **kwargs
     ):
         from python.tools.unknown import Unknown
-        from python.helpers.tool import Tool
-
-        classes = []
-
-        # try agent tools first
-        if self.config.profile:
-            try:
-                classes = extract_tools.load_classes_from_file(
-                    "agents/" + self.config.profile + "/tools/" + name + ".py", Tool
-                )
-            except Exception as e:
-                pass
+        from python.helpers.tool import get_tool_class
 
-        # try default tools
-        if not classes:
-            try:
-                classes = extract_tools.load_classes_from_file(
-                    "python/tools/" + name + ".py", Tool
-                )
-            except Exception as e:
-                pass
-        tool_class = classes[0] if classes else Unknown
+        # resolved classes are cached per profile and tool name, see python/helpers/tool.py
+        tool_class = get_tool_class(self.config.profile, name) or Unknown
         return tool_class(
             agent=self, name=name, method=method, args=args, message=message, loop_data=loop_data, **kwargs
         )
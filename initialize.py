@@ -134,6 +134,12 @@ def initialize_job_loop():
     from python.helpers.job_loop import run_loop
     return defer.DeferredTask("JobLoop").start_task(run_loop)
 
+def initialize_prompt_watcher():
+    # opt-in with --prompt_watch=true, drops compiled prompt templates as soon as their files change
+    if str(runtime.get_arg("prompt_watch") or "").lower().strip() == "true":
+        from python.helpers import files
+        files.watch_prompt_templates()
+
 def initialize_preload():
     import preload
     return defer.DeferredTask().start_task(preload.preload)
@@ -14,11 +14,12 @@ from typing import (
     TypedDict,
 )
 
-from litellm import completion, acompletion, embedding
+from litellm import completion, acompletion, embedding, aembedding
 import litellm
 
 from python.helpers import dotenv
 from python.helpers.dotenv import load_dotenv
+from python.helpers.embedding_service import get_worker
 from python.helpers.providers import get_provider_config
 from python.helpers.rate_limiter import RateLimiter
 from python.helpers.tokens import approximate_tokens
@@ -422,6 +423,18 @@ class LiteLLMEmbeddingWrapper(Embeddings):
         item = resp.data[0]  # type: ignore
         return item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
 
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await apply_rate_limiter(self.a0_model_conf, " ".join(texts))
+
+        resp = await aembedding(model=self.model_name, input=texts, **self.kwargs)
+        return [
+            item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
+            for item in resp.data  # type: ignore
+        ]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
 
 class LocalSentenceTransformerWrapper(Embeddings):
     """Local wrapper for sentence-transformers models to avoid HuggingFace API calls"""
@@ -434,26 +447,41 @@ class LocalSentenceTransformerWrapper(Embeddings):
         if model.startswith("sentence-transformers/"):
             model = model[len("sentence-transformers/") :]
 
-        self.model = SentenceTransformer(model, **kwargs)
         self.model_name = model
         self.a0_model_conf = model_config
+        # the model is loaded once per process and runs in its own thread, requests of all
+        # wrappers of the same model are encoded in one batch
+        self.worker = get_worker(f"{provider}/{model}", lambda: _sentence_transformer_encoder(model, **kwargs))
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, " ".join(texts))
         
-        embeddings = self.model.encode(texts, convert_to_tensor=False)  # type: ignore
-        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+        return self.worker.embed(texts)
 
     def embed_query(self, text: str) -> List[float]:
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, text)
         
-        embedding = self.model.encode([text], convert_to_tensor=False)  # type: ignore
-        result = (
-            embedding[0].tolist() if hasattr(embedding[0], "tolist") else embedding[0]
-        )
-        return result  # type: ignore
+        return self.worker.embed([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await apply_rate_limiter(self.a0_model_conf, " ".join(texts))
+        return await self.worker.aembed(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await apply_rate_limiter(self.a0_model_conf, text)
+        return (await self.worker.aembed([text]))[0]
+
+
+def _sentence_transformer_encoder(model: str, **kwargs: Any) -> Callable[[List[str]], List[List[float]]]:
+    transformer = SentenceTransformer(model, **kwargs)
+
+    def encode(texts: List[str]) -> List[List[float]]:
+        embeddings = transformer.encode(texts, convert_to_tensor=False)  # type: ignore
+        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+
+    return encode
 
 
 def _get_litellm_chat(
@@ -41,7 +41,8 @@ class Poll(ApiHandler):
         tasks = []
         processed_contexts = set()  # Track processed context IDs
 
-        all_ctxs = list(AgentContext._contexts.values())
+        # saved chats not loaded yet are listed from the chat index
+        all_ctxs = AgentContext.all() + AgentContext.unloaded()
         # First, identify all tasks
         for ctx in all_ctxs:
             # Skip if already processed
@@ -8,9 +8,14 @@ from urllib.parse import urljoin
 import httpx
 from httpx_sse import aconnect_sse
 
+from python.helpers import a2a_http
 from python.helpers.print_style import PrintStyle
 from python.helpers.a2a_handler import A2AError, A2AErrorType, TaskState
 
+POLL_MIN_INTERVAL = 0.25  # first wait between status polls, grows by POLL_BACKOFF
+POLL_MAX_INTERVAL = 5.0
+POLL_BACKOFF = 1.5
+
 
 class A2AClient:
     """
@@ -50,17 +55,16 @@ class A2AClient:
         await self._close_client()
     
     async def _ensure_client(self):
-        """Ensure HTTP client is initialized"""
+        """Ensure HTTP client is initialized, connections are pooled per process and kept alive"""
         if self._client is None:
             headers = self._get_auth_headers()
-            self._client = httpx.AsyncClient(
+            self._client = a2a_http.client(
                 timeout=httpx.Timeout(self.timeout),
-                headers=headers,
-                verify=True  # Always verify SSL certificates
+                headers=headers
             )
     
     async def _close_client(self):
-        """Close HTTP client"""
+        """Close HTTP client, its pooled connections stay open for other clients"""
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -469,8 +473,9 @@ class A2AClient:
         task_id: str, 
         timeout: int
     ) -> Dict[str, Any]:
-        """Poll for task completion (fallback method)"""
+        """Poll for task completion (fallback method), quickly at first and backing off"""
         start_time = datetime.now()
+        interval = POLL_MIN_INTERVAL
         
         while (datetime.now() - start_time).seconds < timeout:
             status = await self.get_task_status(peer_url, task_id)
@@ -490,7 +495,8 @@ class A2AClient:
                 )
             
             # Wait before next poll
-            await asyncio.sleep(2.0)
+            await asyncio.sleep(interval)
+            interval = min(interval * POLL_BACKOFF, POLL_MAX_INTERVAL)
         
         raise A2AError(
             A2AErrorType.INVALID_AGENT_RESPONSE,
@@ -580,35 +586,3 @@ class A2AClient:
             return agent_card.get("capabilities", [])
         except Exception:
             return []
-    
-    def __del__(self):
-        """Cleanup on deletion with proper async handling"""
-        if self._client:
-            # Properly schedule cleanup in the event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # Schedule cleanup as a task if loop is running
-                    loop.create_task(self._close_client())
-                else:
-                    # Run cleanup directly if no loop is running
-                    loop.run_until_complete(self._close_client())
-            except RuntimeError:
-                # No event loop available, create a new one for cleanup
-                try:
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    new_loop.run_until_complete(self._close_client())
-                    new_loop.close()
-                except Exception:
-                    # Last resort: force close without async
-                    if hasattr(self._client, '_transport'):
-                        try:
-                            self._client._transport.close()
-                        except Exception:
-                            pass
-            except Exception:
-                # Graceful degradation - log but don't fail
-                PrintStyle(font_color="yellow").print(
-                    "Warning: Failed to properly cleanup A2A client connection"
-                )
\ No newline at end of file
@@ -1,8 +1,11 @@
 import asyncio
 import json
+import sqlite3
 import threading
+import time
 import uuid
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
@@ -13,7 +16,13 @@ import httpx
 from pydantic import BaseModel, Field, PrivateAttr
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import errors, settings
+from python.helpers import dotenv, errors, settings
+from python.helpers.a2a_task_store import A2ATaskStore
+
+EVENT_QUEUE_SIZE = 256  # task events buffered per subscriber, the oldest progress event is dropped beyond this
+MAX_FINISHED_IN_MEMORY = 256  # finished tasks kept in memory, older ones are read from the task store
+TASK_TTL_HOURS = 24  # finished tasks and unfinished ones without changes are deleted after this, A2A_TASK_TTL_HOURS overrides
+EXPIRE_INTERVAL = 60.0  # seconds between expiry runs triggered by new tasks
 
 
 class TaskState(Enum):
@@ -39,8 +48,9 @@ class A2AErrorType(Enum):
 class TaskArtifact:
     """Represents a task result artifact"""
     type: str
-    content: Union[str, dict]
+    content: Union[str, dict, None]
     metadata: Optional[Dict[str, Any]] = None
+    content_file: Optional[str] = None  # content written to a file by the task store, content is None then
 
 
 @dataclass
@@ -120,7 +130,11 @@ class A2AHandler:
     _lock: ClassVar[threading.Lock] = threading.Lock()
     
     def __init__(self):
+        # Unfinished tasks and the MAX_FINISHED_IN_MEMORY latest finished ones, all of them
+        # are also in the task store once the handler is initialized
         self.tasks: Dict[str, A2ATask] = {}
+        self.store: Optional[A2ATaskStore] = None
+        self.task_ttl_hours: float = TASK_TTL_HOURS
         self.peers: Dict[str, PeerInfo] = {}
         self.agent_card: Optional[AgentCard] = None
         self.server_config: Dict[str, Any] = {}
@@ -131,6 +145,12 @@ class A2AHandler:
         self.role: str = "unknown"
         self._task_lock = threading.Lock()
         self._peer_lock = threading.Lock()
+        self._finished: OrderedDict[str, None] = OrderedDict()  # finished tasks in memory, by completion
+        self._next_expiry = 0.0
+        
+        # Task event subscribers per event loop, replaced on change so publishers need no copy
+        self._subscribers: Dict[asyncio.AbstractEventLoop, tuple] = {}
+        self._subscriber_lock = threading.Lock()
         
     @classmethod
     def get_instance(cls) -> 'A2AHandler':
@@ -169,10 +189,54 @@ class A2AHandler:
             metadata=config.get('metadata', {})
         )
         
+        self.task_ttl_hours = float(dotenv.get_dotenv_value("A2A_TASK_TTL_HOURS", TASK_TTL_HOURS))
+        self._open_store(f"{self.agent_id}-{self.role}")
+        
         PrintStyle(font_color="green").print(
             f"A2A Handler initialized with agent: {self.agent_card.name}"
         )
     
+    def _open_store(self, name: str):
+        """Open the task store of this agent and load the tasks it left unfinished.
+        
+        Agent ids are reused, so the store may hold tasks of an earlier agent with the same id
+        and role. Its submitted and working tasks were interrupted with no one waiting for them,
+        they are failed instead of executed again.
+        """
+        with self._task_lock:
+            if self.store and self.store.name == name:
+                return
+            try:
+                store = A2ATaskStore(name)
+                unfinished = store.load_in_states(
+                    [state.value for state in TaskState if state not in (TaskState.COMPLETED, TaskState.FAILED)]
+                )
+            except (OSError, sqlite3.Error) as e:
+                PrintStyle.error(f"A2A task store unavailable, tasks are kept in memory only: {e}")
+                return
+            if self.store:
+                self.store.close()
+            self.store = store
+            
+            interrupted = 0
+            for data in unfinished:
+                task = _task_from_dict(data)
+                if task.task_id in self.tasks:
+                    continue
+                self.tasks[task.task_id] = task
+                if task.state in (TaskState.SUBMITTED, TaskState.WORKING):
+                    task.update_state(TaskState.FAILED, "Task interrupted by restart")
+                    self._finished[task.task_id] = None
+                    interrupted += 1
+            for task in self.tasks.values():
+                self._save(task)
+            self._trim_finished()
+        
+        if unfinished:
+            PrintStyle(font_color="cyan").print(
+                f"Recovered {len(unfinished)} unfinished A2A tasks, {interrupted} interrupted ones failed"
+            )
+    
     # Task Management Methods
     
     async def create_task(
@@ -198,14 +262,46 @@ class A2AHandler:
         
         with self._task_lock:
             self.tasks[task_id] = task
+            self._save(task)
+        
+        now = time.monotonic()
+        if now >= self._next_expiry:
+            self._next_expiry = now + EXPIRE_INTERVAL
+            self.cleanup_old_tasks()
             
         PrintStyle(font_color="cyan").print(f"A2A Task created: {task_id}")
         return task_id
     
     def get_task(self, task_id: str) -> Optional[A2ATask]:
-        """Get task by ID"""
+        """Get task by ID, finished tasks no longer in memory are read from the task store"""
         with self._task_lock:
-            return self.tasks.get(task_id)
+            return self._get_task(task_id)
+    
+    def list_tasks(self, state: TaskState) -> List[A2ATask]:
+        """Tasks in the given state that are in memory, which all unfinished tasks are"""
+        with self._task_lock:
+            return [task for task in self.tasks.values() if task.state == state]
+    
+    def count_tasks(self, state: Optional[TaskState] = None) -> int:
+        """Number of stored tasks, of all states or of the given one"""
+        with self._task_lock:
+            if self.store is None:
+                return len([task for task in self.tasks.values() if state in (None, task.state)])
+        try:
+            return self.store.count(state.value if state else None)
+        except sqlite3.Error as e:
+            PrintStyle.error(f"Failed to count A2A tasks: {e}")
+            return 0
+    
+    def update_task_metadata(self, task_id: str, metadata: Dict[str, Any]) -> bool:
+        """Merge values into the metadata of a task"""
+        with self._task_lock:
+            task = self._get_task(task_id)
+            if not task:
+                return False
+            task.metadata.update(metadata)
+            self._save(task)
+        return True
     
     def update_task_state(
         self, 
@@ -215,21 +311,32 @@ class A2AHandler:
         artifacts: Optional[List[TaskArtifact]] = None,
         progress: Optional[float] = None
     ) -> bool:
-        """Update task state and optionally add artifacts"""
+        """Update task state and optionally add artifacts, subscribers get a TaskStatusUpdateEvent"""
         with self._task_lock:
-            task = self.tasks.get(task_id)
+            task = self._get_task(task_id)
             if not task:
                 return False
                 
             task.update_state(new_state, error)
             
             if artifacts:
-                task.artifacts.extend(artifacts)
+                for artifact in artifacts:
+                    self._add_artifact(task, artifact)
             
             if progress is not None:
                 task.progress = progress
-                
-            return True
+            
+            self._save(task)
+            if task.completed_at:
+                self._finished[task_id] = None
+                self._finished.move_to_end(task_id)
+                self._trim_finished()
+            
+            event = self.format_task_event(task) if self._subscribers else None
+        
+        if event:
+            self._publish_task_event("TaskStatusUpdateEvent", event)
+        return True
     
     def add_task_artifact(
         self, 
@@ -238,9 +345,9 @@ class A2AHandler:
         content: Union[str, dict],
         metadata: Optional[Dict[str, Any]] = None
     ) -> bool:
-        """Add an artifact to a task"""
+        """Add an artifact to a task, subscribers get a TaskArtifactUpdateEvent"""
         with self._task_lock:
-            task = self.tasks.get(task_id)
+            task = self._get_task(task_id)
             if not task:
                 return False
                 
@@ -249,8 +356,138 @@ class A2AHandler:
                 content=content,
                 metadata=metadata
             )
-            task.artifacts.append(artifact)
-            return True
+            self._add_artifact(task, artifact)
+            self._save(task)
+        
+        if self._subscribers:
+            self._publish_task_event("TaskArtifactUpdateEvent", {
+                "taskId": task_id,
+                "artifact": self.format_artifact(artifact),
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+        return True
+    
+    def get_finished_tasks(self, since: datetime) -> List[A2ATask]:
+        """Completed or failed tasks that finished after the given time, in completion order"""
+        with self._task_lock:
+            finished = []
+            for task_id in reversed(self._finished):
+                task = self.tasks[task_id]
+                if task.completed_at <= since:
+                    break
+                finished.append(task)
+            finished.reverse()
+            if self.store is None or len(finished) < len(self._finished):
+                return finished
+        
+        # all finished tasks in memory are that recent, older ones in the store may be too
+        try:
+            stored = self.store.load_finished_since(since)
+        except sqlite3.Error as e:
+            PrintStyle.error(f"Failed to read finished A2A tasks: {e}")
+            return finished
+        with self._task_lock:
+            return [self.tasks.get(data["task_id"]) or _task_from_dict(data) for data in stored]
+    
+    def _get_task(self, task_id: str) -> Optional[A2ATask]:
+        # caller holds _task_lock
+        task = self.tasks.get(task_id)
+        if task or self.store is None:
+            return task
+        try:
+            data = self.store.load(task_id)
+        except sqlite3.Error as e:
+            PrintStyle.error(f"Failed to read A2A task {task_id}: {e}")
+            return None
+        if data is None:
+            return None
+        task = self.tasks[task_id] = _task_from_dict(data)
+        if task.completed_at:
+            # back in memory as the oldest finished task, the next trim drops it again
+            self._finished[task_id] = None
+            self._finished.move_to_end(task_id, last=False)
+        return task
+    
+    def _add_artifact(self, task: A2ATask, artifact: TaskArtifact):
+        # caller holds _task_lock, large content goes to a file so memory stays bounded
+        if self.store and artifact.content is not None and artifact.content_file is None:
+            try:
+                artifact.content_file = self.store.spill(task.task_id, len(task.artifacts), artifact.content)
+                if artifact.content_file:
+                    artifact.content = None
+            except OSError as e:
+                PrintStyle.error(f"Failed to write artifact of A2A task {task.task_id}, keeping it in memory: {e}")
+        task.artifacts.append(artifact)
+    
+    def _save(self, task: A2ATask):
+        # caller holds _task_lock
+        if self.store is None:
+            return
+        try:
+            self.store.save(
+                task.task_id,
+                task.state.value,
+                task.updated_at,
+                task.completed_at,
+                _task_to_dict(task),
+                spilled=any(artifact.content_file for artifact in task.artifacts),
+            )
+        except sqlite3.Error as e:
+            PrintStyle.error(f"Failed to store A2A task {task.task_id}: {e}")
+    
+    def _trim_finished(self):
+        # caller holds _task_lock, finished tasks dropped here stay in the store
+        if self.store is None:
+            return
+        while len(self._finished) > MAX_FINISHED_IN_MEMORY:
+            task_id, _ = self._finished.popitem(last=False)
+            self.tasks.pop(task_id, None)
+    
+    # Task Event Methods
+    
+    def subscribe_task_events(self) -> asyncio.Queue:
+        """Queue of task events published from now on, as ready SSE messages.
+        
+        The queue belongs to the running event loop, events published from other threads
+        are handed over to it. A subscriber that falls EVENT_QUEUE_SIZE events behind loses
+        its oldest progress events instead of slowing down publishers, see TaskEventQueue.
+        """
+        loop = asyncio.get_running_loop()
+        queue = TaskEventQueue()
+        with self._subscriber_lock:
+            self._subscribers[loop] = self._subscribers.get(loop, ()) + (queue,)
+        return queue
+    
+    def unsubscribe_task_events(self, queue: asyncio.Queue):
+        """Stop delivering task events to a queue from subscribe_task_events"""
+        with self._subscriber_lock:
+            for loop, queues in list(self._subscribers.items()):
+                if queue in queues:
+                    queues = tuple(q for q in queues if q is not queue)
+                    if queues:
+                        self._subscribers[loop] = queues
+                    else:
+                        del self._subscribers[loop]
+    
+    def _publish_task_event(self, event: str, data: Dict[str, Any]):
+        with self._subscriber_lock:
+            targets = list(self._subscribers.items())
+        if not targets:
+            return
+        
+        message = format_sse_event(event, data)
+        final = event == "TaskStatusUpdateEvent" and data.get("state") in (
+            TaskState.COMPLETED.value, TaskState.FAILED.value
+        )
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for loop, queues in targets:
+            if loop is running:
+                _deliver_task_event(queues, message, final)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(_deliver_task_event, queues, message, final)
     
     async def execute_task(self, task_id: str, agent_context: Any) -> bool:
         """Execute a task using the provided agent context"""
@@ -500,20 +737,44 @@ Respond directly and concisely to user requests. Provide practical, helpful resp
             response["error"] = task.error
         
         if task.artifacts:
-            response["artifacts"] = [
-                {
-                    "type": artifact.type,
-                    "content": artifact.content,
-                    "metadata": artifact.metadata or {}
-                }
-                for artifact in task.artifacts
-            ]
+            response["artifacts"] = [self.format_artifact(artifact) for artifact in task.artifacts]
         
         if task.metadata:
             response["metadata"] = task.metadata
             
         return response
     
+    def format_task_event(self, task: A2ATask) -> Dict[str, Any]:
+        """Format task state for a TaskStatusUpdateEvent, finished tasks include their artifacts"""
+        event = {
+            "taskId": task.task_id,
+            "state": task.state.value,
+            "progress": task.progress,
+            "timestamp": task.updated_at.isoformat()
+        }
+        
+        if task.error:
+            event["error"] = task.error
+        
+        if task.completed_at and task.artifacts:
+            event["artifacts"] = [self.format_artifact(artifact) for artifact in task.artifacts]
+        
+        return event
+    
+    def format_artifact(self, artifact: TaskArtifact) -> Dict[str, Any]:
+        """Format artifact for A2A protocol responses and events"""
+        content = artifact.content
+        if artifact.content_file and self.store:
+            try:
+                content = self.store.read_spilled(artifact.content_file)
+            except (OSError, ValueError) as e:
+                PrintStyle.error(f"Failed to read artifact file {artifact.content_file}: {e}")
+        return {
+            "type": artifact.type,
+            "content": content,
+            "metadata": artifact.metadata or {}
+        }
+    
     def format_error_response(self, error: A2AError) -> Dict[str, Any]:
         """Format error for A2A protocol response"""
         return {
@@ -571,21 +832,117 @@ Respond directly and concisely to user requests. Provide practical, helpful resp
     
     # Cleanup Methods
     
-    def cleanup_old_tasks(self, max_age_hours: int = 24):
-        """Clean up old completed/failed tasks"""
+    def cleanup_old_tasks(self, max_age_hours: Optional[float] = None):
+        """Clean up completed/failed tasks older than max_age_hours, the configured TTL by default
+        
+        Only expired tasks are visited, in memory by completion order and in the task store
+        through its completion time index. Unfinished tasks without a change for as long are
+        taken as abandoned and deleted from the store as well.
+        """
+        if max_age_hours is None:
+            max_age_hours = self.task_ttl_hours
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
         
         with self._task_lock:
             tasks_to_remove = []
-            for task_id, task in self.tasks.items():
-                if (task.state in [TaskState.COMPLETED, TaskState.FAILED] and 
-                    task.completed_at and task.completed_at < cutoff_time):
-                    tasks_to_remove.append(task_id)
-            
-            for task_id in tasks_to_remove:
+            while self._finished:
+                task_id = next(iter(self._finished))
+                if self.tasks[task_id].completed_at >= cutoff_time:
+                    break
+                del self._finished[task_id]
                 del self.tasks[task_id]
-                
-            if tasks_to_remove:
-                PrintStyle(font_color="yellow").print(
-                    f"Cleaned up {len(tasks_to_remove)} old A2A tasks"
-                )
\ No newline at end of file
+                tasks_to_remove.append(task_id)
+        
+        if self.store:
+            try:
+                stored = self.store.expire(cutoff_time)
+            except sqlite3.Error as e:
+                PrintStyle.error(f"Failed to expire A2A tasks: {e}")
+                stored = []
+            with self._task_lock:
+                for task_id in stored:
+                    self._finished.pop(task_id, None)
+                    self.tasks.pop(task_id, None)
+            tasks_to_remove = set(tasks_to_remove).union(stored)
+            
+        if tasks_to_remove:
+            PrintStyle(font_color="yellow").print(
+                f"Cleaned up {len(tasks_to_remove)} old A2A tasks"
+            )
+
+
+def _task_to_dict(task: A2ATask) -> Dict[str, Any]:
+    return {
+        "task_id": task.task_id,
+        "description": task.description,
+        "state": task.state.value,
+        "input_data": task.input_data,
+        "input_types": task.input_types,
+        "output_types": task.output_types,
+        "artifacts": [
+            {
+                "type": artifact.type,
+                "content": artifact.content,
+                "metadata": artifact.metadata,
+                "content_file": artifact.content_file,
+            }
+            for artifact in task.artifacts
+        ],
+        "metadata": task.metadata,
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+        "error": task.error,
+        "progress": task.progress,
+    }
+
+
+def _task_from_dict(data: Dict[str, Any]) -> A2ATask:
+    return A2ATask(
+        task_id=data["task_id"],
+        description=data["description"],
+        state=TaskState(data["state"]),
+        input_data=data["input_data"],
+        input_types=data["input_types"],
+        output_types=data["output_types"],
+        artifacts=[TaskArtifact(**artifact) for artifact in data["artifacts"]],
+        metadata=data["metadata"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        updated_at=datetime.fromisoformat(data["updated_at"]),
+        completed_at=datetime.fromisoformat(data["completed_at"]) if data["completed_at"] else None,
+        error=data["error"],
+        progress=data["progress"],
+    )
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _deliver_task_event(queues: tuple, message: str, final: bool):
+    # runs on the loop owning the queues
+    for queue in queues:
+        queue.put_nowait((message, final))
+
+
+class TaskEventQueue(asyncio.Queue):
+    """Task events of one subscriber, put as (SSE message, final) and got as the message.
+    
+    Never blocks a publisher. Beyond EVENT_QUEUE_SIZE events the oldest one that is not a
+    final task state is dropped, so a lagging client still learns how its task ended.
+    """
+    
+    def _init(self, maxsize):
+        self._queue = deque()
+    
+    def _put(self, item):
+        if len(self._queue) >= EVENT_QUEUE_SIZE:
+            for index, (_, final) in enumerate(self._queue):
+                if not final:
+                    del self._queue[index]
+                    break
+        self._queue.append(item)
+    
+    def _get(self):
+        return self._queue.popleft()[0]
@@ -0,0 +1,55 @@
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+import httpx
+
+KEEPALIVE_CONNECTIONS = 32  # idle connections kept open across all peers
+KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept
+HTTP2 = importlib.util.find_spec("h2") is not None  # httpx needs the h2 package for HTTP/2
+
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+_transports_lock = threading.Lock()
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Connection pool of the running event loop, closing a client that uses it leaves it open."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await _get_transport().handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+_shared_transport = _SharedTransport()
+
+
+def client(**kwargs) -> httpx.AsyncClient:
+    """HTTP client for A2A peers on the connection pool shared within the event loop.
+
+    Clients are cheap, they only carry their own headers, timeout and base URL. Connections
+    to each peer are kept alive and reused by all of them, and multiplexed over HTTP/2 on
+    https peers when h2 is installed. Plain http peers are reached over HTTP/1.1.
+    """
+    return httpx.AsyncClient(transport=_shared_transport, **kwargs)
+
+
+def _get_transport() -> httpx.AsyncHTTPTransport:
+    # connections belong to the loop that opened them, so every loop gets its own pool
+    loop = asyncio.get_running_loop()
+    with _transports_lock:
+        transport = _transports.get(loop)
+        if transport is None:
+            transport = _transports[loop] = httpx.AsyncHTTPTransport(
+                http2=HTTP2,
+                limits=httpx.Limits(
+                    max_connections=None,  # SSE streams hold a connection each
+                    max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+        return transport
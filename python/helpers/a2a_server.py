@@ -2,7 +2,7 @@ import asyncio
 import json
 import threading
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, AsyncGenerator
 from urllib.parse import urljoin
 
@@ -21,7 +21,13 @@ from starlette.types import ASGIApp, Receive, Scope, Send
 import uvicorn
 
 from python.helpers.print_style import PrintStyle
-from python.helpers.a2a_handler import A2AHandler, A2AError, A2AErrorType, TaskState, TaskArtifact
+from python.helpers.a2a_handler import (
+    A2AHandler, A2AError, A2AErrorType, TaskState, TaskArtifact, format_sse_event,
+    EVENT_QUEUE_SIZE
+)
+
+SSE_HEARTBEAT_INTERVAL = 5  # seconds between heartbeats sent to every SSE client
+SSE_REPLAY_SECONDS = 300  # tasks finished this recently are sent to new SSE clients
 
 
 class A2AAuthBackend(AuthenticationBackend):
@@ -98,9 +104,9 @@ class A2AServer:
         # Initialize handler with config
         self.handler.initialize(config)
         
-        # SSE client management
-        self.sse_clients: Dict[str, Any] = {}
-        self.sent_task_updates: Dict[str, set] = {}  # Track which tasks have been sent to which clients
+        # SSE client management, client id -> task event queue
+        self.sse_clients: Dict[str, asyncio.Queue] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
         
     def create_app(self) -> Starlette:
         """Create and configure Starlette application"""
@@ -214,20 +220,7 @@ class A2AServer:
             )
             
             # Execute task asynchronously with error handling
-            async def execute_with_error_handling():
-                try:
-                    await self.handler.execute_task(created_task_id, self.agent_context)
-                except Exception as e:
-                    PrintStyle(background_color="red", font_color="white").print(
-                        f"Task execution failed: {str(e)}"
-                    )
-                    self.handler.update_task_state(
-                        created_task_id, 
-                        TaskState.FAILED, 
-                        error=f"Task execution failed: {str(e)}"
-                    )
-            
-            asyncio.create_task(execute_with_error_handling())
+            asyncio.create_task(self._execute_with_error_handling(created_task_id))
             
             return JSONResponse({
                 "taskId": created_task_id,
@@ -243,6 +236,19 @@ class A2AServer:
             )
             raise HTTPException(status_code=500, detail="Internal server error")
     
+    async def _execute_with_error_handling(self, task_id: str):
+        try:
+            await self.handler.execute_task(task_id, self.agent_context)
+        except Exception as e:
+            PrintStyle(background_color="red", font_color="white").print(
+                f"Task execution failed: {str(e)}"
+            )
+            self.handler.update_task_state(
+                task_id, 
+                TaskState.FAILED, 
+                error=f"Task execution failed: {str(e)}"
+            )
+    
     async def get_task_status(self, request: Request) -> JSONResponse:
         """GET /tasks/{id} - Get task status"""
         try:
@@ -323,8 +329,10 @@ class A2AServer:
                 raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
             
             # Store webhook configuration (simplified implementation)
-            task.metadata["webhook_url"] = webhook_url
-            task.metadata["webhook_events"] = events
+            self.handler.update_task_metadata(task_id, {
+                "webhook_url": webhook_url,
+                "webhook_events": events
+            })
             
             return JSONResponse({
                 "taskId": task_id,
@@ -364,30 +372,31 @@ class A2AServer:
             raise HTTPException(status_code=500, detail="Internal server error")
     
     async def _sse_generator(self, request: Request) -> AsyncGenerator[str, None]:
-        """Generate Server-Sent Events"""
+        """Generate Server-Sent Events
+        
+        Task events are pushed by the handler as they happen. Tasks that finished shortly
+        before the client connected are sent first, so a client submitting a task and then
+        opening the stream does not miss a fast completion.
+        """
         client_id = str(uuid.uuid4())
-        self.sse_clients[client_id] = {"request": request, "connected": True}
+        queue = self.handler.subscribe_task_events()
+        self.sse_clients[client_id] = queue
+        self._start_heartbeat()
         
         try:
             # Send initial connection event
-            yield f"event: ConnectionEstablished\n"
-            yield f"data: {json.dumps({'clientId': client_id, 'timestamp': datetime.now(timezone.utc).isoformat()})}\n\n"
-            
-            # Keep connection alive and send task updates
-            while self.sse_clients.get(client_id, {}).get("connected", False):
-                # Check if client is still connected
-                if await request.is_disconnected():
-                    break
-
-                # Check for task updates to broadcast (more frequently)
-                async for update in self._broadcast_task_updates(client_id):
-                    yield update
-
-                # Send heartbeat every 5 seconds (more frequent)
-                yield f"event: Heartbeat\n"
-                yield f"data: {json.dumps({'timestamp': datetime.now(timezone.utc).isoformat()})}\n\n"
-
-                await asyncio.sleep(5)  # Check more frequently
+            yield format_sse_event("ConnectionEstablished", {
+                "clientId": client_id,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+            
+            since = datetime.now(timezone.utc) - timedelta(seconds=SSE_REPLAY_SECONDS)
+            for task in self.handler.get_finished_tasks(since):
+                yield format_sse_event("TaskStatusUpdateEvent", self.handler.format_task_event(task))
+            
+            # Task events and heartbeats, until the client disconnects and the stream is cancelled
+            while True:
+                yield await queue.get()
                 
         except asyncio.CancelledError:
             pass
@@ -398,48 +407,20 @@ class A2AServer:
         finally:
             # Clean up client
             self.sse_clients.pop(client_id, None)
-            self.sent_task_updates.pop(client_id, None)
+            self.handler.unsubscribe_task_events(queue)
     
-    async def _broadcast_task_updates(self, client_id: str):
-        """Broadcast task status updates to SSE clients"""
-        # Initialize tracking for this client if not exists
-        if client_id not in self.sent_task_updates:
-            self.sent_task_updates[client_id] = set()
-
-        for task_id, task in self.handler.tasks.items():
-            if task.state in [TaskState.COMPLETED, TaskState.FAILED]:
-                # Only send if we haven't sent this task update to this client yet
-                if task_id not in self.sent_task_updates[client_id]:
-                    event_data = {
-                        "taskId": task_id,
-                        "state": task.state.value,
-                        "timestamp": task.updated_at.isoformat()
-                    }
-
-                    if task.artifacts:
-                        event_data["artifacts"] = [
-                            {
-                                "type": artifact.type,
-                                "content": artifact.content,
-                                "metadata": artifact.metadata or {}
-                            }
-                            for artifact in task.artifacts
-                        ]
-
-                    # Mark as sent
-                    self.sent_task_updates[client_id].add(task_id)
-
-                    # Debug logging
-                    PrintStyle(font_color="green").print(
-                        f"SSE: Sending task update for {task_id} (state: {task.state.value}) to client {client_id}"
-                    )
-
-                    yield f"event: TaskStatusUpdateEvent\n"
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    
-                    # Give client time to receive completion event
-                    if task.state == TaskState.COMPLETED:
-                        await asyncio.sleep(0.5)
+    def _start_heartbeat(self):
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+    
+    async def _heartbeat_loop(self):
+        """Send heartbeats to all SSE clients, ends with the last client"""
+        while self.sse_clients:
+            heartbeat = format_sse_event("Heartbeat", {"timestamp": datetime.now(timezone.utc).isoformat()})
+            for queue in list(self.sse_clients.values()):
+                if queue.qsize() < EVENT_QUEUE_SIZE:  # a backed up client is not idle, keep its task events
+                    queue.put_nowait((heartbeat, False))
+            await asyncio.sleep(SSE_HEARTBEAT_INTERVAL)
     
     async def webhook_handler(self, request: Request) -> JSONResponse:
         """POST /push/{token} - Handle webhook notifications"""
@@ -479,7 +460,7 @@ class A2AServer:
         
         # Get current task info
         current_task = None
-        active_tasks = [t for t in self.handler.tasks.values() if t.state == TaskState.WORKING]
+        active_tasks = self.handler.list_tasks(TaskState.WORKING)
         if active_tasks:
             task = active_tasks[0]  # Get the first active task
             current_task = {
@@ -496,7 +477,7 @@ class A2AServer:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "version": "1.0.0",
             "tasks_active": len(active_tasks),
-            "tasks_total": len(self.handler.tasks),
+            "tasks_total": self.handler.count_tasks(),
             "current_task": current_task
         })
     
@@ -611,8 +592,8 @@ class A2AServer:
             "name": self.handler.agent_card.name if self.handler.agent_card else "Unknown",
             "version": self.handler.agent_card.version if self.handler.agent_card else "1.0.0",
             "capabilities": self.handler.agent_card.capabilities if self.handler.agent_card else [],
-            "tasks_active": len([t for t in self.handler.tasks.values() if t.state == TaskState.WORKING]),
-            "tasks_total": len(self.handler.tasks),
+            "tasks_active": len(self.handler.list_tasks(TaskState.WORKING)),
+            "tasks_total": self.handler.count_tasks(),
             "peers_connected": len(self.handler.peers),
             "sse_clients": len(self.sse_clients)
         }
@@ -13,7 +13,6 @@ import os
 import psutil
 import signal
 import subprocess
-import sys
 import tempfile
 import threading
 import time
@@ -24,9 +23,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 from urllib.parse import urlparse
 
+from python.helpers import a2a_http
 from python.helpers.print_style import PrintStyle
 from python.helpers.a2a_client import A2AClient
 from python.helpers.a2a_handler import A2AHandler, A2AError, A2AErrorType
+from python.helpers.a2a_subordinate_pool import subordinate_pool, start_runner
 
 
 class GlobalSpawningLock:
@@ -212,6 +213,9 @@ class A2ASubordinateManager:
         # Cleanup any existing orphaned processes on startup
         self._cleanup_orphaned_processes()
 
+        # Keep pre-started runners ready for the next spawns
+        subordinate_pool.start()
+
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals to ensure proper cleanup"""
         if self._shutdown_in_progress:
@@ -509,62 +513,18 @@ class A2ASubordinateManager:
         return config
     
     async def _spawn_subordinate_process(self, config: Dict[str, Any]) -> subprocess.Popen:
-        """Spawn subordinate as independent Python process"""
+        """Spawn subordinate as independent Python process, claimed from the pool when one is idle"""
         # Create temporary config file
         config_file = f"/tmp/subordinate_config_{config['agent_id']}.json"
         with open(config_file, 'w') as f:
             json.dump(config, f, indent=2)
         
-        # Python command to spawn subordinate
-        # Priority: 1) Virtual env Python 2) sys.executable 3) system Python
-        python_path = None
-        
-        # First, try to find virtual environment Python
-        project_root = Path(__file__).parent.parent.parent
-        venv_python = project_root / ".venv" / "bin" / "python3"
-        if venv_python.exists():
-            python_path = str(venv_python)
-            PrintStyle(font_color="cyan").print(f"Using virtual environment Python: {python_path}")
+        process = subordinate_pool.claim(config_file)
+        if process:
+            PrintStyle(font_color="cyan").print(f"Claimed pooled subordinate process PID: {process.pid}")
         else:
-            # Fallback to sys.executable if not from Cursor/AppImage
-            python_path = sys.executable
-            if 'Cursor' in python_path or 'AppImage' in python_path:
-                # Last resort: system Python
-                import shutil
-                python_path = shutil.which('python3') or shutil.which('python') or '/usr/bin/python3'
-                PrintStyle(font_color="yellow").print(f"Using system Python: {python_path}")
-            else:
-                PrintStyle(font_color="cyan").print(f"Using sys.executable: {python_path}")
-
-        script_path = os.path.join(os.path.dirname(__file__), "a2a_subordinate_runner.py")
-        working_dir = config["working_directory"]
-        
-        # Set PYTHONPATH to ensure proper imports
-        env = os.environ.copy()
-        env['PYTHONPATH'] = working_dir
-        env['TOKENIZERS_PARALLELISM'] = 'false'  # Disable tokenizers parallelism to avoid fork warnings
-        
-        # Set subordinate RAM limit (default 8GB if not set)
-        if 'SUBORDINATE_RAM_GB' not in env:
-            env['SUBORDINATE_RAM_GB'] = '8'
-        
-        # Map API keys for subordinate compatibility
-        if 'API_KEY_OPENAI' in env and 'OPENAI_API_KEY' not in env:
-            env['OPENAI_API_KEY'] = env['API_KEY_OPENAI']
-        if 'API_KEY_ANTHROPIC' in env and 'ANTHROPIC_API_KEY' not in env:
-            env['ANTHROPIC_API_KEY'] = env['API_KEY_ANTHROPIC']
-        
-        # Spawn process with unbuffered output
-        process = subprocess.Popen([
-            python_path, "-u", script_path, config_file  # -u for unbuffered output
-        ], cwd=working_dir,
-           stdout=subprocess.PIPE,
-           stderr=subprocess.STDOUT,  # Combine stderr with stdout
-           env=env,
-           bufsize=0,  # Unbuffered
-           preexec_fn=os.setsid if os.name != 'nt' else None)
-        
-        PrintStyle(font_color="cyan").print(f"Spawned subordinate process PID: {process.pid}")
+            process = start_runner([config_file], config["working_directory"])
+            PrintStyle(font_color="cyan").print(f"Spawned subordinate process PID: {process.pid}")
         
         # Store process group ID for cleanup
         if os.name != 'nt':
@@ -594,26 +554,26 @@ class A2ASubordinateManager:
                     raise Exception(f"Subordinate process died with exit code {subordinate.process.poll()}")
 
                 # Try health check with reduced retries to avoid long waits
-                async with self.a2a_client as client:
-                    health_url = f"{subordinate.url}/health"
-                    health_response = await client._make_request("GET", health_url, retries=1)
-                    if health_response:
-                        PrintStyle(font_color="green").print(f"Agent health check passed: {subordinate.url}")
+                client = self.a2a_client
+                health_url = f"{subordinate.url}/health"
+                health_response = await client._make_request("GET", health_url, retries=1)
+                if health_response:
+                    PrintStyle(font_color="green").print(f"Agent health check passed: {subordinate.url}")
 
-                        # Try agent card to ensure full readiness
-                        try:
-                            agent_card = await client.discover_agent(subordinate.url)
-                            if agent_card and agent_card.get("name"):
-                                PrintStyle(font_color="green").print(f"Subordinate {subordinate.role} is fully ready")
-                                return
-                        except Exception as card_error:
-                            # Health passed but agent card failed - still consider it ready after a few retries
-                            retry_count += 1
-                            if retry_count >= max_retries:
-                                PrintStyle(font_color="yellow").print(f"Subordinate {subordinate.role} is ready (health only)")
-                                return
-                            else:
-                                PrintStyle(font_color="gray").print(f"Agent card check failed (retry {retry_count}/{max_retries}): {str(card_error)[:50]}")
+                    # Try agent card to ensure full readiness
+                    try:
+                        agent_card = await client.discover_agent(subordinate.url)
+                        if agent_card and agent_card.get("name"):
+                            PrintStyle(font_color="green").print(f"Subordinate {subordinate.role} is fully ready")
+                            return
+                    except Exception as card_error:
+                        # Health passed but agent card failed - still consider it ready after a few retries
+                        retry_count += 1
+                        if retry_count >= max_retries:
+                            PrintStyle(font_color="yellow").print(f"Subordinate {subordinate.role} is ready (health only)")
+                            return
+                        else:
+                            PrintStyle(font_color="gray").print(f"Agent card check failed (retry {retry_count}/{max_retries}): {str(card_error)[:50]}")
 
             except Exception as e:
                 last_error = str(e)
@@ -668,7 +628,7 @@ class A2ASubordinateManager:
                     PrintStyle(font_color="cyan").print(f"Released port {subordinate.port} after exit")
                 raise RuntimeError(f"Subordinate process {subordinate.role} exited prematurely (exit code: {rc})")
             
-            await asyncio.sleep(1)
+            await asyncio.sleep(0.25)  # a pooled runner is up well within a second
         
         raise TimeoutError(f"Subordinate {subordinate.role} failed to start within {timeout} seconds")
     
@@ -945,7 +905,8 @@ class A2ASubordinateManager:
         self._process_groups.pop(role, None)
     
     def _cleanup_orphaned_processes(self):
-        """Cleanup orphaned subordinate processes"""
+        """Cleanup orphaned subordinate processes, idle runners of the pool are not orphans"""
+        pooled = subordinate_pool.pids()
         try:
             import subprocess
             # Find processes running a2a_subordinate_runner.py
@@ -959,7 +920,7 @@ class A2ASubordinateManager:
             if result.returncode == 0:
                 pids = result.stdout.strip().split('\n')
                 for pid in pids:
-                    if pid.strip():
+                    if pid.strip() and int(pid) not in pooled:
                         try:
                             os.kill(int(pid), signal.SIGKILL)
                             PrintStyle(font_color="yellow").print(f"Killed orphaned subordinate process {pid}")
@@ -979,6 +940,8 @@ class A2ASubordinateManager:
                     if 'a2a_subordinate_runner.py' in line and str(os.getpid()) not in line:
                         try:
                             pid = int(line.split()[1])
+                            if pid in pooled:
+                                continue
                             os.kill(pid, signal.SIGKILL)
                             PrintStyle(font_color="yellow").print(f"Killed orphaned subordinate process {pid}")
                         except (ProcessLookupError, PermissionError, ValueError, IndexError):
@@ -1042,60 +1005,59 @@ class A2ASubordinateManager:
                 AgentContext.remove(proxy_context_id)
             
             # Get subordinate context info via HTTP endpoint
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{subordinate.url}/context/info", timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("success"):
-                            context_info = data.get("context_info", {})
-                            
-                            # Create a simplified proxy context for UI display
-                            from agent import AgentContext, AgentContextType
-                            proxy_context = AgentContext(
-                                config=self.agent_context.config,
-                                id=f"subordinate_{subordinate.agent_id}",  # Unique ID for subordinate
-                                name=f"🤖 {subordinate.role} (Subordinate)",
-                                type=AgentContextType.A2A,
-                                created_at=subordinate.spawned_at,
-                                paused=False
-                            )
-                            
-                            # Set subordinate-specific properties
-                            proxy_context.subordinate_info = {
-                                "role": subordinate.role,
-                                "url": subordinate.url,
-                                "capabilities": subordinate.capabilities,
-                                "status": subordinate.status,
-                                "agent_id": subordinate.agent_id,
-                                "port": subordinate.port,
-                                "parent_context": self.agent_context.id,
-                                "original_context_id": context_info.get("context_id", "unknown")
-                            }
-                            
-                            # Mark as subordinate context
-                            proxy_context.is_subordinate = True
-                            
-                            # Create a dummy agent for the proxy context
-                            from agent import Agent
-                            proxy_agent = Agent(0, self.agent_context.config, proxy_context)
-                            proxy_context.agent0 = proxy_agent
-                            proxy_context.streaming_agent = proxy_agent
-                            
-                            # Initialize log proxy for the proxy context that forwards logs from subordinate
-                            from python.helpers.log import Log
-                            proxy_log = Log()
-                            
-                            # Add initial log entry
-                            proxy_log.log("agent", f"Subordinate agent '{subordinate.role}' initialized", subordinate_info=proxy_context.subordinate_info)
-                            
-                            proxy_context.log = proxy_log
-                            
-                            PrintStyle(font_color="cyan").print(f"Registered subordinate context for {subordinate.role}")
-                        else:
-                            PrintStyle(font_color="yellow").print(f"Failed to get context info for {subordinate.role}: {data.get('error', 'Unknown error')}")
+            async with a2a_http.client(timeout=10) as session:
+                response = await session.get(f"{subordinate.url}/context/info")
+                if response.status_code == 200:
+                    data = response.json()
+                    if data.get("success"):
+                        context_info = data.get("context_info", {})
+                        
+                        # Create a simplified proxy context for UI display
+                        from agent import AgentContext, AgentContextType
+                        proxy_context = AgentContext(
+                            config=self.agent_context.config,
+                            id=f"subordinate_{subordinate.agent_id}",  # Unique ID for subordinate
+                            name=f"🤖 {subordinate.role} (Subordinate)",
+                            type=AgentContextType.A2A,
+                            created_at=subordinate.spawned_at,
+                            paused=False
+                        )
+                        
+                        # Set subordinate-specific properties
+                        proxy_context.subordinate_info = {
+                            "role": subordinate.role,
+                            "url": subordinate.url,
+                            "capabilities": subordinate.capabilities,
+                            "status": subordinate.status,
+                            "agent_id": subordinate.agent_id,
+                            "port": subordinate.port,
+                            "parent_context": self.agent_context.id,
+                            "original_context_id": context_info.get("context_id", "unknown")
+                        }
+                        
+                        # Mark as subordinate context
+                        proxy_context.is_subordinate = True
+                        
+                        # Create a dummy agent for the proxy context
+                        from agent import Agent
+                        proxy_agent = Agent(0, self.agent_context.config, proxy_context)
+                        proxy_context.agent0 = proxy_agent
+                        proxy_context.streaming_agent = proxy_agent
+                        
+                        # Initialize log proxy for the proxy context that forwards logs from subordinate
+                        from python.helpers.log import Log
+                        proxy_log = Log()
+                        
+                        # Add initial log entry
+                        proxy_log.log("agent", f"Subordinate agent '{subordinate.role}' initialized", subordinate_info=proxy_context.subordinate_info)
+                        
+                        proxy_context.log = proxy_log
+                        
+                        PrintStyle(font_color="cyan").print(f"Registered subordinate context for {subordinate.role}")
                     else:
-                        PrintStyle(font_color="yellow").print(f"HTTP error getting context info for {subordinate.role}: {response.status}")
+                        PrintStyle(font_color="yellow").print(f"Failed to get context info for {subordinate.role}: {data.get('error', 'Unknown error')}")
+                else:
+                    PrintStyle(font_color="yellow").print(f"HTTP error getting context info for {subordinate.role}: {response.status_code}")
                 
         except Exception as e:
             PrintStyle(font_color="yellow").print(f"Could not register subordinate context for {subordinate.role}: {str(e)}")
@@ -1107,8 +1069,7 @@ class A2ASubordinateManager:
             proxy_context_id = f"subordinate_{subordinate.agent_id}"
             
             # Remove from global context registry
-            if proxy_context_id in AgentContext._contexts:
-                AgentContext.remove(proxy_context_id)
+            if AgentContext.remove(proxy_context_id):
                 PrintStyle(font_color="cyan").print(f"Unregistered subordinate context for {subordinate.role}")
                 
         except Exception as e:
@@ -0,0 +1,233 @@
+"""
+A2A Subordinate Pool
+
+Keeps pre-started subordinate runners idle so that spawning a subordinate does not pay
+for a cold Python start. A pooled runner imports the agent framework and then waits for
+the path of its configuration file on stdin, the role and prompt profile are only fixed
+when the runner is claimed.
+"""
+
+import atexit
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import psutil
+
+from python.helpers import dotenv
+from python.helpers.print_style import PrintStyle
+
+POOL_SIZE = 1  # idle runners kept ready, A2A_SUBORDINATE_POOL_SIZE overrides, 0 disables the pool
+POOL_MIN_FREE_MB = 2048  # memory left to everything else, A2A_SUBORDINATE_POOL_MIN_FREE_MB overrides
+RUNNER_MB = 700  # assumed memory of an idle runner, the largest measured one counts when bigger
+REPLENISH_DELAY = 2.0  # seconds between starting runners, so they do not compete for the CPU
+CHECK_INTERVAL = 30.0  # seconds between checks of a full pool for dead runners and memory pressure
+
+RUNNER_SCRIPT = os.path.join(os.path.dirname(__file__), "a2a_subordinate_runner.py")
+POOL_ARG = "--pool"
+API_KEY_ALIASES = {  # names of the API keys in .env, mapped to the names the provider SDKs read
+    "API_KEY_OPENAI": "OPENAI_API_KEY",
+    "API_KEY_ANTHROPIC": "ANTHROPIC_API_KEY",
+}
+
+
+def start_runner(args: List[str], working_dir: str, stdin=None) -> subprocess.Popen:
+    """Start a2a_subordinate_runner.py in its own process group"""
+    # Python command to spawn subordinate
+    # Priority: 1) Virtual env Python 2) sys.executable 3) system Python
+    project_root = Path(__file__).parent.parent.parent
+    venv_python = project_root / ".venv" / "bin" / "python3"
+    if venv_python.exists():
+        python_path = str(venv_python)
+        PrintStyle(font_color="cyan").print(f"Using virtual environment Python: {python_path}")
+    else:
+        # Fallback to sys.executable if not from Cursor/AppImage
+        python_path = sys.executable
+        if 'Cursor' in python_path or 'AppImage' in python_path:
+            # Last resort: system Python
+            python_path = shutil.which('python3') or shutil.which('python') or '/usr/bin/python3'
+            PrintStyle(font_color="yellow").print(f"Using system Python: {python_path}")
+        else:
+            PrintStyle(font_color="cyan").print(f"Using sys.executable: {python_path}")
+
+    # Set PYTHONPATH to ensure proper imports
+    env = os.environ.copy()
+    env['PYTHONPATH'] = working_dir
+    env['TOKENIZERS_PARALLELISM'] = 'false'  # Disable tokenizers parallelism to avoid fork warnings
+
+    # Set subordinate RAM limit (default 8GB if not set)
+    if 'SUBORDINATE_RAM_GB' not in env:
+        env['SUBORDINATE_RAM_GB'] = '8'
+
+    # Map API keys for subordinate compatibility
+    map_api_keys(env)
+
+    # Spawn process with unbuffered output
+    return subprocess.Popen([
+        python_path, "-u", RUNNER_SCRIPT, *args  # -u for unbuffered output
+    ], cwd=working_dir,
+       stdin=stdin,
+       stdout=subprocess.PIPE,
+       stderr=subprocess.STDOUT,  # Combine stderr with stdout
+       env=env,
+       bufsize=0,  # Unbuffered
+       preexec_fn=os.setsid if os.name != 'nt' else None)
+
+
+def map_api_keys(env, previous: Optional[dict] = None):
+    """Set the SDK names of the API keys in env that are not set yet.
+
+    With previous, the environment before a reload of .env, keys that were mapped from the
+    old value are updated as well.
+    """
+    for name, sdk_name in API_KEY_ALIASES.items():
+        if name not in env:
+            continue
+        if sdk_name not in env or (previous is not None and env[sdk_name] == previous.get(name)):
+            env[sdk_name] = env[name]
+
+
+class SubordinatePool:
+    """
+    Idle subordinate runners, replenished by a background thread.
+
+    The thread keeps up to the configured number of runners idle, as long as the memory
+    available after starting one more stays above the reserve. When available memory
+    drops below the reserve it stops idle runners again, newest first.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.min_free_mb = POOL_MIN_FREE_MB
+        self._idle: List[subprocess.Popen] = []  # oldest first, those are the warmest
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._memory_capped = False
+
+    def start(self):
+        """Start keeping runners idle, the pool size is read from the environment once"""
+        with self._lock:
+            if self._thread or self._closed:
+                return
+            self.size = int(dotenv.get_dotenv_value("A2A_SUBORDINATE_POOL_SIZE", POOL_SIZE))
+            self.min_free_mb = int(dotenv.get_dotenv_value("A2A_SUBORDINATE_POOL_MIN_FREE_MB", POOL_MIN_FREE_MB))
+            if self.size <= 0:
+                return
+            self._thread = threading.Thread(target=self._run, name="SubordinatePool", daemon=True)
+            self._thread.start()
+
+    def claim(self, config_file: str) -> Optional[subprocess.Popen]:
+        """Hand a configuration file to an idle runner, None when no runner is idle"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                process = self._idle.pop(0)
+                self._wake.notify()
+            try:
+                process.stdin.write(f"{config_file}\n".encode())
+                process.stdin.close()
+                return process
+            except (OSError, ValueError):
+                self._stop(process)  # died while idle, try the next one
+
+    def pids(self) -> set:
+        """Process ids of the idle runners"""
+        with self._lock:
+            return {process.pid for process in self._idle}
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._wake.notify()
+        for process in idle:
+            self._stop(process)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                self._idle = [process for process in self._idle if process.poll() is None]
+                idle = len(self._idle)
+            free_mb = self._available_mb() - self.min_free_mb
+
+            if idle and free_mb < 0:
+                with self._lock:
+                    process = self._idle.pop() if self._idle else None
+                if process:
+                    PrintStyle(font_color="yellow").print(
+                        f"Low memory, stopping idle subordinate runner PID: {process.pid}"
+                    )
+                    self._stop(process)
+                time.sleep(REPLENISH_DELAY)
+                continue
+
+            if idle < self.size:
+                if free_mb >= self._runner_mb():
+                    self._memory_capped = False
+                    self._add_runner()
+                    time.sleep(REPLENISH_DELAY)
+                    continue
+                if not self._memory_capped:
+                    self._memory_capped = True
+                    PrintStyle(font_color="yellow").print(
+                        f"Subordinate pool limited to {idle} idle runners by available memory"
+                    )
+
+            with self._lock:
+                if not self._closed:
+                    self._wake.wait(CHECK_INTERVAL)
+
+    def _add_runner(self):
+        try:
+            process = start_runner([POOL_ARG], os.getcwd(), stdin=subprocess.PIPE)
+        except Exception as e:
+            PrintStyle(font_color="red").print(f"Failed to start pooled subordinate runner: {e}")
+            return
+        with self._lock:
+            if self._closed:
+                process.kill()
+                return
+            self._idle.append(process)
+        PrintStyle(font_color="cyan").print(f"Started pooled subordinate runner PID: {process.pid}")
+
+    def _runner_mb(self) -> float:
+        measured = []
+        for pid in self.pids():
+            try:
+                measured.append(psutil.Process(pid).memory_info().rss / 2**20)
+            except psutil.Error:
+                pass
+        return max([RUNNER_MB] + measured)
+
+    def _available_mb(self) -> float:
+        return psutil.virtual_memory().available / 2**20
+
+    def _stop(self, process: subprocess.Popen):
+        try:
+            if process.stdin:
+                process.stdin.close()  # an idle runner exits on end of input
+            process.wait(timeout=2)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            try:
+                if os.name != 'nt':
+                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+# Global instance
+subordinate_pool = SubordinatePool()
+atexit.register(subordinate_pool.shutdown)
@@ -4,6 +4,9 @@ A2A Subordinate Runner
 
 This script runs a subordinate Agent Zero instance as an independent A2A server.
 It's spawned by the A2ASubordinateManager and runs as a separate process.
+
+Started with --pool instead of a config file it warms up and waits idle until the
+manager writes the config file path to its stdin, see a2a_subordinate_pool.
 """
 
 import asyncio
@@ -11,6 +14,7 @@ import json
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent.parent
@@ -19,11 +23,16 @@ sys.path.insert(0, str(project_root))
 # Change to the project root directory to ensure relative imports work
 os.chdir(str(project_root))
 
-from agent import Agent, AgentConfig, AgentContext, AgentContextType
-from python.helpers.a2a_server import A2AServer
-from python.helpers.a2a_handler import A2AHandler
+if TYPE_CHECKING:
+    from agent import AgentConfig
+
+from python.helpers.a2a_subordinate_pool import POOL_ARG, map_api_keys
+from python.helpers import dotenv
 from python.helpers.print_style import PrintStyle
-import models
+
+# Document extraction workers are spawned processes, which import this script again as
+# __mp_main__. The agent framework (agent, models, the A2A server...) is therefore only
+# imported inside the methods that build the subordinate, not at module level.
 
 
 class A2ASubordinate:
@@ -39,6 +48,8 @@ class A2ASubordinate:
     
     async def initialize(self):
         """Initialize the subordinate agent"""
+        from agent import Agent, AgentContext, AgentContextType
+
         try:
             # ------------------------------------------------------------------
             # Prevent hard OOM-kills: impose a soft address-space limit so that
@@ -123,8 +134,11 @@ class A2ASubordinate:
             print(f"SUBORDINATE: ERROR - Full traceback:\n{full_traceback}", flush=True)
             raise
     
-    def _create_agent_config(self) -> AgentConfig:
+    def _create_agent_config(self) -> "AgentConfig":
         """Create agent configuration for subordinate"""
+        from agent import AgentConfig
+        import models
+
         # Use inherited model configurations from parent
         chat_model_config = self.config_data.get('chat_model', {})
         utility_model_config = self.config_data.get('utility_model', {})
@@ -205,6 +219,8 @@ class A2ASubordinate:
     
     async def _initialize_a2a_handler(self):
         """Initialize A2A protocol handler"""
+        from python.helpers.a2a_handler import A2AHandler
+
         handler = A2AHandler.get_instance()
         
         handler_config = {
@@ -224,6 +240,8 @@ class A2ASubordinate:
     
     async def _start_a2a_server(self):
         """Start A2A server for this subordinate"""
+        from python.helpers.a2a_server import A2AServer, DynamicA2AProxy
+
         server_config = {
             'auth_required': False,
             'host': '0.0.0.0',
@@ -240,8 +258,6 @@ class A2ASubordinate:
         # Use DynamicA2AProxy for token-based routing if token is available
         a2a_token = self.config_data.get('a2a_server_token', '')
         if a2a_token:
-            from python.helpers.a2a_server import DynamicA2AProxy
-            
             # Initialize the proxy with server
             proxy = DynamicA2AProxy.get_instance()
             proxy.initialize_server(self.context, server_config)
@@ -331,12 +347,28 @@ class A2ASubordinate:
         self.running = False
 
 
+def wait_for_assignment():
+    """Warm up as a pooled runner and return the config file path the manager assigns"""
+    # The rest of the memory stack, imported on first use otherwise
+    import python.helpers.memory  # noqa: F401
+
+    print("SUBORDINATE: Pooled runner ready, waiting for assignment", flush=True)
+    # Blocking is fine, nothing else runs on the event loop yet
+    config_file = sys.stdin.readline().strip()
+
+    # The environment was copied when the runner started, settings saved since then are in .env
+    previous = dict(os.environ)
+    dotenv.load_dotenv()
+    map_api_keys(os.environ, previous)
+    return config_file
+
+
 async def main():
     """Main entry point for subordinate runner"""
     print("SUBORDINATE: Main function started", flush=True)
 
     if len(sys.argv) != 2:
-        print("SUBORDINATE: Usage: a2a_subordinate_runner.py <config_file>", flush=True)
+        print(f"SUBORDINATE: Usage: a2a_subordinate_runner.py <config_file>|{POOL_ARG}", flush=True)
         sys.exit(1)
 
     config_file = sys.argv[1]
@@ -355,6 +387,12 @@ async def main():
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
+    if config_file == POOL_ARG:
+        config_file = wait_for_assignment()
+        if not config_file:
+            print("SUBORDINATE: Pool closed, exiting", flush=True)
+            return
+
     try:
         print(f"SUBORDINATE: Loading configuration from: {config_file}", flush=True)
 
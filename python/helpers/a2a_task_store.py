@@ -0,0 +1,153 @@
+"""
+A2A Task Store
+
+Durable storage of the tasks of one A2A agent in SQLite. Every change of a task rewrites its
+row, so a restarted agent finds its unfinished tasks again and finished ones can still be
+polled after they left memory. Finished tasks expire through an index ordered by completion
+time, unfinished ones through an index of their last change, and artifact content above ARTIFACT_SPILL_BYTES is kept in files next to the database.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from python.helpers import files
+
+STORE_DIR = "tmp/a2a"
+DB_FILE_NAME = "tasks.db"
+ARTIFACTS_DIR_NAME = "artifacts"
+ARTIFACT_SPILL_BYTES = 64 * 1024  # artifact content above this size is written to a file
+EXPIRE_BATCH = 500  # expired tasks deleted per statement, keeps the write lock short
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    completed_at REAL,
+    spilled INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, updated_at);
+CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed_at) WHERE completed_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS tasks_unfinished ON tasks (updated_at) WHERE completed_at IS NULL;
+"""
+
+
+class A2ATaskStore:
+    """
+    Task rows of one agent, in tmp/a2a/<agent>/tasks.db.
+
+    Rows hold the task serialized as JSON next to the columns that are queried: state and
+    updated_at for lookups by state, completed_at and updated_at for expiry. The database runs in WAL mode
+    without a sync per commit, a crash of the machine may lose the last changes but never
+    corrupts the file.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.folder = files.get_abs_path(STORE_DIR, files.safe_file_name(name))
+        self.artifacts_folder = os.path.join(self.folder, ARTIFACTS_DIR_NAME)
+        os.makedirs(self.folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self.folder, DB_FILE_NAME), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def save(self, task_id: str, state: str, updated_at: datetime, completed_at: Optional[datetime],
+             data: Dict[str, Any], spilled: bool = False):
+        row = (
+            task_id,
+            state,
+            updated_at.timestamp(),
+            completed_at.timestamp() if completed_at else None,
+            int(spilled),
+            json.dumps(data, default=str),
+        )
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_in_states(self, states: List[str]) -> List[Dict[str, Any]]:
+        """Tasks in the given states, oldest change first"""
+        marks = ",".join("?" * len(states))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT data FROM tasks WHERE state IN ({marks}) ORDER BY updated_at", states
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def load_finished_since(self, since: datetime) -> List[Dict[str, Any]]:
+        """Tasks that finished after the given time, in completion order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM tasks WHERE completed_at > ? ORDER BY completed_at",
+                (since.timestamp(),),
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def count(self, state: Optional[str] = None) -> int:
+        with self._lock:
+            if state is None:
+                return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM tasks WHERE state = ?", (state,)).fetchone()[0]
+
+    def expire(self, cutoff: datetime) -> List[str]:
+        """Delete tasks that finished before the cutoff, or are unfinished and last changed before
+        it, with their artifact files. Returns their ids."""
+        expired = []
+        for query in (
+            "SELECT task_id, spilled FROM tasks WHERE completed_at < ? ORDER BY completed_at LIMIT ?",
+            "SELECT task_id, spilled FROM tasks WHERE completed_at IS NULL AND updated_at < ? LIMIT ?",
+        ):
+            while True:
+                with self._lock:
+                    rows = self._db.execute(query, (cutoff.timestamp(), EXPIRE_BATCH)).fetchall()
+                    if not rows:
+                        break
+                    ids = [task_id for task_id, _ in rows]
+                    self._db.execute(
+                        f"DELETE FROM tasks WHERE task_id IN ({','.join('?' * len(ids))})", ids
+                    )
+                for task_id, spilled in rows:
+                    if spilled:
+                        shutil.rmtree(self._artifact_folder(task_id), ignore_errors=True)
+                expired += ids
+        return expired
+
+    def spill(self, task_id: str, index: int, content: Any) -> Optional[str]:
+        """Write artifact content to a file when it is too large to keep in memory.
+
+        Returns the file name relative to the store, None when the content stays inline.
+        """
+        text = json.dumps(content, default=str)
+        if len(text) <= ARTIFACT_SPILL_BYTES:
+            return None
+        folder = self._artifact_folder(task_id)
+        os.makedirs(folder, exist_ok=True)
+        name = f"{index}.json"
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(text)
+        return os.path.join(ARTIFACTS_DIR_NAME, files.safe_file_name(task_id), name)
+
+    def read_spilled(self, content_file: str) -> Any:
+        with open(os.path.join(self.folder, content_file), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _artifact_folder(self, task_id: str) -> str:
+        return os.path.join(self.artifacts_folder, files.safe_file_name(task_id))
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+# faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
+from python.helpers import faiss_monkey_patch
+import faiss
+
+INDEX_TYPES = ["flat", "hnsw", "ivfpq"]
+
+HNSW_M = 32  # graph neighbours per node
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64  # minimum, raised for larger k
+IVF_NPROBE = 32  # clusters visited per query
+IVF_TRAIN_SAMPLE = 100_000  # vectors used to train the coarse quantizer and PQ codebooks
+REFINE_FACTOR = 16  # ivfpq candidates re-scored exactly per requested result
+REBUILD_DELETED_RATIO = 0.25  # rebuild once this share of rows belongs to deleted documents
+
+
+class AnnIndex:
+    """Approximate nearest-neighbour index over inner-product vectors.
+
+    Rows are mapped to docstore ids instead of positions in the flat index, so deleting
+    documents does not invalidate it; deleted rows stay until the next rebuild and are
+    skipped on lookup. `flat_rows` is the number of leading flat-index rows already added,
+    used by the owner to append new rows incrementally.
+    """
+
+    def __init__(self, index_type: str, index: faiss.Index):
+        self.index_type = index_type
+        self.index = index
+        self.doc_ids: list[str] = []
+        self.row_areas = np.empty(0, dtype=np.int32)
+        self.flat_rows = 0
+        self.deleted = 0
+
+    @staticmethod
+    def build(
+        index_type: str,
+        vectors: np.ndarray,
+        doc_ids: list[str],
+        row_areas: np.ndarray,
+    ) -> "AnnIndex":
+        dim = vectors.shape[1]
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        elif index_type == "ivfpq":
+            nlist = max(16, min(65536, int(4 * math.sqrt(len(vectors)))))
+            nlist = min(nlist, max(1, len(vectors) // 39))  # faiss wants ~39 points per centroid
+            quantizer = faiss.IndexFlatIP(dim)
+            ivf = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, _pq_subquantizers(dim), 8, faiss.METRIC_INNER_PRODUCT
+            )
+            # exact re-scoring keeps scores comparable with the flat index and thresholds meaningful
+            index = faiss.IndexRefineFlat(ivf)
+            if len(vectors) > IVF_TRAIN_SAMPLE:
+                sample = vectors[
+                    np.random.default_rng(0).choice(len(vectors), IVF_TRAIN_SAMPLE, replace=False)
+                ]
+            else:
+                sample = vectors
+            index.train(sample)
+        else:
+            raise ValueError(f"Unknown ANN index type '{index_type}'")
+
+        ann = AnnIndex(index_type, index)
+        ann.add(vectors, doc_ids, row_areas)
+        return ann
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, vectors: np.ndarray, doc_ids: list[str], row_areas: np.ndarray):
+        if not len(doc_ids):
+            return
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        self.doc_ids.extend(doc_ids)
+        self.row_areas = np.concatenate([self.row_areas, row_areas.astype(np.int32)])
+
+    def needs_rebuild(self) -> bool:
+        return self.deleted > len(self.doc_ids) * REBUILD_DELETED_RATIO
+
+    def search(self, vector: np.ndarray, k: int, mask: np.ndarray | None = None):
+        """Return (scores, doc ids) of the k best rows, restricted to rows where mask is True."""
+        # params only hold raw pointers, the python objects must outlive the search
+        bitmap = selector = None
+        if mask is not None:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+
+        if self.index_type == "hnsw":
+            params = base_params = faiss.SearchParametersHNSW()
+            params.efSearch = max(HNSW_EF_SEARCH, k * 2)
+        else:
+            base_params = faiss.SearchParametersIVF()
+            base_params.nprobe = IVF_NPROBE
+            params = faiss.IndexRefineSearchParameters()
+            params.k_factor = REFINE_FACTOR
+            params.base_index_params = base_params
+        if selector is not None:
+            base_params.sel = selector
+
+        scores, rows = self.index.search(vector, k, params=params)
+        return scores[0], [self.doc_ids[row] if row >= 0 else None for row in rows[0]]
+
+
+def _pq_subquantizers(dim: int) -> int:
+    # largest count dividing the dimension with at least 4 dimensions per sub-vector
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if dim % m == 0 and dim // m >= 4:
+            return m
+    return 1
@@ -0,0 +1,128 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from python.helpers import files
+from python.helpers.atomic_save import atomic_write
+from python.helpers.chat_journal import JOURNAL_FILE_NAME
+from python.helpers.localization import Localization
+from python.helpers.print_style import PrintStyle
+
+INDEX_FILE = "tmp/chat_index.json"  # outside the chats folder, every entry there is a chat
+
+
+@dataclass
+class ChatIndexEntry:
+    """What the chat list shows of a saved chat, without loading the chat itself."""
+
+    id: str
+    name: str | None
+    created_at: str
+    type: str
+    last_message: str
+    log_guid: str
+    log_length: int
+    fingerprint: list = field(default_factory=list)  # chat files as of this entry, see get_fingerprint
+    no: int = 0  # context number, assigned when indexed and kept by the loaded context
+
+    def serialize(self):
+        # same shape as AgentContext.serialize
+        return {
+            "id": self.id,
+            "name": self.name,
+            "created_at": Localization.get().serialize_datetime(
+                datetime.fromisoformat(self.created_at)
+            ),
+            "no": self.no,
+            "log_guid": self.log_guid,
+            "log_version": self.log_length,  # a loaded log has one update per item
+            "log_length": self.log_length,
+            "paused": False,
+            "last_message": Localization.get().serialize_datetime(
+                datetime.fromisoformat(self.last_message)
+            ),
+            "type": self.type,
+        }
+
+
+def make_entry(meta: dict, log_guid: str, log_length: int, fingerprint: list) -> ChatIndexEntry:
+    """Entry from serialized context metadata, fingerprint of the chat files it was read from."""
+    epoch = datetime.fromtimestamp(0).isoformat()
+    return ChatIndexEntry(
+        id=meta["id"],
+        name=meta.get("name"),
+        created_at=meta.get("created_at") or epoch,
+        type=meta.get("type") or "user",
+        last_message=meta.get("last_message") or epoch,
+        log_guid=log_guid,
+        log_length=log_length,
+        fingerprint=fingerprint,
+    )
+
+
+def load(folders: list[str], snapshot_name: str, read_data: Callable[[str], dict]) -> list[ChatIndexEntry]:
+    """Index entries of the given chat folders.
+
+    Entries come from the index file as long as the chat files are unchanged since, only new
+    or changed chats are read with read_data. The index file is rewritten when anything changed.
+    """
+    cached = _read_index()
+    entries: list[ChatIndexEntry] = []
+    changed = len(cached) != len(folders)
+    for folder in folders:
+        fingerprint = get_fingerprint(folder, snapshot_name)
+        entry = cached.get(os.path.basename(folder))
+        if entry is None or entry.fingerprint != fingerprint:
+            changed = True
+            try:
+                data = read_data(folder)
+                log = data.get("log") or {}
+                entry = make_entry(data, log.get("guid", ""), len(log.get("logs", [])), fingerprint)
+            except Exception as e:
+                print(f"Error loading chat {folder}: {e}")
+                continue
+        entries.append(entry)
+    if changed:
+        save(entries)
+    return entries
+
+
+def save(entries: list[ChatIndexEntry]):
+    try:
+        content = json.dumps([asdict(entry) for entry in entries], ensure_ascii=False)
+        atomic_write(files.get_abs_path(INDEX_FILE), content.encode("utf-8"), mode="wb")
+    except Exception as e:
+        PrintStyle.error(f"Failed to save chat index: {e}")
+
+
+def update(entry: ChatIndexEntry):
+    """Replace one entry in the index file."""
+    entries = _read_index()
+    entries[entry.id] = entry
+    save(list(entries.values()))
+
+
+def _read_index() -> dict[str, ChatIndexEntry]:
+    path = files.get_abs_path(INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {item["id"]: ChatIndexEntry(**item) for item in json.load(f)}
+    except Exception as e:
+        PrintStyle.error(f"Chat index unreadable, rebuilding it: {e}")
+        return {}
+
+
+def get_fingerprint(folder: str, snapshot_name: str) -> list:
+    """Size and modification time of the snapshot and the journal of a chat folder."""
+    result = []
+    for name in (snapshot_name, JOURNAL_FILE_NAME):
+        try:
+            stat = os.stat(os.path.join(folder, name))
+            result.append([stat.st_size, stat.st_mtime_ns])
+        except FileNotFoundError:
+            result.append(None)
+    return result
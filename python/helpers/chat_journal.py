@@ -0,0 +1,169 @@
+import atexit
+import json
+import os
+import threading
+
+from python.helpers.atomic_save import atomic_write
+from python.helpers.strings import sanitize_string
+from python.helpers.print_style import PrintStyle
+
+JOURNAL_FILE_NAME = "chat.journal.jsonl"
+SAVE_DELAY = 1.0  # seconds between the first unsaved change of a chat and the write
+COMPACT_ENTRIES = 200  # journal lines after which the next save writes a snapshot instead
+COMPACT_BYTES = 4 * 1024 * 1024  # same, by journal size
+
+
+class ChatJournal:
+    """Write-behind persistence of one chat folder.
+
+    The folder holds a snapshot and a journal with one JSON line per save, each line holding
+    only what changed since the previous one. Lines and snapshots are buffered and written by
+    a timer thread SAVE_DELAY after the first change, so frequent saves coalesce into one write
+    and no file I/O happens on the caller's thread. Once the journal grows past COMPACT_ENTRIES
+    lines or COMPACT_BYTES the owner writes a new snapshot and the journal starts over.
+
+    Journal lines carry the id of the snapshot they follow, lines left over from an older
+    snapshot (a crash between replacing the snapshot and removing the journal) are ignored.
+    """
+
+    def __init__(self, folder: str, snapshot_name: str):
+        self.folder = folder
+        self.snapshot_name = snapshot_name
+        self.lock = threading.RLock()
+        self.snapshot_id = ""
+        self.state: dict = {}  # owner's change tracking state as of the last save
+        self.entries = 0  # journal lines since the last snapshot, written or pending
+        self.size = 0
+        self._snapshot: str | None = None
+        self._lines: list[str] = []
+        self._timer: threading.Timer | None = None
+        self._removed = False
+
+    def needs_snapshot(self) -> bool:
+        return (
+            not self.snapshot_id
+            or self.entries >= COMPACT_ENTRIES
+            or self.size >= COMPACT_BYTES
+        )
+
+    def write_snapshot(self, content: str, snapshot_id: str, state: dict):
+        with self.lock:
+            self.snapshot_id = snapshot_id
+            self.state = state
+            self.entries = 0
+            self.size = 0
+            self._snapshot = content
+            self._lines = []  # superseded by the snapshot
+            self._schedule()
+
+    def append(self, line: str, state: dict):
+        with self.lock:
+            self.state = state
+            self.entries += 1
+            self.size += len(line)
+            self._lines.append(line)
+            self._schedule()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._removed or (self._snapshot is None and not self._lines):
+                return
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+                journal_path = os.path.join(self.folder, JOURNAL_FILE_NAME)
+                if self._snapshot is not None:
+                    atomic_write(
+                        os.path.join(self.folder, self.snapshot_name),
+                        sanitize_string(self._snapshot).encode("utf-8"),
+                        mode="wb",
+                    )
+                    self._snapshot = None
+                    if os.path.exists(journal_path):
+                        os.remove(journal_path)
+                if self._lines:
+                    with open(journal_path, "a", encoding="utf-8") as f:
+                        f.write("".join(sanitize_string(line) + "\n" for line in self._lines))
+                    self._lines = []
+            except Exception as e:
+                # keep what is pending, the next save retries
+                PrintStyle.error(f"Failed to save chat '{self.folder}': {e}")
+
+    def remove(self):
+        with self.lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._removed = True
+            self._snapshot = None
+            self._lines = []
+
+
+_journals: dict[str, ChatJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get(folder: str, snapshot_name: str) -> ChatJournal:
+    with _journals_lock:
+        journal = _journals.get(folder)
+        if journal is None:
+            journal = _journals[folder] = ChatJournal(folder, snapshot_name)
+        return journal
+
+
+def remove(folder: str):
+    """Drop pending writes of a chat whose folder is being deleted."""
+    with _journals_lock:
+        journal = _journals.pop(folder, None)
+    if journal:
+        journal.remove()
+
+
+def release(folder: str):
+    """Write pending changes of a chat and forget its state, its next save writes a snapshot."""
+    with _journals_lock:
+        journal = _journals.pop(folder, None)
+    if journal:
+        journal.flush()
+
+
+def flush_all():
+    with _journals_lock:
+        journals = list(_journals.values())
+    for journal in journals:
+        journal.flush()
+
+
+def read(folder: str, snapshot_name: str) -> tuple[dict, list[dict]]:
+    """Snapshot data of a chat folder and the journal entries that follow it, in order."""
+    with _journals_lock:
+        journal = _journals.get(folder)
+    if journal:
+        journal.flush()  # pending changes of a chat loaded again in this process
+
+    with open(os.path.join(folder, snapshot_name), "r", encoding="utf-8") as f:
+        data = json.loads(f.read())
+    entries = []
+    journal_path = os.path.join(folder, JOURNAL_FILE_NAME)
+    if os.path.exists(journal_path):
+        snapshot_id = data.get("journal_id")
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line of an interrupted write
+                if snapshot_id and entry.get("journal_id") == snapshot_id:
+                    entries.append(entry)
+    return data, entries
+
+
+atexit.register(flush_all)
@@ -1,4 +1,5 @@
 import json
+import re
 
 def try_parse(json_string: str):
     try:
@@ -15,6 +16,21 @@ def stringify(obj, **kwargs):
     return json.dumps(obj, ensure_ascii=False, **kwargs)
 
 
+# states of an open container in incremental (feed) mode
+_KEY, _COLON, _VALUE, _COMMA = range(4)
+
+# marker for a token cut off by the end of the fed input
+_PENDING = object()
+
+_WHITESPACE = re.compile(r"\s*")
+_STRING_STOP = {q: re.compile(re.escape(q) + r"|\\") for q in ['"', "'", "`"]}
+_UNQUOTED_KEY_STOP = re.compile(r"[\s:,}\]]")
+_UNQUOTED_STRING_STOP = re.compile(r"[:,}\]]")
+_NUMBER = re.compile(r"[0-9+\-.eE]*")
+_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERALS = (("true", True), ("false", False), ("null", None), ("undefined", None))
+
+
 class DirtyJson:
     def __init__(self):
         self._reset()
@@ -25,6 +41,12 @@ class DirtyJson:
         self.current_char = None
         self.result = None
         self.stack = []
+        # incremental (feed) state
+        self._started = False
+        self._done = False
+        self._frames = []  # open containers as [container, key, state, doubled_brace]
+        self._token = None  # scalar token cut off by the end of the input
+        self._provisional = False  # last list item is a partial value
 
     @staticmethod
     def parse_string(json_string):
@@ -52,12 +74,328 @@ class DirtyJson:
         return self.result
 
     def feed(self, chunk):
+        """Parse the next chunk of a streamed document and return the partial result.
+
+        Keeps the parser state between calls, so every chunk only scans the new
+        input instead of re-parsing the whole document. Strings still being
+        streamed are exposed in the result with their content so far.
+        """
         self.json_string += chunk
-        if not self.current_char and self.json_string:
-            self.current_char = self.json_string[0]
-        self._parse()
+        if not self._done:
+            self._feed()
         return self.result
 
+    def _feed(self):
+        s = self.json_string
+        n = len(s)
+
+        if self._token is not None:
+            value = self._resume_token()
+            if value is _PENDING:
+                self._expose_partial()
+                return
+            self._emit(value)
+
+        while not self._done:
+            if not self._started:
+                start = self._find_start(s, self.index)
+                if start == -1:
+                    self.index = n
+                    return
+                self.index = start
+                self._started = True
+
+            if not self._skip_whitespace_fed():
+                return
+
+            ch = s[self.index]
+            if not self._frames:
+                if self._begin_value() is _PENDING:
+                    break
+                continue
+
+            frame = self._frames[-1]
+            container, state = frame[0], frame[2]
+
+            if isinstance(container, dict):
+                if state == _KEY:
+                    if ch == "}":
+                        self._close_frame()
+                    elif ch in ",]":
+                        self.index += 1
+                    elif ch in ['"', "'"]:
+                        self._token = ["str", ch, [], self.index + 1]
+                        self.index += 1
+                        value = self._resume_token()
+                        if value is _PENDING:
+                            break
+                        self._emit(value)
+                    else:
+                        self._token = ["key", self.index]
+                        value = self._resume_token()
+                        if value is _PENDING:
+                            break
+                        self._emit(value)
+                elif state == _COLON:
+                    if ch == ":":
+                        self.index += 1
+                        frame[2] = _VALUE
+                    elif ch in ",}":
+                        self._emit(None)
+                    else:
+                        frame[2] = _VALUE
+                elif state == _VALUE:
+                    if ch in ",}":
+                        self._emit(None)
+                    elif self._begin_value() is _PENDING:
+                        break
+                else:  # _COMMA
+                    if ch == ",":
+                        self.index += 1
+                        frame[2] = _KEY
+                    elif ch == "}":
+                        self._close_frame()
+                    else:
+                        frame[2] = _KEY
+            else:
+                if ch == "]" and state in (_VALUE, _COMMA):
+                    self._close_frame()
+                elif state == _VALUE:
+                    if self._begin_value() is _PENDING:
+                        break
+                elif ch == ",":
+                    self.index += 1
+                    frame[2] = _VALUE
+                else:
+                    self._frames.pop()  # unexpected input ends the array
+                    if not self._frames:
+                        self._done = True
+
+        self._expose_partial()
+
+    def _find_start(self, s: str, pos: int) -> int:
+        indices = [i for i in (s.find(c, pos) for c in ["{", "[", '"']) if i != -1]
+        return min(indices) if indices else -1
+
+    def _skip_whitespace_fed(self) -> bool:
+        # returns False when more input is needed to continue
+        s = self.json_string
+        n = len(s)
+        while True:
+            self.index = _WHITESPACE.match(s, self.index).end()
+            if self.index >= n:
+                return False
+            if s[self.index] != "/":
+                return True
+            if self.index + 1 >= n:
+                return False
+            nxt = s[self.index + 1]
+            if nxt == "/":
+                end = s.find("\n", self.index + 2)
+                if end == -1:
+                    return False
+                self.index = end + 1
+            elif nxt == "*":
+                end = s.find("*/", self.index + 2)
+                if end == -1:
+                    return False
+                self.index = end + 2
+            else:
+                return True
+
+    def _begin_value(self):
+        s = self.json_string
+        n = len(s)
+        i = self.index
+        ch = s[i]
+
+        if ch in "{[":
+            doubled = False
+            if ch == "{":
+                if i + 1 >= n:
+                    return _PENDING
+                doubled = s[i + 1] == "{"
+            container = {} if ch == "{" else []
+            self.index = i + (2 if doubled else 1)
+            self._emit(container)
+            self._frames.append(
+                [container, None, _KEY if ch == "{" else _VALUE, doubled]
+            )
+            return container
+
+        if ch in ['"', "'", "`"]:
+            following = s[i + 1 : i + 3]
+            if len(following) < 2 and following == ch * len(following):
+                return _PENDING  # could still become a multiline string
+            if following == ch * 2:
+                self._token = ["mstr", ch, i + 3, i + 3]
+                self.index = i + 3
+            else:
+                self._token = ["str", ch, [], i + 1]
+                self.index = i + 1
+        elif ch.isdigit() or ch in ["-", "+"]:
+            self._token = ["num", i]
+        else:
+            lowered = s[i : i + 9].lower()
+            for text, literal in _LITERALS:
+                if lowered.startswith(text):
+                    self.index = i + len(text)
+                    self._emit(literal)
+                    return literal
+                if i + len(lowered) >= n and text.startswith(lowered):
+                    return _PENDING  # literal not complete yet
+            self._token = ["unq", i]
+
+        value = self._resume_token()
+        if value is not _PENDING:
+            self._emit(value)
+        return value
+
+    def _resume_token(self):
+        s = self.json_string
+        n = len(s)
+        token = self._token
+        kind = token[0]  # type: ignore
+
+        if kind == "str":
+            _, quote, parts, pos = token  # type: ignore
+            stop = _STRING_STOP[quote]
+            while True:
+                m = stop.search(s, pos)
+                if not m:
+                    parts.append(s[pos:])
+                    token[3] = n  # type: ignore
+                    return _PENDING
+                j = m.start()
+                parts.append(s[pos:j])
+                if s[j] == quote:
+                    self.index = j + 1
+                    self._token = None
+                    return "".join(parts)
+                # escape sequence
+                if j + 1 >= n:
+                    token[3] = j  # type: ignore
+                    return _PENDING
+                esc = s[j + 1]
+                if esc in ['"', "'", "\\", "/", "b", "f", "n", "r", "t"]:
+                    parts.append(_ESCAPES.get(esc, esc))
+                    pos = j + 2
+                elif esc == "u":
+                    if j + 6 > n:
+                        token[3] = j  # type: ignore
+                        return _PENDING
+                    digits = s[j + 2 : j + 6]
+                    try:
+                        parts.append(chr(int(digits, 16)))
+                        pos = j + 6
+                    except ValueError:
+                        parts.append("\\u")
+                        pos = j + 2
+                else:
+                    pos = j + 2
+                token[3] = pos  # type: ignore
+
+        if kind == "mstr":
+            _, quote, start, pos = token  # type: ignore
+            end = s.find(quote * 3, pos)
+            if end == -1:
+                token[3] = max(start, n - 2)  # type: ignore
+                return _PENDING
+            self.index = end + 3
+            self._token = None
+            return s[start:end].strip()
+
+        if kind == "num":
+            start = token[1]  # type: ignore
+            end = _NUMBER.match(s, start).end()
+            if end >= n:
+                return _PENDING
+            self.index = end
+            self._token = None
+            number_str = s[start:end]
+            try:
+                return int(number_str)
+            except ValueError:
+                try:
+                    return float(number_str)
+                except ValueError:
+                    return number_str
+
+        # unquoted key or string
+        start = token[1]  # type: ignore
+        stop = _UNQUOTED_KEY_STOP if kind == "key" else _UNQUOTED_STRING_STOP
+        m = stop.search(s, start)
+        if not m:
+            return _PENDING
+        end = m.start()
+        self.index = end + 1 if kind == "unq" and s[end] in ":," else end
+        self._token = None
+        return s[start:end] if kind == "key" else s[start:end].strip()
+
+    def _emit(self, value):
+        self._token = None
+        if not self._frames:
+            self.result = value
+            if not isinstance(value, (dict, list)):
+                self._done = True
+            return
+        frame = self._frames[-1]
+        container = frame[0]
+        if isinstance(container, dict):
+            if frame[2] == _KEY:
+                frame[1] = value
+                frame[2] = _COLON
+                return
+            container[frame[1]] = value
+        elif self._provisional:
+            container[-1] = value
+        else:
+            container.append(value)
+        self._provisional = False
+        frame[2] = _COMMA
+
+    def _close_frame(self):
+        frame = self._frames.pop()
+        self.index += 1
+        if (
+            frame[3]
+            and self.index < len(self.json_string)
+            and self.json_string[self.index] == "}"
+        ):
+            self.index += 1  # Handle }}
+        if not self._frames:
+            self._done = True
+
+    def _expose_partial(self):
+        # show the value being streamed in the result before it is complete
+        token = self._token
+        if token is None or token[0] in ("num", "key"):
+            return
+        if self._frames and self._frames[-1][2] != _VALUE:
+            return  # partial key, not a value
+
+        kind = token[0]
+        if kind == "str":
+            parts = token[2]
+            value = "".join(parts)
+            parts[:] = [value]
+        elif kind == "mstr":
+            value = self.json_string[token[2] :].strip()
+        else:
+            value = self.json_string[token[1] :].strip()
+
+        if not self._frames:
+            self.result = value
+            return
+        container = self._frames[-1][0]
+        if isinstance(container, dict):
+            container[self._frames[-1][1]] = value
+        elif self._provisional:
+            container[-1] = value
+        else:
+            container.append(value)
+            self._provisional = True
+
     def _advance(self, count=1):
         self.index += count
         if self.index < len(self.json_string):
@@ -0,0 +1,127 @@
+# Document text extraction in a process pool.
+# Workers are spawned: each imports this module and, as __mp_main__, the main script of the
+# parent. Both must stay importable without the agent framework, run_ui.py imports it lazily.
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator
+
+EXTRACT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PDF_PAGES_PER_TASK = 4  # pages extracted together by one worker call
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+async def _run(fn, *args):
+    return await asyncio.wrap_future(get_pool().submit(fn, *args))
+
+
+async def pdf_pages(path: str) -> AsyncIterator[str]:
+    """Yield the text of a PDF in page order, page ranges are extracted in parallel.
+
+    Uses PyMuPDF with table and image OCR. When that produces no text at all the document
+    is treated as scanned and every page is rasterized and OCRed in parallel instead.
+    """
+    page_count = await _run(_pdf_page_count, path)
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    futures = [get_pool().submit(_extract_pdf_range, path, start, end) for start, end in ranges]
+
+    found_text = False
+    try:
+        for i, future in enumerate(futures):
+            text = await asyncio.wrap_future(future)
+            found_text = found_text or bool(text)
+            # the same "\n" page delimiter as one single-mode load of the whole file
+            yield text if i == 0 else "\n" + text
+    finally:
+        for future in futures:
+            future.cancel()
+    if found_text:
+        return
+
+    futures = [get_pool().submit(_ocr_pdf_page, path, page) for page in range(1, page_count + 1)]
+    try:
+        for future in futures:
+            yield await asyncio.wrap_future(future)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def unstructured(file_path: str) -> str:
+    """Extract text with unstructured's hi_res strategy in a worker process."""
+    return await _run(_extract_unstructured, file_path)
+
+
+# --- worker functions, executed in the pool processes ---
+
+
+def _pdf_page_count(path: str) -> int:
+    import pymupdf
+
+    with pymupdf.open(path) as doc:
+        return doc.page_count
+
+
+def _extract_pdf_range(path: str, start: int, end: int) -> str:
+    import pymupdf
+    from langchain_community.document_loaders.pdf import PyMuPDFLoader
+    from langchain_community.document_loaders.parsers.images import TesseractBlobParser
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        range_path = temp_file.name
+    try:
+        with pymupdf.open(path) as src, pymupdf.open() as dst:
+            dst.insert_pdf(src, from_page=start, to_page=end - 1)
+            dst.save(range_path)
+        loader = PyMuPDFLoader(
+            range_path,
+            mode="single",
+            extract_tables="markdown",
+            extract_images=True,
+            images_inner_format="text",
+            images_parser=TesseractBlobParser(),
+            pages_delimiter="\n",
+        )
+        return "\n".join([element.page_content for element in loader.load()])
+    except Exception as e:
+        print(f"Error loading pages {start + 1}-{end} with PyMuPDF: {e}", flush=True)
+        return ""
+    finally:
+        os.unlink(range_path)
+
+
+def _ocr_pdf_page(path: str, page: int) -> str:
+    import pdf2image
+    import pytesseract
+
+    images = pdf2image.convert_from_path(path, first_page=page, last_page=page)  # type: ignore
+    return "".join(pytesseract.image_to_string(image) + "\n\n" for image in images)
+
+
+def _extract_unstructured(file_path: str) -> str:
+    os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"
+    from langchain_unstructured import UnstructuredLoader
+
+    loader = UnstructuredLoader(
+        file_path=file_path, mode="single", partition_via_api=False, strategy="hi_res"
+    )
+    return "\n".join([element.page_content for element in loader.load()])
@@ -0,0 +1,169 @@
+import asyncio
+import mimetypes
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import aiohttp
+
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+FETCH_RETRIES = 3
+CHUNK_SIZE = 64 * 1024
+CONNECTION_LIMIT = 32  # open connections per session
+CONNECTION_LIMIT_PER_HOST = 8
+TIMEOUT = aiohttp.ClientTimeout(total=None, connect=10.0, sock_read=30.0)
+
+# aiohttp sessions are bound to the event loop they were created in, one per loop
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_sessions_lock = threading.Lock()
+
+
+class DocumentTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str  # final url after redirects
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    path: str = ""  # temporary file with the body, the caller removes it
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def mimetype(self) -> str:
+        return self.headers.get("content-type", "").split(";")[0].strip()
+
+    @property
+    def charset(self) -> str:
+        for param in self.headers.get("content-type", "").split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "charset" and value.strip():
+                return value.strip().strip('"')
+        return "utf-8"
+
+    @property
+    def version(self) -> str | None:
+        return response_version(self.headers)
+
+    def cleanup(self):
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = ""
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Shared pooled session of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        for other in [other for other in _sessions if other.is_closed()]:
+            del _sessions[other]
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=CONNECTION_LIMIT,
+                    limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                    ttl_dns_cache=300,
+                ),
+                timeout=TIMEOUT,
+            )
+            _sessions[loop] = session
+        return session
+
+
+def response_version(headers) -> str | None:
+    """Version of a response: strong ETag, or Last-Modified with the content length."""
+    if etag := headers.get("etag"):
+        if not etag.startswith("W/"):  # weak tags may not change with content
+            return "etag:" + etag
+    if modified := headers.get("last-modified"):
+        length = headers.get("content-length", "")
+        return f"modified:{modified}|{length}"
+    return None
+
+
+def conditional_headers(version: str | None) -> dict[str, str]:
+    """Request headers that let the server answer 304 when the stored version is still current."""
+    if not version:
+        return {}
+    if version.startswith("etag:"):
+        return {"If-None-Match": version.removeprefix("etag:")}
+    if version.startswith("modified:"):
+        return {"If-Modified-Since": version.removeprefix("modified:").split("|")[0]}
+    return {}
+
+
+async def fetch(
+    url: str,
+    version: str | None = None,
+    suffix: str = "",
+    max_bytes: int = MAX_DOCUMENT_BYTES,
+) -> FetchResult:
+    """Download url into a temporary file, streaming, with the size limit enforced while reading.
+
+    With a version from an earlier fetch the request is conditional, and an unchanged
+    document comes back as a 304 result without a body.
+    """
+    last_error = ""
+    for attempt in range(FETCH_RETRIES):
+        if attempt:
+            await asyncio.sleep(1)
+        try:
+            return await _fetch(url, conditional_headers(version), suffix, max_bytes)
+        except DocumentTooLargeError:
+            raise
+        except Exception as e:
+            last_error = str(e)
+    raise ValueError(f"Document fetch error: {url} ({last_error})")
+
+
+async def _fetch(url: str, headers: dict[str, str], suffix: str, max_bytes: int) -> FetchResult:
+    async with get_session().get(url, headers=headers, allow_redirects=True) as response:
+        result = FetchResult(
+            url=str(response.url),
+            status=response.status,
+            headers={key.lower(): value for key, value in response.headers.items()},
+        )
+        if response.status == 304:
+            return result
+        if response.status > 399:
+            raise Exception(response.status)
+
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise DocumentTooLargeError(_too_large(url, int(length), max_bytes))
+
+        # loaders detect the file type by its extension
+        suffix = (
+            suffix
+            or os.path.splitext(urlparse(result.url).path)[1]
+            or mimetypes.guess_extension(result.mimetype)
+            or ""
+        )
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            result.path = temp_file.name
+        try:
+            received = 0
+            with open(result.path, "wb") as f:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise DocumentTooLargeError(_too_large(url, received, max_bytes))
+                    f.write(chunk)
+        except BaseException:
+            result.cleanup()
+            raise
+        return result
+
+
+def _too_large(url: str, size: int, max_bytes: int) -> str:
+    return (
+        f"Document content length exceeds max. {max_bytes / 1024 / 1024:.0f}MB: "
+        f"{size / 1024 / 1024:.1f} MB ({url})"
+    )
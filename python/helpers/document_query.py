@@ -1,35 +1,195 @@
 import mimetypes
 import os
 import asyncio
-import aiohttp
 import json
+import hashlib
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
 
 from python.helpers.vector_db import VectorDB
 
 os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"  # noqa E402
-from langchain_unstructured import UnstructuredLoader  # noqa E402
 
 from urllib.parse import urlparse
 from typing import Callable, Sequence, List, Optional, Tuple
 from datetime import datetime
 
-from langchain_community.document_loaders import AsyncHtmlLoader
 from langchain_community.document_loaders.text import TextLoader
-from langchain_community.document_loaders.pdf import PyMuPDFLoader
 from langchain_community.document_transformers import MarkdownifyTransformer
-from langchain_community.document_loaders.parsers.images import TesseractBlobParser
 
 from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files, errors
+from python.helpers import files, errors, document_extract, document_fetch
 from agent import Agent
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
 DEFAULT_SEARCH_THRESHOLD = 0.5
+DEFAULT_SEARCH_LIMIT = 20  # chunks per query
+MAX_CONCURRENT_QUERIES = 5  # utility model calls in flight per document_qa
+PREFETCH_TEXT_STEP = 50_000  # extracted characters between embedding prefetches
+PREFETCH_UNSTABLE_CHUNKS = 2  # trailing chunks not prefetched, they may still change
+
+
+class DocumentIndex:
+    """Persistent index of chunked and embedded documents under memory/document_index.
+
+    Each entry is keyed by the normalized URI and records the version of the source it was
+    built from (file content hash, ETag or Last-Modified) and a hash of the extracted text.
+    Local files also record the size and mtime they were hashed at, so an unchanged file is
+    not read again.
+    A matching version lets a later query skip fetching and parsing, a matching text hash
+    lets it skip embedding. Entries are evicted least recently used beyond MAX_BYTES, by the
+    mtime of their meta.json, which a load touches.
+
+    All methods do blocking file I/O, async callers run them with asyncio.to_thread.
+    """
+
+    DIR = "memory/document_index"
+    MAX_BYTES = 512 * 1024 * 1024
+
+    # entry dir -> size, least recently used first, scanned from disk on first use
+    _entries: "OrderedDict[str, int] | None" = None
+    _total = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _entry_dir(document_uri: str) -> str:
+        key = hashlib.sha256(document_uri.encode("utf-8")).hexdigest()[:32]
+        return files.get_abs_path(DocumentIndex.DIR, key)
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_meta(document_uri: str) -> dict | None:
+        meta_path = os.path.join(DocumentIndex._entry_dir(document_uri), "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta if meta.get("document_uri") == document_uri else None
+
+    @staticmethod
+    def update_meta(document_uri: str, **values):
+        meta = DocumentIndex.get_meta(document_uri)
+        if meta:
+            meta.update(values)
+            files.write_file(
+                os.path.join(DocumentIndex._entry_dir(document_uri), "meta.json"), json.dumps(meta)
+            )
+
+    @staticmethod
+    def load(document_uri: str) -> tuple[dict, list[Document], np.ndarray] | None:
+        meta = DocumentIndex.get_meta(document_uri)
+        if not meta:
+            return None
+        entry_dir = DocumentIndex._entry_dir(document_uri)
+        try:
+            with open(os.path.join(entry_dir, "chunks.json"), "r", encoding="utf-8") as f:
+                chunks = [Document(**chunk) for chunk in json.load(f)]
+            vectors = np.load(os.path.join(entry_dir, "vectors.npy"))
+        except (OSError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(os.path.join(entry_dir, "meta.json"))
+        except OSError:
+            pass
+        with DocumentIndex._lock:
+            entries = DocumentIndex._scan()
+            if entry_dir in entries:
+                entries.move_to_end(entry_dir)
+        return meta, chunks, vectors
+
+    @staticmethod
+    def save(meta: dict, chunks: list[Document], vectors: list[list[float]]):
+        entry_dir = DocumentIndex._entry_dir(meta["document_uri"])
+        tmp_dir = f"{entry_dir}.tmp-{uuid.uuid4().hex[:8]}"
+        os.makedirs(tmp_dir)
+        try:
+            with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+                json.dump(
+                    [
+                        {
+                            "page_content": chunk.page_content,
+                            "metadata": {k: v for k, v in chunk.metadata.items() if k != "id"},
+                        }
+                        for chunk in chunks
+                    ],
+                    f,
+                )
+            np.save(os.path.join(tmp_dir, "vectors.npy"), np.asarray(vectors, dtype=np.float32))
+            meta = {**meta}
+            meta["size"] = sum(
+                os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)
+            )
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            with DocumentIndex._lock:
+                entries = DocumentIndex._scan()
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+                DocumentIndex._total += meta["size"] - entries.pop(entry_dir, 0)
+                entries[entry_dir] = meta["size"]
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        DocumentIndex.evict()
+
+    @staticmethod
+    def evict(max_bytes: int | None = None):
+        """Remove least recently used entries until the index fits the size budget."""
+        max_bytes = DocumentIndex.MAX_BYTES if max_bytes is None else max_bytes
+        with DocumentIndex._lock:
+            entries = DocumentIndex._scan()
+            while entries and DocumentIndex._total > max_bytes:
+                entry_dir, size = entries.popitem(last=False)
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                DocumentIndex._total -= size
+
+    @staticmethod
+    def _scan() -> "OrderedDict[str, int]":
+        # caller holds _lock, entries are read from disk once, later changes are tracked
+        if DocumentIndex._entries is not None:
+            return DocumentIndex._entries
+        root = files.get_abs_path(DocumentIndex.DIR)
+        found = []
+        for name in os.listdir(root) if os.path.isdir(root) else []:
+            entry_dir = os.path.join(root, name)
+            meta_path = os.path.join(entry_dir, "meta.json")
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    size = json.load(f).get("size", 0)
+                found.append((os.path.getmtime(meta_path), entry_dir, size))
+            except (OSError, json.JSONDecodeError):
+                # incomplete entry or leftover temp dir, remove unless it may still be written
+                try:
+                    if time.time() - os.path.getmtime(entry_dir) > 3600:
+                        shutil.rmtree(entry_dir, ignore_errors=True)
+                except OSError:
+                    pass
+        DocumentIndex._entries = OrderedDict(
+            (entry_dir, size) for _, entry_dir, size in sorted(found)
+        )
+        DocumentIndex._total = sum(size for _, _, size in found)
+        return DocumentIndex._entries
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class DocumentQueryStore:
@@ -97,8 +257,72 @@ class DocumentQueryStore:
     def init_vector_db(self):
         return VectorDB(self.agent, cache=True)
 
+    def _model_id(self) -> str:
+        model = self.agent.config.embeddings_model
+        return f"{model.provider}/{model.name}"
+
+    def split_text(self, text: str) -> list[str]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
+        )
+        return text_splitter.split_text(text)
+
+    async def prefetch_embeddings(self, chunks: list[str]):
+        """Embed chunks ahead of add_document, which then finds them in the embeddings cache."""
+        if not self.vector_db:
+            self.vector_db = self.init_vector_db()
+        try:
+            await self.vector_db.embeddings.aembed_documents(chunks)
+        except Exception as e:
+            # not fatal, add_document embeds whatever is missing
+            PrintStyle.error(f"Error prefetching embeddings: {e}")
+
+    async def load_document(self, document_uri: str, version: str | None) -> bool:
+        """
+        Load a document from the persistent index if it was indexed from the same version.
+
+        Args:
+            document_uri: The URI of the document
+            version: Version of the source (content hash, ETag or Last-Modified)
+
+        Returns:
+            True if the document was loaded, False if it needs to be indexed
+        """
+        document_uri = self.normalize_uri(document_uri)
+        meta = DocumentIndex.get_meta(document_uri)
+        if not version or not meta or meta.get("version") != version:
+            return False
+        if meta.get("chunk_size") != self.DEFAULT_CHUNK_SIZE or meta.get(
+            "chunk_overlap"
+        ) != self.DEFAULT_CHUNK_OVERLAP:
+            return False
+        loaded = await asyncio.to_thread(DocumentIndex.load, document_uri)
+        if not loaded:
+            return False
+        meta, chunks, vectors = loaded
+
+        if not self.vector_db:
+            self.vector_db = self.init_vector_db()
+        if meta.get("model") != self._model_id():
+            # embedded by another model, the chunks are still valid
+            vectors = await self.vector_db.embeddings.aembed_documents(
+                [chunk.page_content for chunk in chunks]
+            )
+            meta["model"] = self._model_id()
+            await asyncio.to_thread(DocumentIndex.save, meta, chunks, vectors)
+        ids = await self.vector_db.insert_documents(chunks, vectors)
+        PrintStyle.standard(
+            f"Loaded document '{document_uri}' with {len(ids)} chunks from index"
+        )
+        return True
+
     async def add_document(
-        self, text: str, document_uri: str, metadata: dict | None = None
+        self,
+        text: str,
+        document_uri: str,
+        metadata: dict | None = None,
+        version: str | None = None,
+        file_stat: list[int] | None = None,
     ) -> tuple[bool, list[str]]:
         """
         Add a document to the store with the given URI.
@@ -107,6 +331,8 @@ class DocumentQueryStore:
             text: The document text content
             document_uri: The URI that uniquely identifies this document
             metadata: Optional metadata for the document
+            version: Optional version of the source, stored in the persistent index
+            file_stat: Size and mtime_ns of a local source the version was computed from
 
         Returns:
             True if successful, False otherwise
@@ -123,10 +349,7 @@ class DocumentQueryStore:
         doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
-        )
-        chunks = text_splitter.split_text(text)
+        chunks = self.split_text(text)
 
         # Create documents
         docs = []
@@ -145,10 +368,47 @@ class DocumentQueryStore:
             if not self.vector_db:
                 self.vector_db = self.init_vector_db()
 
-            ids = await self.vector_db.insert_documents(docs)
+            # same text indexed before (e.g. a source without version info), reuse its vectors
+            text_hash = DocumentIndex.text_hash(text)
+            vectors = None
+            meta = DocumentIndex.get_meta(document_uri)
+            if (
+                meta
+                and meta.get("text_hash") == text_hash
+                and meta.get("model") == self._model_id()
+                and meta.get("chunk_size") == self.DEFAULT_CHUNK_SIZE
+                and meta.get("chunk_overlap") == self.DEFAULT_CHUNK_OVERLAP
+            ):
+                loaded = await asyncio.to_thread(DocumentIndex.load, document_uri)
+                if loaded and len(loaded[2]) == len(docs):
+                    vectors = loaded[2]
+            if vectors is None:
+                vectors = await self.vector_db.embeddings.aembed_documents(
+                    [doc.page_content for doc in docs]
+                )
+
+            ids = await self.vector_db.insert_documents(docs, vectors)
             PrintStyle.standard(
                 f"Added document '{document_uri}' with {len(docs)} chunks"
             )
+
+            try:
+                await asyncio.to_thread(
+                    DocumentIndex.save,
+                    {
+                        "document_uri": document_uri,
+                        "version": version,
+                        "file_stat": file_stat,
+                        "text_hash": text_hash,
+                        "model": self._model_id(),
+                        "chunk_size": self.DEFAULT_CHUNK_SIZE,
+                        "chunk_overlap": self.DEFAULT_CHUNK_OVERLAP,
+                    },
+                    docs,
+                    vectors,
+                )
+            except Exception as e:
+                PrintStyle.error(f"Error persisting document '{document_uri}': {e}")
             return True, ids
         except Exception as e:
             err_text = errors.format_error(e)
@@ -329,6 +589,40 @@ class DocumentQueryStore:
             query, limit, threshold, f"document_uri == '{document_uri}'"
         )
 
+    async def search_document_multi(
+        self,
+        document_uri: str,
+        queries: list[str],
+        limit: int = 10,
+        threshold: float = 0.5,
+    ) -> List[List[Document]]:
+        """
+        Search for content within a specific document with several queries at once.
+
+        Args:
+            document_uri: The URI of the document to search within
+            queries: The search query strings
+            limit: Maximum number of results to return per query
+            threshold: Minimum similarity score threshold (0-1)
+
+        Returns:
+            List of matching document chunks for each query
+        """
+        if not self.vector_db:
+            return [[] for _ in queries]
+
+        try:
+            results = await self.vector_db.search_by_similarity_threshold_multi(
+                queries, limit, threshold, f"document_uri == '{document_uri}'"
+            )
+            PrintStyle.standard(
+                f"Search of {len(queries)} queries returned {sum(len(r) for r in results)} results"
+            )
+            return results
+        except Exception as e:
+            PrintStyle.error(f"Error searching documents: {str(e)}")
+            return [[] for _ in queries]
+
     async def list_documents(self) -> List[str]:
         """
         Get a list of all document URIs in the store.
@@ -366,35 +660,49 @@ class DocumentQueryHelper:
         self.progress_callback(f"Starting Q&A process")
 
         # index document
+        start = time.perf_counter()
         _ = await self.document_get_content(document_uri, True)
-        selected_chunks = {}
-        for question in questions:
-            self.progress_callback(f"Optimizing query: {question}")
-            human_content = f'Search Query: "{question}"'
-            system_content = self.agent.parse_prompt(
-                "fw.document_query.optmimize_query.md"
-            )
+        self.progress_callback(f"Document ready in {time.perf_counter() - start:.2f}s")
+
+        # optimize all queries concurrently, the utility model's rate limiter paces the calls
+        start = time.perf_counter()
+        system_content = self.agent.parse_prompt("fw.document_query.optmimize_query.md")
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+
+        async def optimize(question: str) -> str:
+            async with semaphore:
+                self.progress_callback(f"Optimizing query: {question}")
+                return (
+                    await self.agent.call_utility_model(
+                        system=system_content, message=f'Search Query: "{question}"'
+                    )
+                ).strip()
 
-            optimized_query = (
-                await self.agent.call_utility_model(
-                    system=system_content, message=human_content
-                )
-            ).strip()
+        optimized_queries = list(
+            await asyncio.gather(*[optimize(question) for question in questions])
+        )
+        self.progress_callback(
+            f"Optimized {len(questions)} queries in {time.perf_counter() - start:.2f}s"
+        )
 
+        # one embedding call and one vector search for all queries
+        start = time.perf_counter()
+        for optimized_query in optimized_queries:
             self.progress_callback(f"Searching document with query: {optimized_query}")
-
-            normalized_uri = self.store.normalize_uri(document_uri)
-            chunks = await self.store.search_document(
-                document_uri=normalized_uri,
-                query=optimized_query,
-                limit=100,
-                threshold=DEFAULT_SEARCH_THRESHOLD,
-            )
-
-            self.progress_callback(f"Found {len(chunks)} chunks")
-
+        normalized_uri = self.store.normalize_uri(document_uri)
+        results = await self.store.search_document_multi(
+            document_uri=normalized_uri,
+            queries=optimized_queries,
+            limit=DEFAULT_SEARCH_LIMIT,
+            threshold=DEFAULT_SEARCH_THRESHOLD,
+        )
+        selected_chunks = {}
+        for chunks in results:
             for chunk in chunks:
                 selected_chunks[chunk.metadata["id"]] = chunk
+        self.progress_callback(
+            f"Found {len(selected_chunks)} chunks in {time.perf_counter() - start:.2f}s"
+        )
 
         if not selected_chunks:
             self.progress_callback(f"No relevant content found in the document")
@@ -415,6 +723,7 @@ class DocumentQueryHelper:
         )
         qa_user_message = f"# Document:\n{content}\n\n# Queries:\n{questions_str}"
 
+        start = time.perf_counter()
         ai_response, _reasoning = await self.agent.call_chat_model(
             messages=[
                 SystemMessage(content=qa_system_message),
@@ -422,7 +731,9 @@ class DocumentQueryHelper:
             ]
         )
 
-        self.progress_callback(f"Q&A process completed")
+        self.progress_callback(
+            f"Q&A process completed, answer in {time.perf_counter() - start:.2f}s"
+        )
 
         return True, str(ai_response)
 
@@ -435,44 +746,6 @@ class DocumentQueryHelper:
         mimetype, encoding = mimetypes.guess_type(document_uri)
         mimetype = mimetype or "application/octet-stream"
 
-        if mimetype == "application/octet-stream":
-            if url.scheme in ["http", "https"]:
-                response: aiohttp.ClientResponse | None = None
-                retries = 0
-                last_error = ""
-                while not response and retries < 3:
-                    try:
-                        async with aiohttp.ClientSession() as session:
-                            response = await session.head(
-                                document_uri,
-                                timeout=aiohttp.ClientTimeout(total=2.0),
-                                allow_redirects=True,
-                            )
-                            if response.status > 399:
-                                raise Exception(response.status)
-                            break
-                    except Exception as e:
-                        await asyncio.sleep(1)
-                        last_error = str(e)
-                    retries += 1
-
-                if not response:
-                    raise ValueError(
-                        f"DocumentQueryHelper::document_get_content: Document fetch error: {document_uri} ({last_error})"
-                    )
-
-                mimetype = response.headers["content-type"]
-                if "content-length" in response.headers:
-                    content_length = (
-                        float(response.headers["content-length"]) / 1024 / 1024
-                    )  # MB
-                    if content_length > 50.0:
-                        raise ValueError(
-                            f"Document content length exceeds max. 50MB: {content_length} MB ({document_uri})"
-                        )
-                if mimetype and "; charset=" in mimetype:
-                    mimetype = mimetype.split("; charset=")[0]
-
         if scheme == "file":
             try:
                 document_uri = files.fix_dev_path(url.path)
@@ -484,7 +757,7 @@ class DocumentQueryHelper:
                 f"Compressed documents are unsupported '{encoding}' ({document_uri})"
             )
 
-        if mimetype == "application/octet-stream":
+        if mimetype == "application/octet-stream" and scheme not in ["http", "https"]:
             raise ValueError(
                 f"Unsupported document mimetype '{mimetype}' ({document_uri})"
             )
@@ -493,57 +766,139 @@ class DocumentQueryHelper:
         document_uri_norm = self.store.normalize_uri(document_uri)
 
         exists = await self.store.document_exists(document_uri_norm)
-        document_content = ""
-        if not exists:
-            if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(document_uri, scheme)
-            elif mimetype == "text/html":
-                document_content = self.handle_html_document(document_uri, scheme)
-            elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(document_uri, scheme)
-            elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(document_uri, scheme)
+        version = None
+        file_stat = None
+        fetched: document_fetch.FetchResult | None = None
+        try:
+            if not exists:
+                if scheme in ["http", "https"]:
+                    fetched, version, exists = await self.fetch_web_document(
+                        document_uri, document_uri_norm
+                    )
+                else:
+                    version, file_stat = await self.document_get_version(
+                        document_uri, scheme, document_uri_norm
+                    )
+                    exists = await self.store.load_document(document_uri_norm, version)
+                if exists:
+                    self.progress_callback(f"Loaded indexed document")
+            document_content = ""
+            if not exists:
+                source, source_scheme, charset = document_uri, scheme, "utf-8"
+                if fetched:
+                    # the body is already on disk, extract it from there
+                    source, source_scheme, charset = fetched.path, "file", fetched.charset
+                    if mimetype == "application/octet-stream":
+                        mimetype = fetched.mimetype or mimetype
+                    if mimetype == "application/octet-stream":
+                        raise ValueError(
+                            f"Unsupported document mimetype '{mimetype}' ({document_uri})"
+                        )
+
+                if mimetype.startswith("image/"):
+                    document_content = await self.handle_image_document(
+                        source, source_scheme
+                    )
+                elif mimetype == "text/html":
+                    document_content = await self.handle_html_document(
+                        source, source_scheme, charset
+                    )
+                elif mimetype.startswith("text/") or mimetype == "application/json":
+                    document_content = await self.handle_text_document(
+                        source, source_scheme, charset
+                    )
+                elif mimetype == "application/pdf":
+                    document_content = await self.handle_pdf_document(
+                        source, source_scheme, add_to_db
+                    )
+                else:
+                    document_content = await self.handle_unstructured_document(
+                        source, source_scheme
+                    )
+                if add_to_db:
+                    self.progress_callback(f"Indexing document")
+                    success, ids = await self.store.add_document(
+                        document_content, document_uri_norm, version=version, file_stat=file_stat
+                    )
+                    if not success:
+                        self.progress_callback(f"Failed to index document")
+                        raise ValueError(
+                            f"DocumentQueryHelper::document_get_content: Failed to index document: {document_uri_norm}"
+                        )
+                    self.progress_callback(f"Indexed {len(ids)} chunks")
             else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme
-                )
-            if add_to_db:
-                self.progress_callback(f"Indexing document")
-                success, ids = await self.store.add_document(
-                    document_content, document_uri_norm
-                )
-                if not success:
-                    self.progress_callback(f"Failed to index document")
+                doc = await self.store.get_document(document_uri_norm)
+                if doc:
+                    document_content = doc.page_content
+                else:
                     raise ValueError(
-                        f"DocumentQueryHelper::document_get_content: Failed to index document: {document_uri_norm}"
+                        f"DocumentQueryHelper::document_get_content: Document not found: {document_uri_norm}"
                     )
-                self.progress_callback(f"Indexed {len(ids)} chunks")
-        else:
-            doc = await self.store.get_document(document_uri_norm)
-            if doc:
-                document_content = doc.page_content
-            else:
-                raise ValueError(
-                    f"DocumentQueryHelper::document_get_content: Document not found: {document_uri_norm}"
-                )
-        return document_content
+            return document_content
+        finally:
+            if fetched:
+                fetched.cleanup()
 
-    def handle_image_document(self, document: str, scheme: str) -> str:
-        return self.handle_unstructured_document(document, scheme)
+    async def fetch_web_document(
+        self, document: str, document_uri_norm: str
+    ) -> tuple[document_fetch.FetchResult, str | None, bool]:
+        """Fetch a web document, conditionally when an indexed version of it exists.
 
-    def handle_html_document(self, document: str, scheme: str) -> str:
-        if scheme in ["http", "https"]:
-            loader = AsyncHtmlLoader(web_path=document)
-            parts: list[Document] = loader.load()
-        elif scheme == "file":
-            # Use RFC file operations instead of TextLoader
-            file_content_bytes = files.read_file_bin(document)
-            file_content = file_content_bytes.decode("utf-8")
-            # Create Document manually since we're not using TextLoader
-            parts = [Document(page_content=file_content, metadata={"source": document})]
-        else:
-            raise ValueError(f"Unsupported scheme: {scheme}")
+        Returns the fetch result, the document version and whether the document was loaded
+        from the persistent index, in which case the result has no body.
+        """
+        meta = DocumentIndex.get_meta(document_uri_norm)
+        stored_version = meta.get("version") if meta else None
+        fetched = await document_fetch.fetch(document, stored_version)
+        if fetched.not_modified:
+            if await self.store.load_document(document_uri_norm, stored_version):
+                return fetched, stored_version, True
+            # the index entry is not usable, the body is needed after all
+            fetched = await document_fetch.fetch(document)
+        version = fetched.version
+        try:
+            # servers that ignore conditional requests still report an unchanged version
+            loaded = await self.store.load_document(document_uri_norm, version)
+        except BaseException:
+            fetched.cleanup()
+            raise
+        return fetched, version, loaded
+
+    async def document_get_version(
+        self, document: str, scheme: str, document_uri_norm: str
+    ) -> tuple[str | None, list[int] | None]:
+        """Content hash of a local document and the size and mtime_ns it was hashed at.
+
+        Web documents are versioned by document_fetch. The hash recorded in the persistent
+        index is reused while the file's size and mtime are unchanged, otherwise the file is
+        hashed again in a worker thread.
+        """
+        if scheme != "file":
+            return None, None
+        try:
+            path = files.find_file_in_dirs(document, [])
+            stat = os.stat(path)
+            file_stat = [stat.st_size, stat.st_mtime_ns]
+            meta = DocumentIndex.get_meta(document_uri_norm)
+            if meta and meta.get("version") and meta.get("file_stat") == file_stat:
+                return meta["version"], file_stat
+            version = "sha256:" + await asyncio.to_thread(_file_sha256, path)
+            if meta and meta.get("version") == version:
+                # touched but unchanged, the index entry is still valid
+                await asyncio.to_thread(DocumentIndex.update_meta, document_uri_norm, file_stat=file_stat)
+            return version, file_stat
+        except Exception as e:
+            PrintStyle.error(f"Could not get version of '{document}': {e}")
+        return None, None
+
+    async def handle_image_document(self, document: str, scheme: str) -> str:
+        return await self.handle_unstructured_document(document, scheme)
 
+    async def handle_html_document(
+        self, document: str, scheme: str, charset: str = "utf-8"
+    ) -> str:
+        file_content = await self._read_text(document, scheme, charset)
+        parts = [Document(page_content=file_content, metadata={"source": document})]
         return "\n".join(
             [
                 element.page_content
@@ -551,129 +906,79 @@ class DocumentQueryHelper:
             ]
         )
 
-    def handle_text_document(self, document: str, scheme: str) -> str:
+    async def handle_text_document(
+        self, document: str, scheme: str, charset: str = "utf-8"
+    ) -> str:
+        return await self._read_text(document, scheme, charset)
+
+    async def _read_text(self, document: str, scheme: str, charset: str) -> str:
         if scheme in ["http", "https"]:
-            loader = AsyncHtmlLoader(web_path=document)
-            elements: list[Document] = loader.load()
+            fetched = await document_fetch.fetch(document)
+            try:
+                return files.read_file_bin(fetched.path).decode(fetched.charset)
+            finally:
+                fetched.cleanup()
         elif scheme == "file":
             # Use RFC file operations instead of TextLoader
-            file_content_bytes = files.read_file_bin(document)
-            file_content = file_content_bytes.decode("utf-8")
-            # Create Document manually since we're not using TextLoader
-            elements = [
-                Document(page_content=file_content, metadata={"source": document})
-            ]
+            return files.read_file_bin(document).decode(charset)
         else:
             raise ValueError(f"Unsupported scheme: {scheme}")
 
-        return "\n".join([element.page_content for element in elements])
-
-    def handle_pdf_document(self, document: str, scheme: str) -> str:
-        temp_file_path = ""
+    async def handle_pdf_document(
+        self, document: str, scheme: str, add_to_db: bool = False
+    ) -> str:
+        fetched: document_fetch.FetchResult | None = None
         if scheme == "file":
-            # Use RFC file operations to read the PDF file as binary
-            file_content_bytes = files.read_file_bin(document)
-            # Create a temporary file for PyMuPDFLoader since it needs a file path
-            import tempfile
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(file_content_bytes)
-                temp_file_path = temp_file.name
+            # the extraction workers read local files, fetched documents included, in place
+            file_path = files.get_abs_path(document)
         elif scheme in ["http", "https"]:
-            # download the file from the web url to a temporary file using python libraries for downloading
-            import requests
-            import tempfile
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                response = requests.get(document, timeout=10.0)
-                if response.status_code != 200:
-                    raise ValueError(
-                        f"DocumentQueryHelper::handle_pdf_document: Failed to download PDF from {document}: {response.status_code}"
-                    )
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
+            # streamed to a temporary file by the shared document client
+            fetched = await document_fetch.fetch(document, suffix=".pdf")
+            file_path = fetched.path
         else:
             raise ValueError(f"Unsupported scheme: {scheme}")
 
-        if not os.path.exists(temp_file_path):
+        if not os.path.isfile(file_path):
             raise ValueError(
-                f"DocumentQueryHelper::handle_pdf_document: Temporary file not found: {temp_file_path}"
+                f"DocumentQueryHelper::handle_pdf_document: File not found: {file_path}"
             )
 
         try:
-            try:
-                loader = PyMuPDFLoader(
-                    temp_file_path,
-                    mode="single",
-                    extract_tables="markdown",
-                    extract_images=True,
-                    images_inner_format="text",
-                    images_parser=TesseractBlobParser(),
-                    pages_delimiter="\n",
-                )
-                elements: list[Document] = loader.load()
-                contents = "\n".join([element.page_content for element in elements])
-            except Exception as e:
-                PrintStyle.error(
-                    f"DocumentQueryHelper::handle_pdf_document: Error loading with PyMuPDF: {e}"
-                )
-                contents = ""
-
-            if not contents:
-                import pdf2image
-                import pytesseract
-
-                PrintStyle.debug(
-                    f"DocumentQueryHelper::handle_pdf_document: FALLBACK Converting PDF to images: {temp_file_path}"
-                )
-
-                # Convert PDF to images
-                pages = pdf2image.convert_from_path(temp_file_path)  # type: ignore
-                for page in pages:
-                    contents += pytesseract.image_to_string(page) + "\n\n"
-
+            # pages arrive in order while later ones are still being extracted, chunks that
+            # can no longer change are embedded meanwhile so indexing finishes right after
+            contents = ""
+            split_length = 0
+            warmed = 0
+            prefetches: list[asyncio.Task] = []
+            async for text in document_extract.pdf_pages(file_path):
+                contents += text
+                self.progress_callback(f"Extracted {len(contents)} characters")
+                if add_to_db and len(contents) - split_length >= PREFETCH_TEXT_STEP:
+                    split_length = len(contents)
+                    chunks = await asyncio.to_thread(self.store.split_text, contents)
+                    # the last chunks may still merge with text of the following pages
+                    stable = chunks[warmed : -PREFETCH_UNSTABLE_CHUNKS]
+                    if stable:
+                        warmed += len(stable)
+                        prefetches.append(
+                            asyncio.create_task(self.store.prefetch_embeddings(stable))
+                        )
+            if prefetches:
+                await asyncio.gather(*prefetches)
             return contents
         finally:
-            os.unlink(temp_file_path)
+            if fetched:
+                fetched.cleanup()
 
-    def handle_unstructured_document(self, document: str, scheme: str) -> str:
-        elements: list[Document] = []
+    async def handle_unstructured_document(self, document: str, scheme: str) -> str:
         if scheme in ["http", "https"]:
-            # loader = UnstructuredURLLoader(urls=[document], mode="single")
-            loader = UnstructuredLoader(
-                web_url=document,
-                mode="single",
-                partition_via_api=False,
-                # chunking_strategy="by_page",
-                strategy="hi_res",
-            )
-            elements = loader.load()
-        elif scheme == "file":
-            # Use RFC file operations to read the file as binary
-            file_content_bytes = files.read_file_bin(document)
-            # Create a temporary file for UnstructuredLoader since it needs a file path
-            import tempfile
-            import os
-
-            # Get file extension to preserve it for proper processing
-            _, ext = os.path.splitext(document)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-                temp_file.write(file_content_bytes)
-                temp_file_path = temp_file.name
-
+            fetched = await document_fetch.fetch(document)
             try:
-                loader = UnstructuredLoader(
-                    file_path=temp_file_path,
-                    mode="single",
-                    partition_via_api=False,
-                    # chunking_strategy="by_page",
-                    strategy="hi_res",
-                )
-                elements = loader.load()
+                return await document_extract.unstructured(file_path=fetched.path)
             finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
+                fetched.cleanup()
+        elif scheme == "file":
+            # the extraction workers read local files, fetched documents included, in place
+            return await document_extract.unstructured(file_path=files.get_abs_path(document))
         else:
             raise ValueError(f"Unsupported scheme: {scheme}")
-
-        return "\n".join([element.page_content for element in elements])
@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import List
+
+try:
+    import fcntl
+except ImportError:  # Windows, appends are then only serialized within the process
+    fcntl = None
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from python.helpers.print_style import PrintStyle
+
+# same key scheme as langchain CacheBackedEmbeddings (sha1 -> uuid5), so existing caches can be migrated
+NAMESPACE_UUID = uuid.UUID(int=1985)
+QUERY_KEY_PREFIX = "\x00query\x00"
+
+HEADER_MAGIC = b"A0EMB\x00\x00\x01"
+HEADER_SIZE = 16
+KEY_SIZE = 16
+
+
+def text_key(text: str) -> bytes:
+    sha1_hex = hashlib.sha1(text.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return uuid.uuid5(NAMESPACE_UUID, sha1_hex).bytes
+
+
+class EmbeddingStore:
+    """Append-only single-file vector store.
+
+    `<path>.vec` holds a small header and float32 rows, `<path>.idx` holds one 16-byte key per row
+    in the same order. Existing rows are memory-mapped on load, new rows are appended to both files.
+    Without a path the store only lives in memory.
+
+    Several processes may share the files (subordinate agents use the same memory folder), so
+    loading and appending hold an exclusive lock on `<path>.lock` and every append starts at the
+    end of the last complete row, wherever another process left it. Lookups never wait for that
+    lock, new rows are in memory before they are written.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.dim = 0
+        self._count = 0
+        self._rows: dict[bytes, int] = {}
+        self._mapped: np.ndarray | None = None
+        self._appended: list[np.ndarray] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # file appends of this process, taken before the file lock
+        if path:
+            self._load()
+
+    def __len__(self):
+        return self._count
+
+    def _vec_path(self):
+        return self.path + ".vec"  # type: ignore
+
+    def _idx_path(self):
+        return self.path + ".idx"  # type: ignore
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)  # type: ignore
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as f:  # type: ignore
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _load(self):
+        vec_path, idx_path = self._vec_path(), self._idx_path()
+        if not os.path.exists(vec_path) or not os.path.exists(idx_path):
+            return
+        with self._file_lock():
+            self._load_files(vec_path, idx_path)
+
+    def _load_files(self, vec_path: str, idx_path: str):
+        with open(vec_path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:8] != HEADER_MAGIC:
+            PrintStyle.error(f"Invalid embedding cache file '{vec_path}', starting empty.")
+            os.remove(vec_path)
+            os.remove(idx_path)
+            return
+        self.dim = int.from_bytes(header[8:12], "little")
+
+        with open(idx_path, "rb") as f:
+            keys = f.read()
+
+        count = self._complete_rows(len(keys))
+        for row in range(count):
+            self._rows[keys[row * KEY_SIZE : (row + 1) * KEY_SIZE]] = row
+        self._count = count
+        if count:
+            self._mapped = np.memmap(
+                vec_path, dtype=np.float32, mode="r", offset=HEADER_SIZE, shape=(count, self.dim)
+            )
+
+    def _complete_rows(self, idx_size: int) -> int:
+        # caller holds the file lock, rows are valid only when both the vector and its key were
+        # fully written, an incomplete tail left by a crash is cut off
+        row_bytes = self.dim * 4
+        count = min(idx_size // KEY_SIZE, (os.path.getsize(self._vec_path()) - HEADER_SIZE) // row_bytes)
+        self._truncate(HEADER_SIZE + count * row_bytes, count * KEY_SIZE)
+        return count
+
+    def _truncate(self, vec_size: int, idx_size: int):
+        if os.path.getsize(self._vec_path()) > vec_size:
+            os.truncate(self._vec_path(), vec_size)
+        if os.path.getsize(self._idx_path()) > idx_size:
+            os.truncate(self._idx_path(), idx_size)
+
+    def _row(self, row: int) -> np.ndarray:
+        mapped = len(self._mapped) if self._mapped is not None else 0
+        if row < mapped:
+            return self._mapped[row]  # type: ignore
+        return self._appended[row - mapped]
+
+    def get(self, keys: list[bytes]) -> list[List[float] | None]:
+        with self._lock:
+            result: list[List[float] | None] = []
+            for key in keys:
+                row = self._rows.get(key)
+                result.append(self._row(row).tolist() if row is not None else None)
+            return result
+
+    def put(self, keys: list[bytes], vectors: list[List[float]]):
+        """Add new vectors, blocks while another process appends, use aput on an event loop"""
+        new_keys, new_vectors = self._add(keys, vectors)
+        if new_keys and self.path:
+            with self._write_lock, self._file_lock():
+                self._append_files(new_keys, new_vectors)
+
+    async def aput(self, keys: list[bytes], vectors: list[List[float]]):
+        await asyncio.to_thread(self.put, keys, vectors)
+
+    def _add(self, keys: list[bytes], vectors: list[List[float]]):
+        # adds the vectors not stored yet to memory and returns them
+        with self._lock:
+            new_keys = []
+            new_vectors = []
+            seen = set()
+            for key, vector in zip(keys, vectors):
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_vectors.append(np.asarray(vector, dtype=np.float32))
+            if not new_keys:
+                return new_keys, new_vectors
+
+            if not self.dim:
+                self.dim = len(new_vectors[0])
+            for key, vector in zip(new_keys, new_vectors):
+                self._rows[key] = self._count
+                self._appended.append(vector)
+                self._count += 1
+            return new_keys, new_vectors
+
+    def _append_files(self, keys: list[bytes], vectors: list[np.ndarray]):
+        # caller holds _write_lock and the file lock
+        vec_path, idx_path = self._vec_path(), self._idx_path()
+        if not os.path.exists(vec_path) or os.path.getsize(vec_path) < HEADER_SIZE:
+            with open(vec_path, "wb") as f:
+                f.write(HEADER_MAGIC + self.dim.to_bytes(4, "little") + b"\x00" * 4)
+            open(idx_path, "wb").close()
+        else:
+            # other processes may have appended since, keys must stay paired with their rows
+            self._complete_rows(os.path.getsize(idx_path) if os.path.exists(idx_path) else 0)
+        # vectors first, keys second, a crash in between leaves only an unindexed tail
+        with open(vec_path, "ab") as f:
+            f.write(np.stack(vectors).astype(np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(idx_path, "ab") as f:
+            f.write(b"".join(keys))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def migrate_file_store(self, directory: str, namespace: str) -> int:
+        """Import vectors cached by LocalFileStore (one JSON file per vector) and remove those files.
+
+        Runs under the file lock, a process opening the store at the same time finds the files
+        already migrated.
+        """
+        if not self.path or not os.path.isdir(directory):
+            return 0
+        with self._write_lock, self._file_lock():
+            names = [
+                name
+                for name in os.listdir(directory)
+                if name.startswith(namespace) and len(name) == len(namespace) + 36
+            ]
+            if not names:
+                return 0
+
+            PrintStyle.standard(f"Migrating {len(names)} cached embeddings...")
+            batch_keys, batch_vectors, migrated = [], [], []
+            for name in names:
+                try:
+                    key = uuid.UUID(name[len(namespace) :]).bytes
+                    with open(os.path.join(directory, name), "r") as f:
+                        vector = json.loads(f.read())
+                except Exception:
+                    continue  # not a cache entry, unreadable or gone, leave it alone
+                batch_keys.append(key)
+                batch_vectors.append(vector)
+                migrated.append(name)
+                if len(batch_keys) >= 1000:
+                    self._migrate_batch(batch_keys, batch_vectors)
+                    batch_keys, batch_vectors = [], []
+            self._migrate_batch(batch_keys, batch_vectors)
+
+            # originals are removed only after the store has been written
+            for name in migrated:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass  # removed by a process without file locks
+        return len(migrated)
+
+    def _migrate_batch(self, keys: list[bytes], vectors: list[List[float]]):
+        # caller holds _write_lock and the file lock
+        new_keys, new_vectors = self._add(keys, vectors)
+        if new_keys:
+            self._append_files(new_keys, new_vectors)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves document and query embeddings from an EmbeddingStore."""
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore):
+        self.embeddings = embeddings
+        self.store = store
+
+    def _missing(self, keys: list[bytes]):
+        vectors = self.store.get(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        return vectors, missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [text_key(text) for text in texts]
+        vectors, missing = self._missing(keys)
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.store.put([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors  # type: ignore
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [text_key(text) for text in texts]
+        vectors, missing = self._missing(keys)
+        if missing:
+            computed = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await self.store.aput([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors  # type: ignore
+
+    def embed_query(self, text: str) -> List[float]:
+        key = text_key(QUERY_KEY_PREFIX + text)
+        vector = self.store.get([key])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.store.put([key], [vector])
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = text_key(QUERY_KEY_PREFIX + text)
+        vector = self.store.get([key])[0]
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self.store.aput([key], [vector])
+        return vector
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, the uncached ones in a single model call.
+
+        Query and document embeddings are the same for the models used here, so the batch
+        goes through aembed_documents.
+        """
+        keys = [text_key(QUERY_KEY_PREFIX + text) for text in texts]
+        vectors, missing = self._missing(keys)
+        if len(missing) == 1:
+            vectors[missing[0]] = await self.aembed_query(texts[missing[0]])
+        elif missing:
+            computed = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await self.store.aput([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors  # type: ignore
+
+
+_stores: dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: str, namespace: str) -> EmbeddingStore:
+    """Shared persistent store for a namespace, existing LocalFileStore entries are migrated on first open."""
+    path = os.path.join(directory, namespace)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = EmbeddingStore(path)
+            store.migrate_file_store(directory, namespace)
+            _stores[path] = store
+        return store
@@ -0,0 +1,145 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+MAX_BATCH = 64  # texts per encode call
+MAX_WAIT = 0.003  # seconds to wait for more requests after the first one
+
+
+class EmbeddingWorker:
+    """Runs a blocking encode function in a dedicated thread.
+
+    Requests from any thread or event loop are queued, and whatever arrives within MAX_WAIT
+    of the first one is encoded together in one call, so concurrent chats share a forward pass
+    instead of each blocking its own event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        encode: Callable[[List[str]], List[List[float]]],
+        max_batch: int = MAX_BATCH,
+        max_wait: float = MAX_WAIT,
+    ):
+        self.name = name
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: queue.Queue[tuple[List[str], Future]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "texts": 0,
+            "last_batch": 0,
+            "max_batch": 0,
+            "encode_seconds": 0.0,
+        }
+
+    def submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"Embedding-{self.name}", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((list(texts), future))
+        return future
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.submit(texts).result()
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch"] = stats["texts"] / stats["batches"] if stats["batches"] else 0
+        return stats
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: list[tuple[List[str], Future]]):
+        # drop requests cancelled while queued, the rest can no longer be cancelled
+        batch = [(request, future) for request, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request, _ in batch for text in request]
+        count = len(texts)
+        start = time.perf_counter()
+        try:
+            vectors = self.encode(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["texts"] += count
+                self._stats["last_batch"] = count
+                self._stats["max_batch"] = max(self._stats["max_batch"], count)
+                self._stats["encode_seconds"] += time.perf_counter() - start
+
+        offset = 0
+        for request, future in batch:
+            future.set_result(vectors[offset : offset + len(request)])
+            offset += len(request)
+
+
+_workers: dict[str, EmbeddingWorker] = {}
+_workers_lock = threading.Lock()
+_load_lock = threading.Lock()
+
+
+def get_worker(name: str, load: Callable[[], Callable[[List[str]], List[List[float]]]]) -> EmbeddingWorker:
+    """The worker of a model, created with the encode function returned by load on first use.
+
+    There is one worker per model name in the process, so every caller shares its batches and
+    the model load() loaded.
+    """
+    with _workers_lock:
+        worker = _workers.get(name)
+    if worker:
+        return worker
+    with _load_lock:  # loading may take seconds, stats stay available meanwhile
+        with _workers_lock:
+            worker = _workers.get(name)
+        if worker is None:
+            worker = EmbeddingWorker(name, load())
+            with _workers_lock:
+                _workers[name] = worker
+        return worker
+
+
+def get_stats() -> dict[str, dict]:
+    """Queue depth and batch size metrics of all embedding workers."""
+    with _workers_lock:
+        workers = list(_workers.values())
+    return {worker.name: worker.stats() for worker in workers}
@@ -5,6 +5,7 @@ from python.helpers.print_style import PrintStyle
 try:
     from fasta2a.client import A2AClient  # type: ignore
     import httpx  # type: ignore
+    from python.helpers import a2a_http
     FASTA2A_CLIENT_AVAILABLE = True
 except ImportError:
     FASTA2A_CLIENT_AVAILABLE = False
@@ -12,6 +13,9 @@ except ImportError:
 
 _PRINTER = PrintStyle(italic=True, font_color="cyan", padding=False)
 
+POLL_MIN_INTERVAL = 0.25  # first wait between task status checks, grows by POLL_BACKOFF
+POLL_BACKOFF = 1.5
+
 
 class AgentConnection:
     """Helper class for connecting to and communicating with other Agent Zero instances via FastA2A."""
@@ -40,7 +44,8 @@ class AgentConnection:
         if token:
             headers["Authorization"] = f"Bearer {token}"
             headers["X-API-KEY"] = token
-        self._http_client = httpx.AsyncClient(timeout=timeout, headers=headers)  # type: ignore
+        # Connections are pooled per process and kept alive between connections to the same agent
+        self._http_client = a2a_http.client(timeout=timeout, headers=headers)
         self._a2a_client = A2AClient(base_url=self.agent_url, http_client=self._http_client)  # type: ignore
         self._agent_card: Optional[Dict[str, Any]] = None
         # Track conversation context automatically
@@ -145,18 +150,22 @@ class AgentConnection:
     async def wait_for_completion(self, task_id: str, poll_interval: int = 2, max_wait: int = 300) -> Dict[str, Any]:
         """Wait for a task to complete and return the final result.
 
+        The first checks follow each other closely, the interval then grows up to poll_interval.
+
         Args:
             task_id: The ID of the task to wait for
-            poll_interval: How often to check task status (seconds)
+            poll_interval: Longest time between task status checks (seconds)
             max_wait: Maximum time to wait (seconds)
 
         Returns:
             Dictionary containing the completed task information
         """
         import asyncio
+        import time
 
-        waited = 0
-        while waited < max_wait:
+        deadline = time.monotonic() + max_wait
+        interval = min(POLL_MIN_INTERVAL, poll_interval)
+        while True:
             task_info = await self.get_task(task_id)
 
             if 'result' in task_info:
@@ -170,8 +179,11 @@ class AgentConnection:
                 else:
                     _PRINTER.print(f"Task {task_id} status: {state}")
 
-            await asyncio.sleep(poll_interval)
-            waited += poll_interval
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * POLL_BACKOFF, poll_interval)
 
         raise TimeoutError(f"Task {task_id} did not complete within {max_wait} seconds")
 
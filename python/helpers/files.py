@@ -13,6 +13,8 @@ import importlib
 import importlib.util
 import inspect
 import glob
+import threading
+import time
 
 
 class VariablesPlugin(ABC):
@@ -37,10 +39,7 @@ def load_plugin_variables(file: str, backup_dirs: list[str] | None = None) -> di
         plugin_file = None
 
     if plugin_file and exists(plugin_file):
-        
-        from python.helpers import extract_tools
-        classes = extract_tools.load_classes_from_file(plugin_file, VariablesPlugin, one_per_file=False)
-        for cls in classes:
+        for cls in _get_plugin_classes(plugin_file):
             return cls().get_variables(file, backup_dirs) # type: ignore < abstract class here is ok, it is always a subclass
 
         # load python code and extract variables variables from it
@@ -69,9 +68,125 @@ def load_plugin_variables(file: str, backup_dirs: list[str] | None = None) -> di
         #         return cls[1]().get_variables()  # type: ignore
     return {}
 
+
+# plugin classes by plugin file, reloaded when the file changes
+_plugin_cache: dict[str, tuple[int, list[type[VariablesPlugin]]]] = {}
+
+
+def _get_plugin_classes(plugin_file: str) -> list[type[VariablesPlugin]]:
+    mtime = os.stat(plugin_file).st_mtime_ns
+    cached = _plugin_cache.get(plugin_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    from python.helpers import extract_tools
+    classes = extract_tools.load_classes_from_file(plugin_file, VariablesPlugin, one_per_file=False)
+    _plugin_cache[plugin_file] = (mtime, classes)
+    return classes
+
 from python.helpers.strings import sanitize_string
 
 
+# compiled prompt templates: the file content split into literal text, placeholders and includes
+# keyed by (absolute path, encoding, code fences removed), validated by file mtime and size
+_TEMPLATE_TOKENS = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}|{{([^{}]+?)}}")
+_INCLUDE = 0
+_PLACEHOLDER = 1
+_template_cache: dict[tuple[str, str, bool], tuple[tuple[int, int], bool, list]] = {}
+_template_watcher: threading.Thread | None = None
+
+
+def _file_signature(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _compile_template(content: str, is_json: bool) -> list:
+    segments: list = []
+    pos = 0
+    for match in _TEMPLATE_TOKENS.finditer(content):
+        if match.start() > pos:
+            segments.append(content[pos : match.start()])
+        if match.group(1) is not None:
+            # includes are not processed in json templates
+            if is_json or os.path.isabs(match.group(1)):
+                segments.append(match.group(0))
+            else:
+                segments.append((_INCLUDE, match.group(1)))
+        else:
+            segments.append((_PLACEHOLDER, match.group(2), match.group(0)))
+        pos = match.end()
+    if pos < len(content):
+        segments.append(content[pos:])
+    return segments
+
+
+def _get_template(absolute_path: str, encoding: str, strip_fences: bool) -> tuple[bool, list]:
+    key = (absolute_path, encoding, strip_fences)
+    cached = _template_cache.get(key)
+    # with the watcher running, stale entries are dropped by the watcher instead
+    if cached and (_template_watcher is not None or cached[0] == _file_signature(absolute_path)):
+        return cached[1], cached[2]
+
+    signature = _file_signature(absolute_path)
+    with open(absolute_path, "r", encoding=encoding) as f:
+        content = f.read()
+    is_json = strip_fences and is_full_json_template(content)
+    if strip_fences:
+        content = remove_code_fences(content)
+    segments = _compile_template(content, is_json)
+    _template_cache[key] = (signature, is_json, segments)
+    return is_json, segments
+
+
+def _render_template(segments: list, variables: dict, to_str, base_path: str, backup_dirs: list[str], include_kwargs: dict) -> str:
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+        elif segment[0] == _PLACEHOLDER:
+            if segment[1] in variables:
+                parts.append(to_str(variables[segment[1]]))
+            else:
+                parts.append(segment[2])
+        else:
+            # resolve the include relative to the base path, then backup dirs
+            full_include_path = find_file_in_dirs(
+                os.path.join(base_path, segment[1]), backup_dirs
+            )
+            # here we use kwargs, the plugin variables are not inherited
+            parts.append(read_prompt_file(full_include_path, backup_dirs, **include_kwargs))
+    return "".join(parts)
+
+
+def clear_prompt_cache():
+    _template_cache.clear()
+    _plugin_cache.clear()
+
+
+def watch_prompt_templates(interval: float = 1.0):
+    """Start a background thread that drops compiled templates when their files change.
+
+    While the watcher runs, rendering a cached template skips the per-call stat of the file.
+    """
+    global _template_watcher
+    if _template_watcher is not None:
+        return
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            for key, cached in list(_template_cache.items()):
+                try:
+                    changed = _file_signature(key[0]) != cached[0]
+                except OSError:
+                    changed = True
+                if changed:
+                    _template_cache.pop(key, None)
+
+    _template_watcher = threading.Thread(target=watch, name="PromptWatcher", daemon=True)
+    _template_watcher.start()
+
+
 def parse_file(_relative_path, _backup_dirs=None, _encoding="utf-8", **kwargs):
     if _backup_dirs is None:
         _backup_dirs = []
@@ -79,28 +194,20 @@ def parse_file(_relative_path, _backup_dirs=None, _encoding="utf-8", **kwargs):
     # Try to get the absolute path for the file from the original directory or backup directories
     absolute_path = find_file_in_dirs(_relative_path, _backup_dirs)
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
-    
-    is_json = is_full_json_template(content)
-    content = remove_code_fences(content)
+    # Compiled template, code fences removed
+    is_json, segments = _get_template(absolute_path, _encoding, True)
+
     variables = load_plugin_variables(_relative_path, _backup_dirs) or {}  # type: ignore
     variables.update(kwargs)
     if is_json:
-        content = replace_placeholders_json(content, **variables)
+        content = _render_template(segments, variables, json.dumps, "", _backup_dirs, kwargs)
         obj = json.loads(content)
-        # obj = replace_placeholders_dict(obj, **variables)
         return obj
     else:
-        content = replace_placeholders_text(content, **variables)
-        # Process include statements
-        content = process_includes(
-            # here we use kwargs, the plugin variables are not inherited
-            content, os.path.dirname(_relative_path), _backup_dirs, **kwargs
+        # Replace placeholders and process include statements in one pass
+        return _render_template(
+            segments, variables, str, os.path.dirname(_relative_path), _backup_dirs, kwargs
         )
-        return content
 
 
 def read_prompt_file(_relative_path, _backup_dirs=None, _encoding="utf-8", **kwargs):
@@ -110,25 +217,17 @@ def read_prompt_file(_relative_path, _backup_dirs=None, _encoding="utf-8", **kwa
     # Try to get the absolute path for the file from the original directory or backup directories
     absolute_path = find_file_in_dirs(_relative_path, _backup_dirs)
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    # Compiled template of the raw file content
+    _, segments = _get_template(absolute_path, _encoding, False)
 
     variables = load_plugin_variables(_relative_path, _backup_dirs) or {}  # type: ignore
     variables.update(kwargs)
 
-    # Replace placeholders with values from kwargs
-    content = replace_placeholders_text(content, **variables)
-
-    # Process include statements
-    content = process_includes(
-        # here we use kwargs, the plugin variables are not inherited
-        content, os.path.dirname(_relative_path), _backup_dirs, **kwargs
+    # Replace placeholders and process include statements in one pass
+    return _render_template(
+        segments, variables, str, os.path.dirname(_relative_path), _backup_dirs, kwargs
     )
 
-    return content
-
 
 def read_file(relative_path:str, backup_dirs:list[str]|None=None, encoding="utf-8"):
     if backup_dirs is None:
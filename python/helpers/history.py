@@ -128,20 +128,43 @@ class Message(Record):
 class Topic(Record):
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
+        self._summary: str = ""
+        self._summary_tokens: int | None = None
+        self._messages_tokens: int | None = 0  # running total, None when it needs recounting
         self.messages: list[Message] = []
 
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, value: str):
+        self._summary = value
+        self._summary_tokens = None
+        self.history._invalidate_tokens()
+
     def get_tokens(self):
         if self.summary:
-            return tokens.approximate_tokens(self.summary)
+            if self._summary_tokens is None:
+                self._summary_tokens = tokens.approximate_tokens(self.summary)
+            return self._summary_tokens
         else:
-            return sum(msg.get_tokens() for msg in self.messages)
+            if self._messages_tokens is None:
+                self._messages_tokens = sum(msg.get_tokens() for msg in self.messages)
+            return self._messages_tokens
+
+    def invalidate_messages_tokens(self):
+        # call after messages were replaced or summarized in place
+        self._messages_tokens = None
+        self.history._invalidate_tokens()
 
     def add_message(
         self, ai: bool, content: MessageContent, tokens: int = 0
     ) -> Message:
         msg = Message(ai=ai, content=content, tokens=tokens)
         self.messages.append(msg)
+        if self._messages_tokens is not None:
+            self._messages_tokens += msg.get_tokens()
         return msg
 
     def output(self) -> list[OutputMessage]:
@@ -191,6 +214,7 @@ class Topic(Record):
                 )
                 msg.set_summary(_json_dumps(trunc))
 
+            self.invalidate_messages_tokens()
             return True
         return False
 
@@ -211,6 +235,7 @@ class Topic(Record):
             )
             sum_msg = Message(False, sum_msg_content)
             self.messages[1 : cnt_to_sum + 1] = [sum_msg]
+            self.invalidate_messages_tokens()
             return True
         return False
 
@@ -239,19 +264,34 @@ class Topic(Record):
         topic.messages = [
             Message.from_dict(m, history=history) for m in data.get("messages", [])
         ]
+        topic.invalidate_messages_tokens()
         return topic
 
 
 class Bulk(Record):
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
+        self._summary: str = ""
+        self._summary_tokens: int | None = None
         self.records: list[Record] = []
 
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, value: str):
+        self._summary = value
+        self._summary_tokens = None
+        self.history._invalidate_tokens()
+
     def get_tokens(self):
         if self.summary:
-            return tokens.approximate_tokens(self.summary)
+            if self._summary_tokens is None:
+                self._summary_tokens = tokens.approximate_tokens(self.summary)
+            return self._summary_tokens
         else:
+            # records cache their own counts
             return sum([r.get_tokens() for r in self.records])
 
     def output(
@@ -295,11 +335,21 @@ class History(Record):
     def __init__(self, agent):
         from agent import Agent
 
+        # token ledger, totals of bulks and topics, None when they need recounting
+        self._bulks_tokens: int | None = 0
+        self._topics_tokens: int | None = 0
+        # bumped on every change other than appending messages or topics, see persist_chat
+        self.revision = 0
         self.bulks: list[Bulk] = []
         self.topics: list[Topic] = []
         self.current = Topic(history=self)
         self.agent: Agent = agent
 
+    def _invalidate_tokens(self):
+        self._bulks_tokens = None
+        self._topics_tokens = None
+        self.revision += 1
+
     def get_tokens(self) -> int:
         return (
             self.get_bulks_tokens()
@@ -313,10 +363,14 @@ class History(Record):
         return total > limit
 
     def get_bulks_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.bulks)
+        if self._bulks_tokens is None:
+            self._bulks_tokens = sum(record.get_tokens() for record in self.bulks)
+        return self._bulks_tokens
 
     def get_topics_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.topics)
+        if self._topics_tokens is None:
+            self._topics_tokens = sum(record.get_tokens() for record in self.topics)
+        return self._topics_tokens
 
     def get_current_topic_tokens(self) -> int:
         return self.current.get_tokens()
@@ -328,6 +382,8 @@ class History(Record):
 
     def new_topic(self):
         if self.current.messages:
+            if self._topics_tokens is not None:
+                self._topics_tokens += self.current.get_tokens()
             self.topics.append(self.current)
             self.current = Topic(history=self)
 
@@ -343,6 +399,7 @@ class History(Record):
         history.bulks = [Bulk.from_dict(b, history=history) for b in data["bulks"]]
         history.topics = [Topic.from_dict(t, history=history) for t in data["topics"]]
         history.current = Topic.from_dict(data["current"], history=history)
+        history._invalidate_tokens()
         return history
 
     def to_dict(self):
@@ -408,6 +465,7 @@ class History(Record):
                 await bulk.summarize()
             self.bulks.append(bulk)
             self.topics.remove(topic)
+            self._invalidate_tokens()
             return True
         return False
 
@@ -417,6 +475,7 @@ class History(Record):
         # remove oldest bulk if necessary
         if not compressed:
             self.bulks.pop(0)
+            self._invalidate_tokens()
             return True
         return compressed
 
@@ -432,6 +491,7 @@ class History(Record):
             ]
         )
         self.bulks = bulks
+        self._invalidate_tokens()
         return True
 
     async def merge_bulks(self, bulks: list[Bulk]) -> Bulk:
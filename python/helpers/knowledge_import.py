@@ -1,7 +1,9 @@
+import asyncio
 import glob
 import os
 import hashlib
-from typing import Any, Dict, Literal, TypedDict
+import json
+from typing import Any, Awaitable, Callable, Dict, Literal, TypedDict
 from langchain_community.document_loaders import (
     CSVLoader,
     PyPDFLoader,
@@ -10,14 +12,33 @@ from langchain_community.document_loaders import (
 )
 from python.helpers.log import LogItem
 from python.helpers.print_style import PrintStyle
+from python.helpers import document_extract
 
 text_loader_kwargs = {"autodetect_encoding": True}
 
+# Mapping file extensions to corresponding loader classes
+# Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
+file_types_loaders = {
+    "txt": TextLoader,
+    "pdf": PyPDFLoader,
+    "csv": CSVLoader,
+    "html": UnstructuredHTMLLoader,
+    "json": TextLoader,  # Use TextLoader for better consolidation compatibility
+    "md": TextLoader,    # Use TextLoader for better consolidation compatibility
+}
+
+# file types parsed in the process pool, small text files are cheaper to load in a thread
+POOL_FILE_TYPES = ["pdf", "html"]
+POOL_MIN_BYTES = 1024 * 1024
+
 
 class KnowledgeImport(TypedDict):
     file: str
     checksum: str
+    size: int
+    mtime: float
     ids: list[str]
+    chunks: list[str]  # chunk hashes, parallel to ids
     state: Literal["changed", "original", "removed"]
     documents: list[Any]
 
@@ -30,31 +51,70 @@ def calculate_checksum(file_path: str) -> str:
     return hasher.hexdigest()
 
 
-def load_knowledge(
+def chunk_hash(doc: Any) -> str:
+    content = doc.page_content + "\x00" + json.dumps(doc.metadata, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def diff_chunks(
+    file_data: KnowledgeImport,
+) -> tuple[list[str], list[str | None], list[Any], list[str]]:
+    """Match the loaded documents of a changed file against its indexed chunks.
+
+    Returns the hash of every document, its existing id or None when it is new, the new
+    documents in order, and the ids of indexed chunks that no longer exist.
+    """
+    old_ids = file_data.get("ids", [])
+    old_chunks = file_data.get("chunks", [])
+    existing: dict[str, list[str]] = {}
+    if len(old_chunks) == len(old_ids):  # indexes from before chunk hashes replace everything
+        for chunk, id in zip(old_chunks, old_ids):
+            existing.setdefault(chunk, []).append(id)
+
+    hashes = [chunk_hash(doc) for doc in file_data["documents"]]
+    ids: list[str | None] = []
+    new_docs = []
+    for chunk, doc in zip(hashes, file_data["documents"]):
+        matches = existing.get(chunk)
+        if matches:
+            ids.append(matches.pop(0))
+        else:
+            ids.append(None)
+            new_docs.append(doc)
+    kept = {id for id in ids if id}
+    vanished = [id for id in old_ids if id not in kept]
+    return hashes, ids, new_docs, vanished
+
+
+def _load_file(file_path: str, ext: str, checksum: str) -> tuple[str, list[Any] | None]:
+    """Hash a file and load and split it when the checksum differs, runs in a worker."""
+    new_checksum = calculate_checksum(file_path)
+    if new_checksum == checksum:
+        return new_checksum, None
+    loader = file_types_loaders[ext](
+        file_path,
+        **(text_loader_kwargs if ext in ["txt", "csv", "html", "md"] else {}),
+    )
+    return new_checksum, loader.load_and_split()
+
+
+async def load_knowledge(
     log_item: LogItem | None,
     knowledge_dir: str,
     index: Dict[str, KnowledgeImport],
     metadata: dict[str, Any] = {},
     filename_pattern: str = "**/*",
+    on_loaded: Callable[[KnowledgeImport], Awaitable[None]] | None = None,
 ) -> Dict[str, KnowledgeImport]:
     """
     Load knowledge files from a directory with change detection and metadata enhancement.
 
-    This function now includes enhanced error handling and compatibility with the
-    intelligent memory consolidation system.
+    Files whose size and mtime match the index are taken as unchanged without reading them.
+    The others are hashed, loaded and split concurrently, PDF, HTML and large files in the
+    extraction process pool, and each changed file is passed to on_loaded as soon as its
+    documents are ready.
     """
 
-    # Mapping file extensions to corresponding loader classes
-    # Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
-    file_types_loaders = {
-        "txt": TextLoader,
-        "pdf": PyPDFLoader,
-        "csv": CSVLoader,
-        "html": UnstructuredHTMLLoader,
-        "json": TextLoader,  # Use TextLoader for better consolidation compatibility
-        "md": TextLoader,    # Use TextLoader for better consolidation compatibility
-    }
-
     cnt_files = 0
     cnt_docs = 0
 
@@ -113,6 +173,48 @@ def load_knowledge(
                 progress=f"\nFound {len(kn_files)} knowledge files in {knowledge_dir}, processing...",
             )
 
+    async def process(file_path: str, ext: str, file_data: KnowledgeImport, stat: os.stat_result):
+        try:
+            args = (file_path, ext, file_data.get("checksum", ""))
+            if ext in POOL_FILE_TYPES or stat.st_size >= POOL_MIN_BYTES:
+                result = asyncio.wrap_future(document_extract.get_pool().submit(_load_file, *args))
+            else:
+                result = asyncio.to_thread(_load_file, *args)
+            checksum, documents = await result
+        except Exception as e:
+            PrintStyle(font_color="red").print(f"Error loading {file_path}: {e}")
+            if log_item:
+                log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {e}")
+            if file_path in index:
+                index[file_path]["state"] = "original"  # keep the previous version, retried next time
+            return None
+
+        file_data["size"] = stat.st_size
+        file_data["mtime"] = stat.st_mtime
+        if documents is None:
+            file_data["state"] = "original"
+        else:
+            # Enhanced metadata for better consolidation compatibility
+            enhanced_metadata = {
+                **metadata,
+                "source_file": os.path.basename(file_path),
+                "source_path": file_path,
+                "file_type": ext,
+                "knowledge_source": True,  # Flag to distinguish from conversation memories
+                "import_timestamp": None,  # Will be set when inserted into memory
+            }
+
+            # Apply metadata to all documents
+            for doc in documents:
+                doc.metadata = {**doc.metadata, **enhanced_metadata}
+
+            file_data["checksum"] = checksum
+            file_data["state"] = "changed"
+            file_data["documents"] = documents
+        index[file_path] = file_data
+        return file_data
+
+    loads = []
     for file_path in kn_files:
         try:
             # Get file extension safely
@@ -124,74 +226,45 @@ def load_knowledge(
             if ext not in file_types_loaders:
                 continue  # Skip unsupported file types
 
-            checksum = calculate_checksum(file_path)
-            if not checksum:
-                continue  # Skip files with checksum errors
-
+            stat = os.stat(file_path)
             file_key = file_path
 
             # Load existing data from the index or create a new entry
             file_data: KnowledgeImport = index.get(file_key, {
                 "file": file_key,
                 "checksum": "",
+                "size": -1,
+                "mtime": -1,
                 "ids": [],
+                "chunks": [],
                 "state": "changed",
                 "documents": []
             })
 
-            # Check if file has changed
-            if file_data.get("checksum") == checksum:
+            # Unchanged size and mtime, skip hashing
+            if (
+                file_data.get("checksum")
+                and file_data.get("size") == stat.st_size
+                and file_data.get("mtime") == stat.st_mtime
+            ):
                 file_data["state"] = "original"
-            else:
-                file_data["state"] = "changed"
-
-            # Process changed files
-            if file_data["state"] == "changed":
-                file_data["checksum"] = checksum
-                loader_cls = file_types_loaders[ext]
-
-                try:
-                    loader = loader_cls(
-                        file_path,
-                        **(
-                            text_loader_kwargs
-                            if ext in ["txt", "csv", "html", "md"]
-                            else {}
-                        ),
-                    )
-                    documents = loader.load_and_split()
-
-                    # Enhanced metadata for better consolidation compatibility
-                    enhanced_metadata = {
-                        **metadata,
-                        "source_file": os.path.basename(file_path),
-                        "source_path": file_path,
-                        "file_type": ext,
-                        "knowledge_source": True,  # Flag to distinguish from conversation memories
-                        "import_timestamp": None,  # Will be set when inserted into memory
-                    }
-
-                    # Apply metadata to all documents
-                    for doc in documents:
-                        doc.metadata = {**doc.metadata, **enhanced_metadata}
-
-                    file_data["documents"] = documents
-                    cnt_files += 1
-                    cnt_docs += len(documents)
-
-                except Exception as e:
-                    PrintStyle(font_color="red").print(f"Error loading {file_path}: {e}")
-                    if log_item:
-                        log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {e}")
-                    continue
-
-            # Update the index
-            index[file_key] = file_data
+                index[file_key] = file_data
+                continue
+
+            loads.append(process(file_path, ext, file_data, stat))
 
         except Exception as e:
             PrintStyle(font_color="red").print(f"Error processing {file_path}: {e}")
             continue
 
+    for load in asyncio.as_completed(loads):
+        file_data = await load
+        if file_data and file_data["state"] == "changed":
+            cnt_files += 1
+            cnt_docs += len(file_data["documents"])
+            if on_loaded:
+                await on_loaded(file_data)
+
     # Mark removed files
     current_files = set(kn_files)
     for file_key, file_data in list(index.items()):
@@ -17,6 +17,12 @@ from typing import (
 )
 import threading
 import asyncio
+import atexit
+import itertools
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
 from contextlib import AsyncExitStack
 from shutil import which
 from datetime import timedelta
@@ -28,8 +34,10 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
 from mcp.shared.message import SessionMessage
-from mcp.types import CallToolResult, ListToolsResult
+from mcp.types import CONNECTION_CLOSED, CallToolResult, ListToolsResult
+import anyio
 from anyio.streams.memory import (
     MemoryObjectReceiveStream,
     MemoryObjectSendStream,
@@ -41,6 +49,17 @@ from python.helpers.print_style import PrintStyle
 from python.helpers.tool import Tool, Response
 
 
+# Version of all servers' tools and descriptions, a new number from the counter on every change.
+# Lets MCPConfig reuse its tool catalog until something changes.
+_tools_versions = itertools.count(1)
+_tools_version = next(_tools_versions)
+
+
+def _tools_changed():
+    global _tools_version
+    _tools_version = next(_tools_versions)
+
+
 def normalize_name(name: str) -> str:
     # Lowercase and strip whitespace
     name = name.strip().lower()
@@ -244,13 +263,23 @@ class MCPServerRemote(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_metrics(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_metrics()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # not under the lock, concurrent calls share the client's session
+        return await client.call_tool(tool_name, input_data)  # type: ignore
+
+    def close(self):
+        """Shut down the server's session, when it is replaced or removed"""
+        with self.__lock:
+            self.__client.close()  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerRemote":
         with self.__lock:
@@ -272,6 +301,7 @@ class MCPServerRemote(BaseModel):
                         key = "url"  # remap serverUrl to url
 
                     setattr(self, key, value)
+            _tools_changed()  # name or description may have changed
             # We already run in an event loop, dont believe Pylance
             return asyncio.run(self.__on_update())
 
@@ -321,13 +351,23 @@ class MCPServerLocal(BaseModel):
         with self.__lock:
             return self.__client.has_tool(tool_name)  # type: ignore
 
+    def get_metrics(self) -> dict[str, Any]:
+        with self.__lock:
+            return self.__client.get_metrics()  # type: ignore
+
     async def call_tool(
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # not under the lock, concurrent calls share the client's session
+        return await client.call_tool(tool_name, input_data)  # type: ignore
+
+    def close(self):
+        """Shut down the server's session, when it is replaced or removed"""
+        with self.__lock:
+            self.__client.close()  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerLocal":
         with self.__lock:
@@ -348,6 +388,7 @@ class MCPServerLocal(BaseModel):
                     if key == "name":
                         value = normalize_name(value)
                     setattr(self, key, value)
+            _tools_changed()  # name or description may have changed
             # We already run in an event loop, dont believe Pylance
             return asyncio.run(self.__on_update())
 
@@ -365,12 +406,20 @@ MCPServer = Annotated[
 ]
 
 
+@dataclass
+class _ToolCatalog:
+    version: int
+    tools: dict[str, Any] = field(default_factory=dict)  # "server.tool" -> owning server
+    prompts: dict[str, str] = field(default_factory=dict)  # server name filter -> rendered prompt
+
+
 class MCPConfig(BaseModel):
     servers: list[MCPServer] = Field(default_factory=list)
     disconnected_servers: list[dict[str, Any]] = Field(default_factory=list)
     __lock: ClassVar[threading.Lock] = PrivateAttr(default=threading.Lock())
     __instance: ClassVar[Any] = PrivateAttr(default=None)
     __initialized: ClassVar[bool] = PrivateAttr(default=False)
+    __catalog: ClassVar[_ToolCatalog | None] = None
 
     @classmethod
     def get_instance(cls) -> "MCPConfig":
@@ -387,6 +436,9 @@ class MCPConfig(BaseModel):
     @classmethod
     def update(cls, config_str: str) -> Any:
         with cls.__lock:
+            # sessions of the current servers are not reused by the new ones
+            for server in cls.get_instance().servers:
+                server.close()
             servers_data: List[Dict[str, Any]] = []  # Default to empty list
 
             if (
@@ -511,6 +563,8 @@ class MCPConfig(BaseModel):
         #         f"MCPConfig.__init__ received servers_list: {servers_list}"
         #     )
 
+        _tools_changed()
+
         # This empties the servers list if MCPConfig is a Pydantic model and servers is a field.
         # If servers is a field like `servers: List[MCPServer] = Field(default_factory=list)`,
         # then super().__init__() might try to initialize it.
@@ -642,6 +696,7 @@ class MCPConfig(BaseModel):
                         "error": error,
                         "tool_count": tool_count,
                         "has_log": has_log,
+                        "metrics": server.get_metrics(),
                     }
                 )
 
@@ -654,6 +709,7 @@ class MCPConfig(BaseModel):
                         "error": disconnected["error"],
                         "tool_count": 0,
                         "has_log": False,
+                        "metrics": {},
                     }
                 )
 
@@ -690,13 +746,29 @@ class MCPConfig(BaseModel):
                     tools.append({f"{server.name}.{tool['name']}": tool_copy})
             return tools
 
+    def _get_catalog(self) -> _ToolCatalog:
+        """Tool index and rendered prompts, rebuilt only after tools or servers changed"""
+        with self.__lock:
+            catalog = MCPConfig.__catalog
+            version = _tools_version  # read before the tools, a change meanwhile bumps it again
+            if catalog is None or catalog.version != version:
+                catalog = _ToolCatalog(version=version)
+                for server in self.servers:
+                    for tool in server.get_tools():
+                        catalog.tools[f"{server.name}.{tool['name']}"] = server
+                MCPConfig.__catalog = catalog
+            return catalog
+
     def get_tools_prompt(self, server_name: str = "") -> str:
         """Get a prompt for all tools"""
+        # waits for pending initialization
+        catalog = self._get_catalog()
+        prompt = catalog.prompts.get(server_name)
+        if prompt is None:
+            prompt = catalog.prompts[server_name] = self._render_tools_prompt(server_name)
+        return prompt
 
-        # just to wait for pending initialization
-        with self.__lock:
-            pass
-
+    def _render_tools_prompt(self, server_name: str) -> str:
         prompt = '## "Remote (MCP Server) Agent Tools" available:\n\n'
         server_names = []
         for server in self.servers:
@@ -706,54 +778,35 @@ class MCPConfig(BaseModel):
         if server_name and server_name not in server_names:
             raise ValueError(f"Server {server_name} not found")
 
+        parts = [prompt]
         for server in self.servers:
             if server.name in server_names:
                 server_name = server.name
-                prompt += f"### {server_name}\n"
-                prompt += f"{server.description}\n"
+                parts.append(f"### {server_name}\n{server.description}\n")
                 tools = server.get_tools()
 
                 for tool in tools:
-                    prompt += (
-                        f"\n### {server_name}.{tool['name']}:\n"
-                        f"{tool['description']}\n\n"
-                        # f"#### Categories:\n"
-                        # f"* kind: MCP Server Tool\n"
-                        # f'* server: "{server_name}" ({server.description})\n\n'
-                        # f"#### Arguments:\n"
-                    )
-
                     input_schema = (
                         json.dumps(tool["input_schema"]) if tool["input_schema"] else ""
                     )
-
-                    prompt += f"#### Input schema for tool_args:\n{input_schema}\n"
-
-                    prompt += "\n"
-
-                    prompt += (
+                    parts.append(
+                        f"\n### {server_name}.{tool['name']}:\n"
+                        f"{tool['description']}\n\n"
+                        f"#### Input schema for tool_args:\n{input_schema}\n"
+                        f"\n"
                         f"#### Usage:\n"
                         f"{{\n"
-                        # f'    "observations": ["..."],\n' # TODO: this should be a prompt file with placeholders
                         f'    "thoughts": ["..."],\n'
-                        # f'    "reflection": ["..."],\n' # TODO: this should be a prompt file with placeholders
                         f"    \"tool_name\": \"{server_name}.{tool['name']}\",\n"
                         f'    "tool_args": !follow schema above\n'
                         f"}}\n"
                     )
 
-        return prompt
+        return "".join(parts)
 
     def has_tool(self, tool_name: str) -> bool:
         """Check if a tool is available"""
-        if "." not in tool_name:
-            return False
-        server_name_part, tool_name_part = tool_name.split(".")
-        with self.__lock:
-            for server in self.servers:
-                if server.name == server_name_part:
-                    return server.has_tool(tool_name_part)
-            return False
+        return tool_name in self._get_catalog().tools
 
     def get_tool(self, agent: Any, tool_name: str) -> MCPTool | None:
         if not self.has_tool(tool_name):
@@ -764,23 +817,55 @@ class MCPConfig(BaseModel):
         self, tool_name: str, input_data: Dict[str, Any]
     ) -> CallToolResult:
         """Call a tool with the given input data"""
-        if "." not in tool_name:
-            raise ValueError(f"Tool {tool_name} not found")
-        server_name_part, tool_name_part = tool_name.split(".")
-        with self.__lock:
-            for server in self.servers:
-                if server.name == server_name_part and server.has_tool(tool_name_part):
-                    return await server.call_tool(tool_name_part, input_data)
+        server = self._get_catalog().tools.get(tool_name)
+        if server is None:
             raise ValueError(f"Tool {tool_name} not found")
+        return await server.call_tool(tool_name.split(".", 1)[1], input_data)
 
 
 T = TypeVar("T")
 
+SESSION_IDLE_TIMEOUT = 300  # seconds without requests after which a server session is closed
+SESSION_CHECK_AFTER = 30  # seconds without requests after which a session is pinged before use
+SESSION_PING_TIMEOUT = 5
+LATENCY_SAMPLES = 200  # latest tool call latencies kept per server for the percentiles
+
+# MCP sessions are bound to the event loop they were opened in, while agents run in loops
+# of their own, so all sessions live in one dedicated loop thread
+_session_loop: asyncio.AbstractEventLoop | None = None
+_session_loop_lock = threading.Lock()
+_clients: "weakref.WeakSet[MCPClientBase]" = weakref.WeakSet()
+
+
+def _get_session_loop() -> asyncio.AbstractEventLoop:
+    global _session_loop
+    with _session_loop_lock:
+        if _session_loop is None:
+            _session_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_session_loop.run_forever, name="MCPSessions", daemon=True
+            ).start()
+        return _session_loop
+
+
+def _close_all_sessions():
+    if _session_loop is None:
+        return
+    for client in list(_clients):
+        client.close()
+    # give the owner tasks a moment to terminate stdio servers
+    deadline = time.monotonic() + 5
+    while any(client.session_open for client in list(_clients)) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+atexit.register(_close_all_sessions)
+
 
 class MCPClientBase(ABC):
     # server: Union[MCPServerLocal, MCPServerRemote] # Defined in __init__
     # tools: List[dict[str, Any]] # Defined in __init__
-    # No self.session, self.exit_stack, self.stdio, self.write as persistent instance fields
+    # The session lives in the shared session loop, see _execute_with_session
 
     __lock: ClassVar[threading.Lock] = threading.Lock()
 
@@ -790,6 +875,21 @@ class MCPClientBase(ABC):
         self.error: str = ""
         self.log: List[str] = []
         self.log_file: Optional[TextIO] = None
+        # session state, only touched in the session loop
+        self._session: ClientSession | None = None
+        self._session_closing: asyncio.Event | None = None
+        self._connect_lock: asyncio.Lock | None = None
+        self._in_flight = 0
+        self._last_used = 0.0
+        # tool call metrics, updated from the callers' threads
+        self._metrics_lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._metrics = {"calls": 0, "errors": 0, "connects": 0, "reconnects": 0}
+        _clients.add(self)
+
+    @property
+    def session_open(self) -> bool:
+        return self._session is not None
 
     # Protected method
     @abstractmethod
@@ -808,77 +908,164 @@ class MCPClientBase(ABC):
         read_timeout_seconds=60,
     ) -> T:
         """
-        Manages the lifecycle of an MCP session for a single operation.
-        Creates a temporary session, executes coro_func with it, and ensures cleanup.
+        Executes coro_func with the server's long-lived session.
+        The session is opened on first use and kept for further operations, concurrent
+        operations from any thread or event loop are multiplexed on it. A session idle for
+        SESSION_CHECK_AFTER is pinged before use and reopened if dead, one idle for
+        SESSION_IDLE_TIMEOUT is closed (stdio servers are stopped) until needed again.
+        read_timeout_seconds applies to requests without their own timeout.
         """
         operation_name = coro_func.__name__  # For logging
-        # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Creating new session for operation '{operation_name}'...")
-        # Store the original exception outside the async block
-        original_exception = None
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_in_session(coro_func, read_timeout_seconds), _get_session_loop()
+        )
         try:
-            async with AsyncExitStack() as temp_stack:
-                try:
-
-                    stdio, write = await self._create_stdio_transport(temp_stack)
-                    # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name} - {operation_name}): Transport created. Initializing session...")
-                    session = await temp_stack.enter_async_context(
-                        ClientSession(
-                            stdio,  # type: ignore
-                            write,  # type: ignore
-                            read_timeout_seconds=timedelta(
-                                seconds=read_timeout_seconds
-                            ),
-                        )
-                    )
-                    await session.initialize()
-
-                    result = await coro_func(session)
-
-                    return result
-                except Exception as e:
-                    # Store the original exception and raise a dummy exception
-                    excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
-                    if excs:
-                        original_exception = excs[0]
-                    else:
-                        original_exception = e
-                    # Create a dummy exception to break out of the async block
-                    raise RuntimeError("Dummy exception to break out of async block")
+            return await asyncio.wrap_future(future)
         except Exception as e:
-            # Check if this is our dummy exception
-            if original_exception is not None:
-                e = original_exception
-            # We have the original exception stored
+            excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
+            if excs:
+                e = excs[0]
             PrintStyle(
                 background_color="#AA4455", font_color="white", padding=False
             ).print(
                 f"MCPClientBase ({self.server.name} - {operation_name}): Error during operation: {type(e).__name__}: {e}"
             )
             raise e  # Re-raise the original exception
-        # finally:
-        #     PrintStyle(font_color="cyan").print(
-        #         f"MCPClientBase ({self.server.name} - {operation_name}): Session and transport will be closed by AsyncExitStack."
-        #     )
-        # This line should ideally be unreachable if the try/except/finally logic within the 'async with' is exhaustive.
-        # Adding it to satisfy linters that might not fully trace the raise/return paths through async context managers.
-        raise RuntimeError(
-            f"MCPClientBase ({self.server.name} - {operation_name}): _execute_with_session exited 'async with' block unexpectedly."
-        )
+
+    async def _run_in_session(
+        self, coro_func: Callable[[ClientSession], Awaitable[T]], read_timeout_seconds
+    ) -> T:
+        for attempt in range(2):
+            session = await self._get_session(read_timeout_seconds)
+            self._in_flight += 1
+            try:
+                return await coro_func(session)
+            except McpError as e:
+                if e.error.code == CONNECTION_CLOSED:
+                    self._close_session(session)
+                raise  # otherwise an error response of the server, the session is fine
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                # the request could not be sent on a dead session, safe to send again
+                self._close_session(session)
+                if attempt:
+                    raise
+                with self._metrics_lock:
+                    self._metrics["reconnects"] += 1
+            # anything else is an error of this operation, the shared session stays open
+            finally:
+                self._in_flight -= 1
+                self._last_used = time.monotonic()
+        raise RuntimeError("unreachable")
+
+    async def _get_session(self, read_timeout_seconds) -> ClientSession:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            session = self._session
+            # a busy server may be slow to answer pings, only check sessions nobody is using
+            idle = time.monotonic() - self._last_used
+            if session and not self._in_flight and idle > SESSION_CHECK_AFTER:
+                try:
+                    await asyncio.wait_for(session.send_ping(), SESSION_PING_TIMEOUT)
+                    self._last_used = time.monotonic()
+                except Exception:
+                    PrintStyle(font_color="orange").print(
+                        f"MCPClientBase ({self.server.name}): Session not responding, reconnecting..."
+                    )
+                    self._close_session(session)
+                    session = None
+                    with self._metrics_lock:
+                        self._metrics["reconnects"] += 1
+            if session is None:
+                ready: asyncio.Future[ClientSession] = asyncio.get_running_loop().create_future()
+                asyncio.create_task(self._own_session(ready, read_timeout_seconds))
+                # a cancelled caller does not cancel the connect, others may be waiting for it
+                session = await asyncio.shield(ready)
+                with self._metrics_lock:
+                    self._metrics["connects"] += 1
+            return session
+
+    async def _own_session(self, ready: asyncio.Future, read_timeout_seconds):
+        """Opens the session and keeps it open until closed or idle.
+
+        Transports are entered and exited in this one task, as their task groups require.
+        """
+        closing = asyncio.Event()
+        session = None
+        try:
+            async with AsyncExitStack() as stack:
+                stdio, write = await self._create_stdio_transport(stack)
+                session = await stack.enter_async_context(
+                    ClientSession(
+                        stdio,  # type: ignore
+                        write,  # type: ignore
+                        read_timeout_seconds=timedelta(seconds=read_timeout_seconds),
+                    )
+                )
+                await session.initialize()
+                self._session, self._session_closing = session, closing
+                self._last_used = time.monotonic()
+                ready.set_result(session)
+                while not closing.is_set():
+                    try:
+                        await asyncio.wait_for(closing.wait(), SESSION_CHECK_AFTER)
+                    except asyncio.TimeoutError:
+                        idle = time.monotonic() - self._last_used
+                        if not self._in_flight and idle > SESSION_IDLE_TIMEOUT:
+                            break
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, (asyncio.CancelledError, Exception)):
+                raise
+        finally:
+            if self._session is session:
+                self._session, self._session_closing = None, None
+
+    def _close_session(self, session: ClientSession):
+        if self._session is session and self._session_closing:
+            self._session_closing.set()
+            self._session, self._session_closing = None, None
+
+    def close(self):
+        """Close the session, a later operation opens a new one"""
+        loop = _session_loop
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: self._session and self._close_session(self._session))
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Tool call count, errors, latencies in ms and session state"""
+        with self._metrics_lock:
+            metrics: dict[str, Any] = dict(self._metrics)
+            latencies = sorted(self._latencies)
+        if latencies:
+            metrics["latency_ms"] = {
+                "last": round(self._latencies[-1] * 1000, 1),
+                "avg": round(sum(latencies) / len(latencies) * 1000, 1),
+                "p50": round(latencies[len(latencies) // 2] * 1000, 1),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+            }
+        metrics["session_open"] = self.session_open
+        metrics["in_flight"] = self._in_flight
+        return metrics
 
     async def update_tools(self) -> "MCPClientBase":
         # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Starting 'update_tools' operation...")
 
         async def list_tools_op(current_session: ClientSession):
             response: ListToolsResult = await current_session.list_tools()
+            tools = [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "input_schema": tool.inputSchema,
+                }
+                for tool in response.tools
+            ]
             with self.__lock:
-                self.tools = [
-                    {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "input_schema": tool.inputSchema,
-                    }
-                    for tool in response.tools
-                ]
+                changed, self.tools = tools != self.tools, tools
+            if changed:
+                _tools_changed()
             PrintStyle(font_color="green").print(
                 f"MCPClientBase ({self.server.name}): Tools updated. Found {len(self.tools)} tools."
             )
@@ -900,8 +1087,10 @@ class MCPClientBase(ABC):
                 f"MCPClientBase ({self.server.name}): 'update_tools' operation failed: {error_text}"
             )
             with self.__lock:
-                self.tools = []  # Ensure tools are cleared on failure
+                changed, self.tools = bool(self.tools), []  # Ensure tools are cleared on failure
                 self.error = f"Failed to initialize. {error_text[:200]}{'...' if len(error_text) > 200 else ''}"  # store error from tools fetch
+            if changed:
+                _tools_changed()
         return self
 
     def has_tool(self, tool_name: str) -> bool:
@@ -948,9 +1137,17 @@ class MCPClientBase(ABC):
             # PrintStyle(font_color="green").print(f"MCPClientBase ({self.server.name}): Tool '{tool_name}' call successful via session.")
             return response
 
+        start = time.perf_counter()
         try:
-            return await self._execute_with_session(call_tool_op)
+            response = await self._execute_with_session(call_tool_op)
+            with self._metrics_lock:
+                self._metrics["calls"] += 1
+                self._latencies.append(time.perf_counter() - start)
+            return response
         except Exception as e:
+            with self._metrics_lock:
+                self._metrics["calls"] += 1
+                self._metrics["errors"] += 1
             # Error logged by _execute_with_session. Re-raise a specific error for the caller.
             PrintStyle(
                 background_color="#AA4455", font_color="white", padding=True
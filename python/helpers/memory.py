@@ -1,7 +1,5 @@
 from datetime import datetime
 from typing import Any, List, Sequence
-from langchain.storage import InMemoryByteStore, LocalFileStore
-from langchain.embeddings import CacheBackedEmbeddings
 
 # from langchain_chroma import Chroma
 from langchain_community.vectorstores import FAISS
@@ -17,28 +15,227 @@ from langchain_community.vectorstores.utils import (
 )
 from langchain_core.embeddings import Embeddings
 
-import os, json
+import os, json, shutil, tempfile, threading, atexit, ast, asyncio
 
 import numpy as np
 
 from python.helpers.print_style import PrintStyle
-from . import files
+from python.helpers.ann_index import AnnIndex
+from . import files, settings
 from langchain_core.documents import Document
 import uuid
 from python.helpers import knowledge_import
+from python.helpers.embedding_cache import CachedEmbeddings, EmbeddingStore, get_store
 from python.helpers.log import Log, LogItem
 from enum import Enum
 from agent import Agent
 import models
 import logging
-from simpleeval import simple_eval
+from simpleeval import SimpleEval
 
 
 # Raise the log level so WARNING messages aren't shown
 logging.getLogger("langchain_core.vectorstores.base").setLevel(logging.ERROR)
 
+# write-behind persistence: mutations are coalesced and the FAISS files rewritten at most once per SAVE_DELAY
+SAVE_DELAY = 5.0  # seconds between the first unsaved mutation and the save
+SAVE_MAX_PENDING = 500  # unsaved documents that trigger an immediate save
+DELTA_LOG_FILE = "index.delta.jsonl"  # mutations since the last save, replayed on next load
+KNOWLEDGE_INSERT_BATCH = 256  # knowledge documents embedded together while preloading
+
 
 class MyFaiss(FAISS):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # area code of every index row, extended lazily after adds and rebuilt after deletes
+        self._area_codes: dict[Any, int] = {}
+        self._row_areas = np.empty(0, dtype=np.int32)
+        self._areas_lock = threading.Lock()
+        # optional approximate index next to the flat one, see configure_ann
+        self.ann_type = "flat"
+        self.ann_threshold = 0
+        self._ann: AnnIndex | None = None
+        self._ann_pending: AnnIndex | None = None
+        self._ann_building = False
+        self._ann_lock = threading.Lock()
+
+    def delete(self, ids: list[str] | None = None, **kwargs):
+        ann = self._sync_ann()  # ann rows are appended by flat position, catch up before renumbering
+        removed = len([id for id in ids or [] if id in self.docstore._dict])  # type: ignore
+        result = super().delete(ids, **kwargs)
+        with self._areas_lock:
+            self._row_areas = np.empty(0, dtype=np.int32)  # rows were renumbered
+        if ann is not None:
+            ann.flat_rows = self.index.ntotal
+            ann.deleted += removed
+        return result
+
+    def configure_ann(self, index_type: str, threshold: int):
+        """Select the approximate index used once the store holds at least `threshold` vectors.
+
+        The flat index stays the saved source of truth, the approximate one is built from it in
+        a background thread and kept in sync incrementally; until it is ready searches stay exact.
+        """
+        with self._ann_lock:
+            if index_type != self.ann_type:
+                self._ann = self._ann_pending = None
+            self.ann_type = index_type
+            self.ann_threshold = threshold
+        self.maybe_build_ann()
+
+    def maybe_build_ann(self):
+        # start a background (re)build if needed, call with mutations paused
+        with self._ann_lock:
+            ntotal = self.index.ntotal
+            if self.ann_type == "flat" or ntotal < self.ann_threshold:
+                self._ann = self._ann_pending = None
+                return
+            if self._ann_building or self._ann_pending is not None:
+                return
+            if self._ann is not None and not self._ann.needs_rebuild():
+                return
+            vectors = self.index.reconstruct_n(0, ntotal)
+            doc_ids = [self.index_to_docstore_id[row] for row in range(ntotal)]
+            row_areas = self._get_row_areas()[:ntotal].copy()
+            self._ann_building = True
+        threading.Thread(
+            target=self._build_ann,
+            args=(self.ann_type, vectors, doc_ids, row_areas),
+            name="MemoryIndexBuild",
+            daemon=True,
+        ).start()
+
+    def _build_ann(self, index_type: str, vectors, doc_ids: list[str], row_areas):
+        ann = None
+        try:
+            PrintStyle.standard(f"Building {index_type} memory index over {len(doc_ids)} vectors...")
+            ann = AnnIndex.build(index_type, vectors, doc_ids, row_areas)
+        except Exception as e:
+            PrintStyle.error(f"Failed to build {index_type} memory index: {e}")
+        with self._ann_lock:
+            self._ann_building = False
+            if ann is not None and index_type == self.ann_type:
+                self._ann_pending = ann  # installed by the next _sync_ann
+
+    def _sync_ann(self) -> AnnIndex | None:
+        # install a finished build and append flat rows added since, call with mutations paused
+        with self._ann_lock:
+            ntotal = self.index.ntotal
+            if self._ann_pending is not None:
+                ann, self._ann_pending = self._ann_pending, None
+                known = set(ann.doc_ids)
+                ann.deleted = len([id for id in known if id not in self.docstore._dict])  # type: ignore
+                self._add_ann_rows(
+                    ann,
+                    [row for row in range(ntotal) if self.index_to_docstore_id[row] not in known],
+                )
+                ann.flat_rows = ntotal
+                self._ann = ann
+            ann = self._ann
+            if ann is not None and ann.flat_rows < ntotal:
+                self._add_ann_rows(ann, list(range(ann.flat_rows, ntotal)))
+                ann.flat_rows = ntotal
+            return ann
+
+    def _add_ann_rows(self, ann: AnnIndex, rows: list[int]):
+        if rows:
+            ann.add(
+                self.index.reconstruct_batch(np.array(rows, dtype=np.int64)),
+                [self.index_to_docstore_id[row] for row in rows],
+                self._get_row_areas()[rows],
+            )
+
+    def _get_row_areas(self) -> np.ndarray:
+        with self._areas_lock:
+            ntotal = self.index.ntotal
+            if len(self._row_areas) < ntotal:
+                codes = []
+                for row in range(len(self._row_areas), ntotal):
+                    doc = self.docstore._dict.get(self.index_to_docstore_id.get(row))  # type: ignore
+                    area = doc.metadata.get("area") if doc else None
+                    codes.append(self._area_codes.setdefault(area, len(self._area_codes)))
+                self._row_areas = np.concatenate(
+                    [self._row_areas, np.array(codes, dtype=np.int32)]
+                )
+            return self._row_areas
+
+    def _area_codes_of(self, areas: set[str]) -> list[int]:
+        return [self._area_codes[area] for area in areas if area in self._area_codes]
+
+    def search_by_vector(
+        self,
+        embedding: List[float],
+        k: int,
+        score_threshold: float = 0.0,
+        areas: set[str] | None = None,
+        comparator=None,
+    ) -> list[tuple[Document, float]]:
+        """Similarity search with an area pre-filter and an optional metadata post-filter.
+
+        Areas are applied inside faiss, so only vectors from those areas are scored.
+        The comparator runs on the ranked candidates, fetching more until k documents pass
+        or the scores drop under the threshold. Searches over at least `ann_threshold`
+        candidates use the approximate index when it is ready.
+        """
+        ann = self._sync_ann() if self.ann_type != "flat" else None
+        if ann is not None:
+            mask = np.isin(ann.row_areas, self._area_codes_of(areas)) if areas is not None else None
+            candidates = int(mask.sum()) if mask is not None else len(ann)
+            if candidates < self.ann_threshold:
+                ann = None  # small areas are cheaper and exact on the flat index
+        if ann is None:
+            mask = np.isin(self._get_row_areas(), self._area_codes_of(areas)) if areas is not None else None
+            candidates = int(mask.sum()) if mask is not None else self.index.ntotal
+        if mask is not None and candidates == len(mask):
+            mask = None
+        if not candidates or k <= 0:
+            return []
+
+        vector = np.array([embedding], dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vector)
+        relevance = self._select_relevance_score_fn()
+
+        # params only hold raw pointers, the python objects must outlive the search
+        bitmap = selector = params = None
+        if mask is not None and ann is None:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+            params = faiss.SearchParameters(sel=selector)
+
+        def ranked(fetch: int):
+            if ann is not None:
+                return ann.search(vector, fetch, mask)
+            scores, rows = self.index.search(vector, fetch, params=params)
+            return scores[0], [self.index_to_docstore_id[row] if row >= 0 else None for row in rows[0]]
+
+        # over-fetch when candidates may be dropped after ranking
+        overfetch = comparator is not None or (ann is not None and ann.deleted > 0)
+        fetch = min(max(k * 4, 20) if overfetch else k, candidates)
+        while True:
+            scores, doc_ids = ranked(fetch)
+            results = []
+            exhausted = fetch >= candidates
+            for score, doc_id in zip(scores, doc_ids):
+                if doc_id is None:
+                    exhausted = True
+                    break
+                similarity = relevance(score)
+                if similarity < score_threshold:
+                    exhausted = True  # results are ranked, the rest scores lower
+                    break
+                doc = self.docstore.search(doc_id)
+                if not isinstance(doc, Document):
+                    continue  # deleted since the approximate index was built
+                if comparator and not comparator(doc.metadata):
+                    continue
+                results.append((doc, similarity))
+                if len(results) >= k:
+                    return results
+            if exhausted:
+                return results
+            fetch = min(fetch * 4, candidates)
+
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
@@ -51,6 +248,50 @@ class MyFaiss(FAISS):
         return self.docstore._dict  # type: ignore
 
 
+class DbWriter:
+    """Write-behind saver for one memory database.
+
+    Every mutation is appended to the delta log right away, the database itself is saved
+    SAVE_DELAY seconds after the first unsaved mutation, after SAVE_MAX_PENDING documents,
+    or on flush() at shutdown/reload. Mutations and saves share one lock, so a save never
+    serializes a half-applied change.
+    """
+
+    def __init__(self, db: "MyFaiss", memory_subdir: str):
+        self.db = db
+        self.memory_subdir = memory_subdir
+        self.lock = threading.RLock()
+        self.pending = 0
+        self._timer: threading.Timer | None = None
+
+    def record(self, op: dict, count: int):
+        # called with the lock held, right after the mutation was applied
+        log_path = os.path.join(Memory._abs_db_dir(self.memory_subdir), DELTA_LOG_FILE)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(op, default=str) + "\n")
+        self.pending += count
+        if self.pending >= SAVE_MAX_PENDING:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self.pending:
+                return
+            try:
+                Memory._save_db_file(self.db, self.memory_subdir)
+                self.pending = 0
+            except Exception as e:
+                # keep pending, the delta log still holds the changes and the next flush retries
+                PrintStyle.error(f"Failed to save memory '{self.memory_subdir}': {e}")
+
+
 class Memory:
 
     class Area(Enum):
@@ -60,6 +301,8 @@ class Memory:
         INSTRUMENTS = "instruments"
 
     index: dict[str, "MyFaiss"] = {}
+    writers: dict[str, DbWriter] = {}
+    _writers_lock = threading.Lock()
 
     @staticmethod
     async def get(agent: Agent):
@@ -77,6 +320,7 @@ class Memory:
             )
             Memory.index[memory_subdir] = db
             wrap = Memory(agent, db, memory_subdir=memory_subdir)
+            wrap._configure_index()
             if agent.config.knowledge_subdirs:
                 await wrap.preload_knowledge(
                     log_item, agent.config.knowledge_subdirs, memory_subdir
@@ -93,6 +337,7 @@ class Memory:
     async def reload(agent: Agent):
         memory_subdir = agent.config.memory_subdir or "default"
         if Memory.index.get(memory_subdir):
+            Memory.flush(memory_subdir)
             del Memory.index[memory_subdir]
         return await Memory.get(agent)
 
@@ -117,12 +362,6 @@ class Memory:
         # make sure embeddings and database directories exist
         os.makedirs(db_dir, exist_ok=True)
 
-        if in_memory:
-            store = InMemoryByteStore()
-        else:
-            os.makedirs(em_dir, exist_ok=True)
-            store = LocalFileStore(em_dir)
-
         embeddings_model = models.get_embedding_model(
             model_config.provider,
             model_config.name,
@@ -132,10 +371,15 @@ class Memory:
             model_config.provider + "_" + model_config.name
         )
 
+        # single-file embedding cache per model, shared by all memory subdirs
+        if in_memory:
+            store = EmbeddingStore()
+        else:
+            os.makedirs(em_dir, exist_ok=True)
+            store = get_store(em_dir, embeddings_model_id)
+
         # here we setup the embeddings model with the chosen cache storage
-        embedder = CacheBackedEmbeddings.from_bytes_store(
-            embeddings_model, store, namespace=embeddings_model_id
-        )
+        embedder = CachedEmbeddings(embeddings_model, store)
 
         # initial DB and docs variables
         db: MyFaiss | None = None
@@ -166,10 +410,19 @@ class Memory:
                     # model matches
                     emb_ok = True
 
+            # mutations not saved before the last shutdown
+            delta = Memory._read_delta_log(db_dir)
+
             # re-index -  create new DB and insert existing docs
             if db and not emb_ok:
-                docs = db.get_all_docs()
+                docs = Memory._apply_delta(dict(db.get_all_docs()), delta)
                 db = None
+            elif db and delta:
+                PrintStyle.standard("Replaying unsaved memory changes...")
+                docs = Memory._apply_delta(dict(db.get_all_docs()), delta)
+                Memory._sync_docs(db, docs)
+                Memory._save_db_file(db, memory_subdir)
+                docs = None
 
         # DB not loaded, create one
         if not db:
@@ -220,6 +473,32 @@ class Memory:
         self.db = db
         self.memory_subdir = memory_subdir
 
+    def _configure_index(self):
+        set = settings.get_settings()
+        with self._writer().lock:
+            self.db.configure_ann(
+                set["memory_index_type"], set["memory_index_ann_threshold"]
+            )
+
+    @staticmethod
+    def configure_indexes():
+        """Apply index settings to all loaded databases."""
+        set = settings.get_settings()
+        for memory_subdir, db in list(Memory.index.items()):
+            writer = Memory.writers.get(memory_subdir)
+            lock = writer.lock if writer and writer.db is db else threading.RLock()
+            with lock:
+                db.configure_ann(set["memory_index_type"], set["memory_index_ann_threshold"])
+
+    def _writer(self) -> DbWriter:
+        with Memory._writers_lock:
+            writer = Memory.writers.get(self.memory_subdir)
+            if writer is None or writer.db is not self.db:
+                if writer:
+                    writer.flush()  # db was reloaded, save what the old one still holds
+                writer = Memory.writers[self.memory_subdir] = DbWriter(self.db, self.memory_subdir)
+            return writer
+
     async def preload_knowledge(
         self, log_item: LogItem | None, kn_dirs: list[str], memory_subdir: str
     ):
@@ -241,20 +520,41 @@ class Memory:
             with open(index_path, "r") as f:
                 index = json.load(f)
 
+        # changed files are diffed by chunk, new chunks are inserted in batches while the
+        # rest is still loading and unchanged chunks keep their ids and vectors
+        pending: list[tuple] = []
+
+        async def insert_pending():
+            batch = pending[:]
+            pending.clear()
+            vanished = [id for *_, removed in batch for id in removed]
+            if vanished:
+                await self.delete_documents_by_ids(vanished)  # remove changed chunks
+            new_ids = iter(
+                await self.insert_documents(
+                    [doc for _, _, _, new_docs, _ in batch for doc in new_docs]
+                )
+            )  # insert new chunks
+            for file_data, hashes, ids, _, _ in batch:
+                file_data["ids"] = [id or next(new_ids) for id in ids]
+                file_data["chunks"] = hashes
+
+        async def on_loaded(file_data: knowledge_import.KnowledgeImport):
+            hashes, ids, new_docs, removed = knowledge_import.diff_chunks(file_data)
+            pending.append((file_data, hashes, ids, new_docs, removed))
+            if sum(len(item[3]) for item in pending) >= KNOWLEDGE_INSERT_BATCH:
+                await insert_pending()
+
         # preload knowledge folders
-        index = self._preload_knowledge_folders(log_item, kn_dirs, index)
+        index = await self._preload_knowledge_folders(log_item, kn_dirs, index, on_loaded)
+        if pending:
+            await insert_pending()
 
         for file in index:
-            if index[file]["state"] in ["changed", "removed"] and index[file].get(
+            if index[file]["state"] == "removed" and index[file].get(
                 "ids", []
-            ):  # for knowledge files that have been changed or removed and have IDs
-                await self.delete_documents_by_ids(
-                    index[file]["ids"]
-                )  # remove original version
-            if index[file]["state"] == "changed":
-                index[file]["ids"] = await self.insert_documents(
-                    index[file]["documents"]
-                )  # insert new version
+            ):  # for knowledge files that have been removed and have IDs
+                await self.delete_documents_by_ids(index[file]["ids"])
 
         # remove index where state="removed"
         index = {k: v for k, v in index.items() if v["state"] != "removed"}
@@ -268,45 +568,87 @@ class Memory:
         with open(index_path, "w") as f:
             json.dump(index, f)
 
-    def _preload_knowledge_folders(
+    async def _preload_knowledge_folders(
         self,
         log_item: LogItem | None,
         kn_dirs: list[str],
         index: dict[str, knowledge_import.KnowledgeImport],
+        on_loaded=None,
     ):
-        # load knowledge folders, subfolders by area
-        for kn_dir in kn_dirs:
-            for area in Memory.Area:
-                index = knowledge_import.load_knowledge(
-                    log_item,
-                    files.get_abs_path("knowledge", kn_dir, area.value),
-                    index,
-                    {"area": area.value},
-                )
+        # load knowledge folders, subfolders by area, all folders share the process pool
+        loads = [
+            knowledge_import.load_knowledge(
+                log_item,
+                files.get_abs_path("knowledge", kn_dir, area.value),
+                index,
+                {"area": area.value},
+                on_loaded=on_loaded,
+            )
+            for kn_dir in kn_dirs
+            for area in Memory.Area
+        ]
 
         # load instruments descriptions
-        index = knowledge_import.load_knowledge(
-            log_item,
-            files.get_abs_path("instruments"),
-            index,
-            {"area": Memory.Area.INSTRUMENTS.value},
-            filename_pattern="**/*.md",
+        loads.append(
+            knowledge_import.load_knowledge(
+                log_item,
+                files.get_abs_path("instruments"),
+                index,
+                {"area": Memory.Area.INSTRUMENTS.value},
+                filename_pattern="**/*.md",
+                on_loaded=on_loaded,
+            )
         )
 
+        await asyncio.gather(*loads)
         return index
 
     async def search_similarity_threshold(
         self, query: str, limit: int, threshold: float, filter: str = ""
     ):
-        comparator = Memory._get_comparator(filter) if filter else None
-
-        return await self.db.asearch(
-            query,
-            search_type="similarity_score_threshold",
-            k=limit,
-            score_threshold=threshold,
-            filter=comparator,
+        results = await self.search_similarity_threshold_multi(
+            [{"query": query, "limit": limit, "threshold": threshold, "filter": filter}]
         )
+        return results[0]
+
+    async def search_similarity_threshold_multi(
+        self, searches: list[dict[str, Any]]
+    ) -> list[list[Document]]:
+        """Run several searches, each a dict of search_similarity_threshold arguments.
+
+        Every distinct query is embedded once, all uncached ones in a single model call,
+        and the searches then run together off the event loop.
+        """
+        queries = list(dict.fromkeys(search["query"] for search in searches))
+        embedder = self.db.embedding_function
+        if isinstance(embedder, CachedEmbeddings):
+            vectors = await embedder.aembed_queries(queries)
+        else:
+            vectors = [await embedder.aembed_query(query) for query in queries]  # type: ignore
+        embeddings = dict(zip(queries, vectors))
+
+        filters: dict[str, tuple] = {}
+        for search in searches:
+            filter = search.get("filter", "")
+            if filter not in filters:
+                filters[filter] = Memory._parse_filter(filter) if filter else (None, None)
+
+        def run():
+            with self._writer().lock:
+                results = []
+                for search in searches:
+                    areas, comparator = filters[search.get("filter", "")]
+                    found = self.db.search_by_vector(
+                        embeddings[search["query"]],
+                        k=search["limit"],
+                        score_threshold=search["threshold"],
+                        areas=areas,
+                        comparator=comparator,
+                    )
+                    results.append([doc for doc, _ in found])
+                return results
+
+        return await asyncio.to_thread(run)
 
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
@@ -331,15 +673,13 @@ class Memory:
                 # fnd = self.db.get(where={"id": {"$in": document_ids}})
                 # if fnd["ids"]: self.db.delete(ids=fnd["ids"])
                 # tot += len(fnd["ids"])
-                await self.db.adelete(ids=document_ids)
+                self._delete(document_ids)
                 tot += len(document_ids)
 
             # If fewer than K document IDs, break the loop
             if len(document_ids) < k:
                 break
 
-        if tot:
-            self._save_db()  # persist
         return removed
 
     async def delete_documents_by_ids(self, ids: list[str]):
@@ -349,10 +689,7 @@ class Memory:
         )  # existing docs to remove (prevents error)
         if rem_docs:
             rem_ids = [doc.metadata["id"] for doc in rem_docs]  # ids to remove
-            await self.db.adelete(ids=rem_ids)
-
-        if rem_docs:
-            self._save_db()  # persist
+            self._delete(rem_ids)
         return rem_docs
 
     async def insert_text(self, text, metadata: dict = {}):
@@ -371,30 +708,168 @@ class Memory:
                 if not doc.metadata.get("area", ""):
                     doc.metadata["area"] = Memory.Area.MAIN.value
 
-            await self.db.aadd_documents(documents=docs, ids=ids)
-            self._save_db()  # persist
+            # embed outside the lock, only the index update and the log append are serialized
+            texts = [doc.page_content for doc in docs]
+            vectors = await self.db.embedding_function.aembed_documents(texts)  # type: ignore
+            writer = self._writer()
+            with writer.lock:
+                self.db.add_embeddings(
+                    zip(texts, vectors), metadatas=[doc.metadata for doc in docs], ids=ids
+                )
+                writer.record(
+                    {
+                        "op": "insert",
+                        "docs": [
+                            {"id": id, "page_content": doc.page_content, "metadata": doc.metadata}
+                            for id, doc in zip(ids, docs)
+                        ],
+                    },
+                    len(ids),
+                )
+                self.db.maybe_build_ann()
         return ids
 
-    def _save_db(self):
-        Memory._save_db_file(self.db, self.memory_subdir)
+    def _delete(self, ids: list[str]):
+        writer = self._writer()
+        with writer.lock:
+            self.db.delete(ids=ids)
+            writer.record({"op": "delete", "ids": ids}, len(ids))
+            self.db.maybe_build_ann()
+
+    @staticmethod
+    def flush(memory_subdir: str | None = None):
+        """Save pending changes now, of one memory subdir or of all."""
+        for subdir, writer in list(Memory.writers.items()):
+            if memory_subdir is None or subdir == memory_subdir:
+                writer.flush()
 
     @staticmethod
     def _save_db_file(db: MyFaiss, memory_subdir: str):
+        # write into a temp dir next to the live files, then swap them in with atomic renames
         abs_dir = Memory._abs_db_dir(memory_subdir)
-        db.save_local(folder_path=abs_dir)
+        tmp_dir = tempfile.mkdtemp(prefix=".save-", dir=abs_dir)
+        try:
+            db.save_local(folder_path=tmp_dir)
+            for name in ("index.faiss", "index.pkl"):
+                with open(os.path.join(tmp_dir, name), "rb") as f:
+                    os.fsync(f.fileno())
+            for name in ("index.faiss", "index.pkl"):
+                os.replace(os.path.join(tmp_dir, name), os.path.join(abs_dir, name))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        # everything in the delta log is part of the saved files now
+        log_path = os.path.join(abs_dir, DELTA_LOG_FILE)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+
+    @staticmethod
+    def _read_delta_log(db_dir: str) -> list[dict]:
+        log_path = os.path.join(db_dir, DELTA_LOG_FILE)
+        if not os.path.exists(log_path):
+            return []
+        ops = []
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # torn last line after a crash
+        return ops
+
+    @staticmethod
+    def _apply_delta(docs: dict[str, Document], ops: list[dict]) -> dict[str, Document]:
+        for op in ops:
+            if op.get("op") == "insert":
+                for doc in op["docs"]:
+                    docs[doc["id"]] = Document(doc["page_content"], metadata=doc["metadata"])
+            elif op.get("op") == "delete":
+                for id in op["ids"]:
+                    docs.pop(id, None)
+        return docs
+
+    @staticmethod
+    def _sync_docs(db: MyFaiss, docs: dict[str, Document]):
+        # bring a loaded db to the given docs, vectors of re-added docs come from the embedding cache
+        existing = db.get_all_docs()
+        removed = [id for id in existing if id not in docs]
+        added = {id: doc for id, doc in docs.items() if id not in existing}
+        if removed:
+            db.delete(ids=removed)
+        if added:
+            db.add_documents(documents=list(added.values()), ids=list(added.keys()))
 
     @staticmethod
     def _get_comparator(condition: str):
+        # parse once, evaluate the tree per document
+        evaluator = SimpleEval()
+        evaluator.expr = condition
+        try:
+            parsed = ast.parse(condition.strip()).body[0]
+        except SyntaxError as e:
+            PrintStyle.error(f"Error parsing condition: {e}")
+            return lambda data: False
+
         def comparator(data: dict[str, Any]):
             try:
-                result = simple_eval(condition, names=data)
-                return result
+                evaluator.names = data
+                return evaluator._eval(parsed)
             except Exception as e:
                 PrintStyle.error(f"Error evaluating condition: {e}")
                 return False
 
         return comparator
 
+    @staticmethod
+    def _parse_filter(condition: str):
+        """Split a filter into areas to pre-filter on and a comparator for the rest.
+
+        "area == 'main' or area == 'fragments'" and "area in ['main']" become a pure area
+        filter, "area == 'main' and source == 'x'" pre-filters on the area and keeps the
+        comparator, anything else is only a comparator.
+        """
+        try:
+            tree = ast.parse(condition.strip(), mode="eval").body
+        except SyntaxError:
+            return None, Memory._get_comparator(condition)
+
+        areas = Memory._filter_areas(tree)
+        if areas is not None:
+            return areas, None
+        if isinstance(tree, ast.BoolOp) and isinstance(tree.op, ast.And):
+            for value in tree.values:
+                value_areas = Memory._filter_areas(value)
+                if value_areas is not None:
+                    areas = value_areas if areas is None else areas & value_areas
+        return areas, Memory._get_comparator(condition)
+
+    @staticmethod
+    def _filter_areas(node: ast.expr) -> set[str] | None:
+        # areas matched by an expression made only of area comparisons, None otherwise
+        if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
+            result: set[str] = set()
+            for value in node.values:
+                areas = Memory._filter_areas(value)
+                if areas is None:
+                    return None
+                result |= areas
+            return result
+        if (
+            isinstance(node, ast.Compare)
+            and len(node.ops) == 1
+            and isinstance(node.left, ast.Name)
+            and node.left.id == "area"
+        ):
+            op, right = node.ops[0], node.comparators[0]
+            if isinstance(op, ast.Eq) and isinstance(right, ast.Constant) and isinstance(right.value, str):
+                return {right.value}
+            if (
+                isinstance(op, ast.In)
+                and isinstance(right, (ast.List, ast.Tuple, ast.Set))
+                and all(isinstance(e, ast.Constant) and isinstance(e.value, str) for e in right.elts)
+            ):
+                return {e.value for e in right.elts}  # type: ignore
+        return None
+
     @staticmethod
     def _score_normalizer(val: float) -> float:
         res = 1 - 1 / (1 + np.exp(val))
@@ -440,5 +915,10 @@ def get_custom_knowledge_subdir_abs(agent: Agent) -> str:
 
 
 def reload():
-    # clear the memory index, this will force all DBs to reload
+    # save pending changes and clear the memory index, this will force all DBs to reload
+    Memory.flush()
     Memory.index = {}
+    Memory.writers = {}
+
+
+atexit.register(Memory.flush)
@@ -339,29 +339,28 @@ class MemoryConsolidator:
         # Step 1: Extract keywords/queries for enhanced search
         search_queries = await self._extract_search_keywords(new_memory, log_item)
 
-        all_similar = []
-
         # Step 2: Semantic similarity search with scores
-        semantic_similar = await db.search_similarity_threshold(
-            query=new_memory,
-            limit=self.config.max_similar_memories,
-            threshold=self.config.similarity_threshold,
-            filter=f"area == '{area}'"
-        )
-        all_similar.extend(semantic_similar)
-
-        # Step 3: Keyword-based searches
+        searches = [{
+            "query": new_memory,
+            "limit": self.config.max_similar_memories,
+            "threshold": self.config.similarity_threshold,
+            "filter": f"area == '{area}'"
+        }]
+
+        # Step 3: Keyword-based searches, embedded together with the memory in one call
+        queries_count = max(1, len(search_queries))  # Prevent division by zero
         for query in search_queries:
             if query.strip():
-                # Fix division by zero: ensure len(search_queries) > 0
-                queries_count = max(1, len(search_queries))  # Prevent division by zero
-                keyword_similar = await db.search_similarity_threshold(
-                    query=query.strip(),
-                    limit=max(3, self.config.max_similar_memories // queries_count),
-                    threshold=self.config.similarity_threshold,
-                    filter=f"area == '{area}'"
-                )
-                all_similar.extend(keyword_similar)
+                searches.append({
+                    "query": query.strip(),
+                    "limit": max(3, self.config.max_similar_memories // queries_count),
+                    "threshold": self.config.similarity_threshold,
+                    "filter": f"area == '{area}'"
+                })
+
+        all_similar = []
+        for similar in await db.search_similarity_threshold_multi(searches):
+            all_similar.extend(similar)
 
         # Step 4: Deduplicate by document ID and store similarity info
         seen_ids = set()
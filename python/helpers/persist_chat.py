@@ -1,9 +1,12 @@
 from collections import OrderedDict
 from datetime import datetime
 from typing import Any
+import os
+import sys
+import time
 import uuid
 from agent import Agent, AgentConfig, AgentContext, AgentContextType
-from python.helpers import files, history
+from python.helpers import files, history, chat_journal, chat_index, dotenv
 import json
 from initialize import initialize_agent
 
@@ -12,6 +15,7 @@ from python.helpers.log import Log, LogItem
 CHATS_FOLDER = "tmp/chats"
 LOG_SIZE = 1000
 CHAT_FILE_NAME = "chat.json"
+CHAT_IDLE_TIMEOUT = 1800  # seconds before an unused chat is unloaded, CHAT_IDLE_TIMEOUT in .env, 0 to keep all
 
 
 def get_chat_folder_path(ctxid: str):
@@ -28,45 +32,98 @@ def get_chat_folder_path(ctxid: str):
 
 
 def save_tmp_chat(context: AgentContext):
-    """Save context to the chats folder"""
+    """Save context to the chats folder.
+
+    Only what changed since the previous save is serialized and journaled, the files are
+    written in the background, see chat_journal.
+    """
     # Skip saving BACKGROUND contexts as they should be ephemeral
     if context.type == AgentContextType.BACKGROUND:
         return
 
-    path = _get_chat_file_path(context.id)
-    files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    journal = chat_journal.get(get_chat_folder_path(context.id), CHAT_FILE_NAME)
+    with journal.lock:
+        entry = None
+        if not journal.needs_snapshot():
+            entry, state = _journal_entry(context, journal.state)
+        if entry is None:
+            snapshot_id = str(uuid.uuid4())
+            data = _serialize_context(context)
+            data["journal_id"] = snapshot_id
+            js = _safe_json_serialize(data, ensure_ascii=False)
+            journal.write_snapshot(js, snapshot_id, _journal_state(context))
+        elif entry:
+            entry["journal_id"] = journal.snapshot_id
+            journal.append(_safe_json_serialize(entry, ensure_ascii=False), state)
 
 
 def save_tmp_chats():
     """Save all contexts to the chats folder"""
-    for _, context in AgentContext._contexts.items():
+    for context in AgentContext.all():
         # Skip BACKGROUND contexts as they should be ephemeral
         if context.type == AgentContextType.BACKGROUND:
             continue
         save_tmp_chat(context)
+    chat_journal.flush_all()  # callers expect the files to be current
 
 
 def load_tmp_chats():
-    """Load all contexts from the chats folder"""
+    """Index all contexts in the chats folder.
+
+    Only the chat index is read, each context is loaded on first access by AgentContext.get.
+    """
+    return [entry.id for entry in load_chat_index()]
+
+
+def load_chat_index() -> list[chat_index.ChatIndexEntry]:
     _convert_v080_chats()
-    folders = files.list_files(CHATS_FOLDER, "*")
-    json_files = []
-    for folder_name in folders:
-        json_files.append(_get_chat_file_path(folder_name))
+    folders = [get_chat_folder_path(name) for name in files.list_files(CHATS_FOLDER, "*")]
+    entries = chat_index.load(folders, CHAT_FILE_NAME, read_chat_data)
+    for entry in entries:
+        AgentContext.add_unloaded(entry)
+    return entries
+
+
+def load_chat(ctxid: str) -> AgentContext:
+    """Load a saved context, use AgentContext.get to load chats listed in the index."""
+    context = _deserialize_context(read_chat_data(get_chat_folder_path(ctxid)))
+    # items added from now on are new to the Supabase mirror, if it is in use
+    supabase_sync = sys.modules.get("python.helpers.supabase_sync")
+    if supabase_sync:
+        supabase_sync.sync.attach(context.id, context.log)
+    return context
 
-    ctxids = []
-    for file in json_files:
-        try:
-            js = files.read_file(file)
-            data = json.loads(js)
-            ctx = _deserialize_context(data)
-            ctxids.append(ctx.id)
-        except Exception as e:
-            print(f"Error loading chat {file}: {e}")
-    return ctxids
+
+def unload_idle_chats(idle_seconds: float | None = None):
+    """Save and unload contexts not accessed for idle_seconds, they are loaded again on access."""
+    if idle_seconds is None:
+        idle_seconds = float(dotenv.get_dotenv_value("CHAT_IDLE_TIMEOUT", CHAT_IDLE_TIMEOUT))
+    if idle_seconds <= 0:
+        return
+    for context in AgentContext.all():
+        if context.type == AgentContextType.BACKGROUND:
+            continue  # not saved
+        if time.monotonic() - context.last_access < idle_seconds:
+            continue
+        save_tmp_chat(context)
+        folder = get_chat_folder_path(context.id)
+        chat_journal.release(folder)
+        entry = chat_index.make_entry(
+            _serialize_context_meta(context),
+            context.log.guid,
+            len(context.log.logs[-LOG_SIZE:]),
+            chat_index.get_fingerprint(folder, CHAT_FILE_NAME),
+        )
+        if AgentContext.unload(context, entry, idle_seconds):
+            chat_index.update(entry)
+
+
+def read_chat_data(folder: str) -> dict:
+    """Serialized context of a chat folder, its snapshot with the journal replayed on top."""
+    data, entries = chat_journal.read(folder, CHAT_FILE_NAME)
+    for entry in entries:
+        _apply_journal_entry(data, entry)
+    return data
 
 
 def _get_chat_file_path(ctxid: str):
@@ -104,17 +161,33 @@ def export_json_chat(context: AgentContext):
 def remove_chat(ctxid):
     """Remove a chat or task context"""
     path = get_chat_folder_path(ctxid)
+    chat_journal.remove(path)
     files.delete_dir(path)
 
 
 def _serialize_context(context: AgentContext):
     # serialize agents
+    agents = []
+    for agent in _context_agents(context):
+        agents.append(_serialize_agent(agent))
+
+    return {
+        **_serialize_context_meta(context),
+        "agents": agents,
+        "log": _serialize_log(context.log),
+    }
+
+
+def _context_agents(context: AgentContext) -> list[Agent]:
     agents = []
     agent = context.agent0
     while agent:
-        agents.append(_serialize_agent(agent))
+        agents.append(agent)
         agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+    return agents
+
 
+def _serialize_context_meta(context: AgentContext):
     return {
         "id": context.id,
         "name": context.name,
@@ -127,16 +200,14 @@ def _serialize_context(context: AgentContext):
             context.last_message.isoformat() if context.last_message
             else datetime.fromtimestamp(0).isoformat()
         ),
-        "agents": agents,
         "streaming_agent": (
             context.streaming_agent.number if context.streaming_agent else 0
         ),
-        "log": _serialize_log(context.log),
     }
 
 
 def _serialize_agent(agent: Agent):
-    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
+    data = _agent_data(agent)
 
     history = agent.history.serialize()
 
@@ -147,6 +218,119 @@ def _serialize_agent(agent: Agent):
     }
 
 
+def _agent_data(agent: Agent):
+    return {k: v for k, v in agent.data.items() if not k.startswith("_")}
+
+
+def _journal_state(context: AgentContext) -> dict:
+    """What a save covered, to find the changes of the next save without serializing everything."""
+    return {
+        "meta": _serialize_context_meta(context),
+        "log": context.log,
+        "log_guid": context.log.guid,
+        "log_updates": len(context.log.updates),
+        "log_progress": (context.log.progress, context.log.progress_no),
+        "agents": [
+            {
+                "data": _safe_json_serialize(_agent_data(agent)),
+                "history": agent.history,
+                "revision": agent.history.revision,
+                "topics": len(agent.history.topics),
+                "current": agent.history.current,
+                "messages": len(agent.history.current.messages),
+            }
+            for agent in _context_agents(context)
+        ],
+    }
+
+
+def _journal_entry(context: AgentContext, state: dict) -> tuple[dict | None, dict]:
+    """Changes since the save described by state, None when a snapshot is needed instead.
+
+    Appended messages and new topics are journaled as such, any other history change
+    (compression, summaries) replaces that agent's whole history.
+    """
+    new_state = _journal_state(context)
+    log = context.log
+    if (
+        log is not state["log"]
+        or log.guid != state["log_guid"]
+        or len(log.updates) < state["log_updates"]
+    ):
+        return None, new_state  # log was replaced or reset
+
+    entry: dict[str, Any] = {}
+    if new_state["meta"] != state["meta"]:
+        entry["meta"] = new_state["meta"]
+    items = log.output(start=state["log_updates"])
+    if items or new_state["log_progress"] != state["log_progress"]:
+        entry["log"] = {
+            "items": items,
+            "progress": log.progress,
+            "progress_no": log.progress_no,
+        }
+
+    agents = []
+    for i, agent in enumerate(_context_agents(context)):
+        saved = state["agents"][i] if i < len(state["agents"]) else None
+        delta: dict[str, Any] = {}
+        if not saved or new_state["agents"][i]["data"] != saved["data"]:
+            delta["data"] = _agent_data(agent)
+        hist = agent.history
+        same = saved and hist is saved["history"] and hist.revision == saved["revision"]
+        if same and len(hist.topics) == saved["topics"] and hist.current is saved["current"]:
+            if len(hist.current.messages) > saved["messages"]:
+                delta["messages"] = [m.to_dict() for m in hist.current.messages[saved["messages"] :]]
+        elif same and len(hist.topics) == saved["topics"] + 1 and hist.topics[-1] is saved["current"]:
+            delta["closed"] = [m.to_dict() for m in saved["current"].messages[saved["messages"] :]]
+            delta["messages"] = [m.to_dict() for m in hist.current.messages]
+        else:
+            delta["number"] = agent.number
+            delta["history"] = hist.serialize()
+        if delta:
+            delta["index"] = i
+            agents.append(delta)
+    if agents:
+        entry["agents"] = agents
+    if len(new_state["agents"]) != len(state["agents"]):
+        entry["agent_count"] = len(new_state["agents"])
+    return entry, new_state
+
+
+def _apply_journal_entry(data: dict, entry: dict):
+    data.update(entry.get("meta", {}))
+
+    if "log" in entry:
+        log = data.setdefault("log", {})
+        items = {item["no"]: item for item in log.get("logs", [])}
+        items.update({item["no"]: item for item in entry["log"]["items"]})
+        log["logs"] = [items[no] for no in sorted(items)][-LOG_SIZE:]
+        log["progress"] = entry["log"]["progress"]
+        log["progress_no"] = entry["log"]["progress_no"]
+
+    agents = data.setdefault("agents", [])
+    if "agent_count" in entry:
+        del agents[entry["agent_count"] :]
+    for delta in entry.get("agents", []):
+        index = delta["index"]
+        while len(agents) <= index:
+            agents.append({"number": len(agents), "data": {}, "history": ""})
+        agent = agents[index]
+        if "data" in delta:
+            agent["data"] = delta["data"]
+        if "history" in delta:
+            agent["number"] = delta["number"]
+            agent["history"] = delta["history"]
+        elif "messages" in delta:
+            hist = json.loads(agent["history"])
+            if "closed" in delta:
+                hist["current"]["messages"] += delta["closed"]
+                hist["topics"].append(hist["current"])
+                hist["current"] = {"_cls": "Topic", "summary": "", "messages": []}
+            hist["current"]["messages"] += delta["messages"]
+            agent["history"] = json.dumps(hist, ensure_ascii=False)
+
+
 def _serialize_log(log: Log):
     return {
         "guid": log.guid,
@@ -1,10 +1,10 @@
 from collections import OrderedDict
 from datetime import datetime
-from typing import Any, List, Dict
+from typing import Any
 import uuid
 from agent import Agent, AgentConfig, AgentContext, AgentContextType
-from python.helpers import files, history
-from python.helpers.supabase_client import supabase_ghost
+from python.helpers import files, history, persist_chat, chat_journal
+from python.helpers.supabase_sync import sync as supabase_sync
 import json
 from initialize import initialize_agent
 
@@ -34,124 +34,34 @@ def save_tmp_chat(context: AgentContext):
     if context.type == AgentContextType.BACKGROUND:
         return
 
-    # Extract conversation messages for Supabase
-    messages = _extract_messages_from_context(context)
-    
-    # Save to Supabase
-    success = supabase_ghost.save_ghost_conversation(
-        context_id=context.id,
-        context_name=context.name or "Ghost Conversation",
-        messages=messages
-    )
-    
-    if success:
-        print(f"✅ Saved Ghost conversation to Supabase: {context.name}")
-    else:
-        print(f"⚠️ Failed to save Ghost conversation to Supabase: {context.name}")
-    
-    # Also save locally as backup (existing functionality)
-    path = _get_chat_file_path(context.id)
-    files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    # Queue new log messages for Supabase, uploaded by the background sync
+    supabase_sync.submit(context.id, context.name or "Ghost Conversation", context.log)
+
+    # Also save locally as backup, journaled and written in the background
+    persist_chat.save_tmp_chat(context)
 
 
 def save_tmp_chats():
     """Save all contexts to Supabase and local backup"""
-    for _, context in AgentContext._contexts.items():
+    for context in AgentContext.all():
         # Skip BACKGROUND contexts as they should be ephemeral
         if context.type == AgentContextType.BACKGROUND:
             continue
         save_tmp_chat(context)
+    chat_journal.flush_all()  # callers expect the files to be current
 
 
 def load_tmp_chats():
-    """Load contexts from Supabase first, then fall back to local files"""
-    # First try to load from local files (existing functionality)
-    _convert_v080_chats()
-    folders = files.list_files(CHATS_FOLDER, "*")
-    json_files = []
-    for folder_name in folders:
-        json_files.append(_get_chat_file_path(folder_name))
-
-    ctxids = []
-    
-    # Load from local files
-    for file in json_files:
-        try:
-            js = files.read_file(file)
-            data = json.loads(js)
-            ctx = _deserialize_context(data)
-            ctxids.append(ctx.id)
-            
-            # Try to restore messages from Supabase if available
-            supabase_messages = supabase_ghost.load_ghost_conversation(ctx.id)
-            if supabase_messages:
-                _restore_messages_to_context(ctx, supabase_messages)
-                print(f"✅ Restored Ghost conversation from Supabase: {ctx.name}")
-                
-        except Exception as e:
-            print(f"Error loading chat {file}: {e}")
-    
-    return ctxids
+    """Index local chats, loaded on first access, and look up their Supabase rows"""
+    entries = persist_chat.load_chat_index()
 
+    # Look up the Supabase rows of all chats in one query, in the background
+    supabase_sync.prefetch({
+        entry.id: (entry.name or "Ghost Conversation", entry.log_guid, entry.log_length)
+        for entry in entries
+    })
 
-def _extract_messages_from_context(context: AgentContext) -> List[Dict[str, Any]]:
-    """Extract conversation messages from Agent Zero context - SIMPLIFIED VERSION"""
-    messages = []
-    
-    try:
-        # For now, just create a basic message from the context
-        # This avoids the history.messages issue entirely
-        if context and hasattr(context, 'log') and context.log:
-            # Try to extract from log instead of history
-            log_items = getattr(context.log, 'logs', [])
-            
-            for item in log_items[-10:]:  # Last 10 log items
-                try:
-                    content = getattr(item, 'content', '')
-                    heading = getattr(item, 'heading', '')
-                    item_type = getattr(item, 'type', 'user')
-                    
-                    if content:
-                        message_dict = {
-                            "role": "assistant" if item_type == "agent" else "user",
-                            "content": f"{heading}: {content}" if heading else content
-                        }
-                        messages.append(message_dict)
-                        
-                except Exception as e:
-                    continue  # Skip problematic items
-        
-        # If no messages extracted, create a placeholder
-        if not messages:
-            messages = [{
-                "role": "system",
-                "content": f"Ghost AI conversation context: {context.name if hasattr(context, 'name') else 'Unknown'}"
-            }]
-            
-    except Exception as e:
-        print(f"Warning: Error extracting messages from context: {e}")
-        # Return minimal safe messages
-        messages = [{
-            "role": "system", 
-            "content": "Ghost AI conversation (extraction error)"
-        }]
-    
-    print(f"📤 Extracted {len(messages)} messages from Ghost AI context")
-    return messages
-
-
-def _restore_messages_to_context(context: AgentContext, messages: List[Dict[str, Any]]):
-    """Restore Supabase messages back to Agent Zero context"""
-    try:
-        # This is complex as it involves reconstructing the agent history
-        # For now, we'll keep the local file as primary and Supabase as backup
-        # In future versions, we could implement full restoration
-        pass
-    except Exception as e:
-        print(f"Warning: Could not restore messages to context: {e}")
+    return [entry.id for entry in entries]
 
 
 def load_json_chats(jsons: list[str]):
@@ -175,27 +85,17 @@ def export_json_chat(context: AgentContext):
 
 def remove_chat(ctxid):
     """Remove a chat or task context from both Supabase and local storage"""
-    # Remove from Supabase
-    supabase_ghost.clear_ghost_conversation(ctxid)
+    # Remove from Supabase, in the background
+    supabase_sync.remove(ctxid)
     
     # Remove from local storage
-    path = get_chat_folder_path(ctxid)
-    files.delete_dir(path)
+    persist_chat.remove_chat(ctxid)
 
 
 def _get_chat_file_path(ctxid: str):
     return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_FILE_NAME)
 
 
-def _convert_v080_chats():
-    json_files = files.list_files(CHATS_FOLDER, "*.json")
-    for file in json_files:
-        path = files.get_abs_path(CHATS_FOLDER, file)
-        name = file.rstrip(".json")
-        new = _get_chat_file_path(name)
-        files.move_file(path, new)
-
-
 def _serialize_context(context: AgentContext):
     # serialize agents
     agents = []
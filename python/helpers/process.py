@@ -21,6 +21,16 @@ def stop_server():
 
 def reload():
     stop_server()
+    # execv skips atexit handlers, save pending memory and chat changes first
+    memory = sys.modules.get("python.helpers.memory")
+    if memory:
+        memory.Memory.flush()
+    chat_journal = sys.modules.get("python.helpers.chat_journal")
+    if chat_journal:
+        chat_journal.flush_all()
+    supabase_sync = sys.modules.get("python.helpers.supabase_sync")
+    if supabase_sync:
+        supabase_sync.sync.flush()
     if runtime.is_dockerized():
         exit_process()
     else:
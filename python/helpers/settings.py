@@ -72,6 +72,8 @@ class Settings(TypedDict):
     memory_memorize_enabled: bool
     memory_memorize_consolidation: bool
     memory_memorize_replace_threshold: float
+    memory_index_type: str
+    memory_index_ann_threshold: int
 
     api_keys: dict[str, str]
 
@@ -818,6 +820,31 @@ def convert_out(settings: Settings) -> SettingsOutput:
         }
     )
 
+    memory_fields.append(
+        {
+            "id": "memory_index_type",
+            "title": "Memory index type",
+            "description": "Vector index used to search large memory stores. Flat compares the query with every memory and is exact. HNSW and IVF-PQ are approximate, much faster on large stores, and are built in the background once the store reaches the threshold below.",
+            "type": "select",
+            "value": settings["memory_index_type"],
+            "options": [
+                {"value": "flat", "label": "Flat (exact)"},
+                {"value": "hnsw", "label": "HNSW"},
+                {"value": "ivfpq", "label": "IVF-PQ"},
+            ],
+        }
+    )
+
+    memory_fields.append(
+        {
+            "id": "memory_index_ann_threshold",
+            "title": "Memory approximate index threshold",
+            "description": "Number of memories from which the approximate index is used. Searches over fewer memories (e.g. a small area) stay exact.",
+            "type": "number",
+            "value": settings["memory_index_ann_threshold"],
+        }
+    )
+
     memory_section: SettingsSection = {
         "id": "memory",
         "title": "Memory",
@@ -1414,6 +1441,8 @@ def get_default_settings() -> Settings:
         memory_memorize_enabled=True,
         memory_memorize_consolidation=True,
         memory_memorize_replace_threshold=0.9,
+        memory_index_type="flat",
+        memory_index_ann_threshold=50000,
         api_keys={},
         auth_login="",
         auth_password="",
@@ -1450,7 +1479,7 @@ def _apply_settings(previous: Settings | None):
         from initialize import initialize_agent
 
         config = initialize_agent()
-        for ctx in AgentContext._contexts.values():
+        for ctx in AgentContext.all():
             ctx.config = config  # reinitialize context config with new settings
             # apply config to agents
             agent = ctx.agent0
@@ -1474,6 +1503,16 @@ def _apply_settings(previous: Settings | None):
 
             memory_reload()
 
+        # switch memory index type
+        elif (
+            _settings["memory_index_type"] != previous["memory_index_type"]
+            or _settings["memory_index_ann_threshold"]
+            != previous["memory_index_ann_threshold"]
+        ):
+            from python.helpers.memory import Memory
+
+            Memory.configure_indexes()
+
         # update mcp settings if necessary
         if not previous or _settings["mcp_servers"] != previous["mcp_servers"]:
             from python.helpers.mcp_handler import MCPConfig
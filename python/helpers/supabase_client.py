@@ -12,13 +12,14 @@ SUPABASE_SERVICE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmF
 
 # Default user ID (consistent across all devices)
 DEFAULT_USER_ID = "8123d05f-5af8-4e39-b2b2-677416dacf07"
+DEFAULT_FARM_ID = "default-ghost-farm"
 
 class SupabaseGhostClient:
     """Supabase client for Ghost AI system to persist conversations"""
     
-    def __init__(self):
+    def __init__(self, url: str = SUPABASE_URL, key: str = SUPABASE_SERVICE_KEY):
         # Use service role key for full access from Python backend
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        self.client: Client = create_client(url, key)
         self.user_id = DEFAULT_USER_ID
         
     def save_ghost_conversation(
@@ -158,6 +159,51 @@ class SupabaseGhostClient:
             print(f"❌ Error clearing Ghost conversation from Supabase: {e}")
             return False
     
+    # Batch operations used by the background sync, errors are raised so the caller can retry
+
+    def find_ghost_conversations(
+        self, property_ids: List[str], farm_id: str = DEFAULT_FARM_ID
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Messages of the existing conversations among property_ids, in one request"""
+        if not property_ids:
+            return {}
+        result = self.client.table('ghost_conversations').select('property_id, messages').eq(
+            'user_id', self.user_id
+        ).eq('farm_id', farm_id).in_('property_id', property_ids).execute()
+        return {row['property_id']: row.get('messages') or [] for row in result.data or []}
+
+    def insert_ghost_conversations(
+        self, conversations: Dict[str, List[Dict[str, Any]]], farm_id: str = DEFAULT_FARM_ID
+    ):
+        """Insert new conversations, property id -> messages, in one request"""
+        now = datetime.now().isoformat()
+        rows = [
+            {
+                "user_id": self.user_id,
+                "property_id": property_id,
+                "farm_id": farm_id,
+                "messages": messages,
+                "updated_at": now,
+            }
+            for property_id, messages in conversations.items()
+        ]
+        if rows:
+            self.client.table('ghost_conversations').insert(rows).execute()
+
+    def update_ghost_messages(
+        self, property_id: str, messages: List[Dict[str, Any]], farm_id: str = DEFAULT_FARM_ID
+    ):
+        self.client.table('ghost_conversations').update({
+            "messages": messages,
+            "updated_at": datetime.now().isoformat()
+        }).eq('user_id', self.user_id).eq('property_id', property_id).eq('farm_id', farm_id).execute()
+
+    def delete_ghost_conversations(self, property_ids: List[str], farm_id: str = DEFAULT_FARM_ID):
+        if property_ids:
+            self.client.table('ghost_conversations').delete().eq(
+                'user_id', self.user_id
+            ).eq('farm_id', farm_id).in_('property_id', property_ids).execute()
+
     def _convert_messages_format(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Convert Agent Zero message format to Legacy Compass format"""
         converted = []
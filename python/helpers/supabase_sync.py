@@ -0,0 +1,294 @@
+import atexit
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from python.helpers.log import Log
+from python.helpers.print_style import PrintStyle
+
+SYNC_DELAY = 2.0  # seconds changes are collected before an upload
+SYNC_WINDOW = 10  # latest log messages mirrored in a conversation row
+MAX_PENDING = 256  # chats waiting for upload, the oldest is dropped beyond this
+RETRY_MIN = 1.0  # backoff after a failed upload, doubled up to RETRY_MAX
+RETRY_MAX = 60.0
+
+
+@dataclass
+class _ChatSync:
+    name: str = ""
+    log_guid: str = ""
+    log: weakref.ref | None = None  # positions below refer to this log object
+    queued: int = 0  # log updates already converted to pending messages
+    acked: int = 0  # log updates the server has confirmed
+    exists: bool | None = None  # whether the row exists, None until known
+    window: list[tuple[int, dict]] = field(default_factory=list)  # (log item no, message) as stored
+    pending: dict[int, dict] = field(default_factory=dict)  # log item no -> message not uploaded yet
+
+
+class SupabaseSync:
+    """Mirrors chat logs to the ghost_conversations table from a background thread.
+
+    Saves only convert the log items updated since the previous save into messages, queue
+    them and return. The worker collects what arrives within SYNC_DELAY and syncs all chats
+    in one pass: a single query for rows it has not seen yet, a single insert for new rows
+    and an update per changed row. Failed passes are retried with exponential backoff and
+    a chat counts as synced only once the server accepted it.
+
+    At most MAX_PENDING chats wait for upload. When the oldest is dropped its log position
+    goes back to the last acknowledged one, so its next save converts the missed items again.
+    """
+
+    def __init__(self, client_factory, delay: float = SYNC_DELAY, max_pending: int = MAX_PENDING):
+        self._client_factory = client_factory
+        self._client = None
+        self.delay = delay
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._sync_lock = threading.Lock()  # one pass at a time, worker or flush
+        self._chats: dict[str, _ChatSync] = {}
+        self._dirty: OrderedDict[str, None] = OrderedDict()
+        self._prefetch: list[tuple[str, str, int, str]] = []
+        self._removed: set[str] = set()
+        self._loaded: dict[str, tuple[weakref.ref, int]] = {}  # context id -> (log, updates) as loaded
+        self._thread: threading.Thread | None = None
+        self._stats = {"passes": 0, "rows": 0, "requests": 0, "failures": 0, "dropped": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def submit(self, context_id: str, name: str, log: Log):
+        """Queue the log items updated since the last call, called by the thread owning the log."""
+        with self._lock:
+            chat = self._chats.get(context_id)
+            if chat is None:
+                chat = self._chats[context_id] = _ChatSync()
+            if chat.log_guid != log.guid:  # new or reset log, the row is rebuilt from it
+                chat.log_guid = log.guid
+                chat.queued = chat.acked = 0
+                chat.window = []
+                chat.pending = {}
+                self._dirty[context_id] = None
+            elif chat.log is None or chat.log() is not log:
+                # the same log loaded again from disk, synced up to where it was loaded, items
+                # added since are queued below, without attach() everything is sent again
+                loaded = self._loaded.get(context_id)
+                chat.queued = chat.acked = loaded[1] if loaded and loaded[0]() is log else 0
+            self._loaded.pop(context_id, None)
+            chat.log = weakref.ref(log)
+            chat.name = name
+            end = len(log.updates)
+            for item in log.output(start=chat.queued, end=end):
+                if message := _message(context_id, log.guid, item):
+                    chat.pending[item["no"]] = message
+            chat.queued = end
+            if len(chat.pending) > SYNC_WINDOW:
+                for no in sorted(chat.pending)[:-SYNC_WINDOW]:
+                    del chat.pending[no]
+            if chat.pending:
+                self._dirty[context_id] = None
+            if context_id in self._dirty:
+                self._dirty.move_to_end(context_id)
+                while len(self._dirty) > self.max_pending:
+                    self._drop(next(iter(self._dirty)))
+                self._start()
+
+    def attach(self, context_id: str, log: Log):
+        """Note a chat log just loaded from disk, its items count as synced once the row exists."""
+        with self._lock:
+            self._loaded[context_id] = (weakref.ref(log), len(log.updates))
+
+    def prefetch(self, chats: dict[str, tuple[str, str, int]]):
+        """Look up the rows of saved chats, context id -> (name, log guid, log updates), in one query.
+
+        Chats whose row exists count as synced up to the given log state.
+        """
+        with self._lock:
+            self._prefetch += [
+                (context_id, log_guid, updates, name)
+                for context_id, (name, log_guid, updates) in chats.items()
+            ]
+            if self._prefetch:
+                self._start()
+
+    def remove(self, context_id: str):
+        with self._lock:
+            self._chats.pop(context_id, None)
+            self._dirty.pop(context_id, None)
+            self._loaded.pop(context_id, None)
+            self._removed.add(context_id)
+            self._start()
+
+    def flush(self):
+        """Sync what is queued now, on the calling thread."""
+        try:
+            self._sync()
+        except Exception as e:
+            PrintStyle.error(f"Supabase sync failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._dirty)
+        return stats
+
+    def _drop(self, context_id: str):
+        del self._dirty[context_id]
+        if chat := self._chats.get(context_id):
+            chat.pending = {}
+            chat.queued = chat.acked
+        self._stats["dropped"] += 1
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SupabaseSync", daemon=True)
+            self._thread.start()
+        self._wake.notify()
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            with self._lock:
+                while not (self._dirty or self._prefetch or self._removed):
+                    self._wake.wait()
+            time.sleep(backoff or self.delay)
+            try:
+                self._sync()
+                backoff = 0.0
+            except Exception as e:
+                backoff = min(RETRY_MAX, max(RETRY_MIN, backoff * 2))
+                with self._lock:
+                    self._stats["failures"] += 1
+                PrintStyle.error(f"Supabase sync failed, retrying in {backoff:.0f}s: {e}")
+
+    def _sync(self):
+        with self._sync_lock:
+            with self._lock:
+                prefetch, self._prefetch = self._prefetch, []
+                removed, self._removed = list(self._removed), set()
+                batch = {
+                    context_id: (chat, chat.log_guid, chat.queued, dict(chat.pending))
+                    for context_id, chat in ((id, self._chats[id]) for id in self._dirty)
+                }
+                self._dirty.clear()
+                self._stats["passes"] += 1
+            try:
+                self._upload(prefetch, removed, batch)
+            except Exception:
+                with self._lock:  # everything not acknowledged goes back in the queue
+                    self._prefetch = prefetch + self._prefetch
+                    self._removed.update(removed)
+                    for context_id in batch:
+                        if context_id in self._chats and context_id not in self._dirty:
+                            self._dirty[context_id] = None
+                            self._dirty.move_to_end(context_id, last=False)
+                raise
+
+    def _upload(self, prefetch: list, removed: list, batch: dict):
+        if removed:
+            self._request(self.client.delete_ghost_conversations, removed, rows=len(removed))
+            removed.clear()
+
+        unknown = [id for id, *_ in prefetch] + [
+            id for id, (chat, *_) in batch.items() if chat.exists is None
+        ]
+        if unknown:
+            rows = self._request(self.client.find_ghost_conversations, unknown)
+            with self._lock:
+                for context_id, log_guid, updates, name in prefetch:
+                    chat = self._chats.get(context_id)
+                    if chat is None and context_id in rows:
+                        chat = self._chats[context_id] = _ChatSync(
+                            name=name, log_guid=log_guid, queued=updates, acked=updates
+                        )
+                        count = len(rows[context_id])
+                        chat.window = [(i - count, m) for i, m in enumerate(rows[context_id])]
+                    if chat:
+                        chat.exists = context_id in rows
+                for context_id, (chat, *_) in batch.items():
+                    chat.exists = context_id in rows
+            prefetch.clear()
+
+        inserts: dict[str, list[dict]] = {}
+        updates: dict[str, list[dict]] = {}
+        windows: dict[str, list[tuple[int, dict]]] = {}
+        for context_id, (chat, log_guid, queued, pending) in batch.items():
+            window = windows[context_id] = _merge(chat.window, pending)
+            messages = [message for _, message in window] or [_placeholder(chat.name)]
+            (updates if chat.exists else inserts)[context_id] = messages
+
+        if inserts:
+            self._request(self.client.insert_ghost_conversations, inserts, rows=len(inserts))
+            with self._lock:
+                for context_id in inserts:
+                    batch[context_id][0].exists = True
+                    self._ack(context_id, batch.pop(context_id), windows[context_id])
+        for context_id, messages in updates.items():
+            self._request(self.client.update_ghost_messages, context_id, messages, rows=1)
+            with self._lock:
+                self._ack(context_id, batch.pop(context_id), windows[context_id])
+
+    def _request(self, fn, *args, rows: int = 0):
+        result = fn(*args)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["rows"] += rows  # rows written
+        return result
+
+    def _ack(self, context_id: str, item: tuple, window: list[tuple[int, dict]]):
+        chat, log_guid, queued, sent = item
+        if self._chats.get(context_id) is not chat or chat.log_guid != log_guid:
+            return  # removed or reset meanwhile, the newer state is queued on its own
+        chat.window = window
+        chat.acked = max(chat.acked, queued)
+        chat.queued = max(chat.queued, chat.acked)  # may have been dropped while in flight
+        for no, message in sent.items():
+            if chat.pending.get(no) is message:
+                del chat.pending[no]
+
+
+def _message(context_id: str, log_guid: str, item: dict[str, Any]) -> dict | None:
+    content = item.get("content")
+    if not content:
+        return None
+    heading = item.get("heading")
+    return {
+        # stable per log item, so an updated item replaces its message instead of adding one
+        "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{context_id}/{log_guid}/{item['no']}")),
+        "role": "assistant" if item.get("type") == "agent" else "user",
+        "content": f"{heading}: {content}" if heading else content,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def _placeholder(name: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "role": "system",
+        "content": f"Ghost AI conversation context: {name or 'Unknown'}",
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def _merge(window: list[tuple[int, dict]], pending: dict[int, dict]) -> list[tuple[int, dict]]:
+    merged = {no: message for no, message in window}
+    merged.update(pending)
+    return sorted(merged.items(), key=lambda entry: entry[0])[-SYNC_WINDOW:]
+
+
+def _default_client():
+    from python.helpers.supabase_client import supabase_ghost
+
+    return supabase_ghost
+
+
+sync = SupabaseSync(_default_client)
+atexit.register(sync.flush)
@@ -1,7 +1,10 @@
 from abc import abstractmethod
 from dataclasses import dataclass
+import os
+import threading
 
 from agent import Agent, LoopData
+from python.helpers import extract_tools, files
 from python.helpers.print_style import PrintStyle
 from python.helpers.strings import sanitize_string
 
@@ -53,3 +56,68 @@ class Tool:
         words = [words[0].capitalize()] + [word.lower() for word in words[1:]]
         result = ' '.join(words)
         return result
+
+
+# process-wide registry of resolved tool classes, keyed by (profile, tool name)
+# each entry remembers the mtimes of the candidate files it was resolved from
+_registry: dict[tuple[str, str], tuple[tuple, type[Tool] | None]] = {}
+_registry_lock = threading.Lock()
+_registry_stats = {"hits": 0, "misses": 0}
+
+
+def _tool_paths(profile: str, name: str) -> list[str]:
+    paths = []
+    if profile:
+        paths.append("agents/" + profile + "/tools/" + name + ".py")
+    paths.append("python/tools/" + name + ".py")
+    return paths
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return os.stat(files.get_abs_path(path)).st_mtime
+    except OSError:
+        return None
+
+
+def get_tool_class(profile: str, name: str) -> type[Tool] | None:
+    """Resolve the tool class for a profile, profile tools first, then default tools.
+
+    Classes are cached per (profile, name) and reloaded when any candidate file
+    is added, removed or modified, so editing a tool still takes effect without a restart.
+    """
+    paths = _tool_paths(profile, name)
+    signature = tuple((path, _mtime(path)) for path in paths)
+    key = (profile, name)
+
+    with _registry_lock:
+        cached = _registry.get(key)
+        if cached and cached[0] == signature:
+            _registry_stats["hits"] += 1
+            return cached[1]
+        _registry_stats["misses"] += 1
+
+        tool_class = None
+        for path, mtime in signature:
+            if mtime is None:
+                continue
+            try:
+                classes = extract_tools.load_classes_from_file(path, Tool)
+            except Exception:
+                continue
+            if classes:
+                tool_class = classes[0]
+                break
+
+        _registry[key] = (signature, tool_class)
+        return tool_class
+
+
+def get_registry_stats() -> dict[str, int]:
+    with _registry_lock:
+        return {**_registry_stats, "size": len(_registry)}
+
+
+def clear_registry():
+    with _registry_lock:
+        _registry.clear()
@@ -1,5 +1,8 @@
 from typing import Any, List, Sequence
+import asyncio
 import uuid
+
+import numpy as np
 from langchain_community.vectorstores import FAISS
 
 # faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
@@ -8,12 +11,11 @@ import faiss
 
 
 from langchain_core.documents import Document
-from langchain.storage import InMemoryByteStore
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores.utils import (
     DistanceStrategy,
 )
-from langchain.embeddings import CacheBackedEmbeddings
+from python.helpers.embedding_cache import CachedEmbeddings, EmbeddingStore
 
 from agent import Agent
 
@@ -33,7 +35,7 @@ class MyFaiss(FAISS):
 
 class VectorDB:
 
-    _cached_embeddings: dict[str, CacheBackedEmbeddings] = {}
+    _cached_embeddings: dict[str, CachedEmbeddings] = {}
 
     @staticmethod
     def _get_embeddings(agent: Agent, cache: bool = True):
@@ -46,13 +48,8 @@ class VectorDB:
             "default",
         )
         if namespace not in VectorDB._cached_embeddings:
-            store = InMemoryByteStore()
-            VectorDB._cached_embeddings[namespace] = (
-                CacheBackedEmbeddings.from_bytes_store(
-                    model,
-                    store,
-                    namespace=namespace,
-                )
+            VectorDB._cached_embeddings[namespace] = CachedEmbeddings(
+                model, EmbeddingStore()
             )
         return VectorDB._cached_embeddings[namespace]
 
@@ -85,6 +82,57 @@ class VectorDB:
             filter=comparator,
         )
 
+    async def search_by_similarity_threshold_multi(
+        self, queries: list[str], limit: int, threshold: float, filter: str = ""
+    ) -> list[list[Document]]:
+        """Search several queries at once: one embedding call and one faiss batch search.
+
+        The filter is evaluated on the stored documents first and restricts the search
+        inside faiss, so every query gets up to `limit` matching results.
+        """
+        if not queries or not self.index.ntotal:
+            return [[] for _ in queries]
+
+        if isinstance(self.embeddings, CachedEmbeddings):
+            vectors = await self.embeddings.aembed_queries(queries)
+        else:
+            vectors = await self.embeddings.aembed_documents(queries)
+
+        def search():
+            ntotal = self.index.ntotal
+            rows = ntotal
+            bitmap = selector = params = None
+            if filter:
+                comparator = get_comparator(filter)
+                docs = self.db.docstore._dict  # type: ignore
+                mask = np.array(
+                    [comparator(docs[self.db.index_to_docstore_id[row]].metadata) for row in range(ntotal)],
+                    dtype=bool,
+                )
+                rows = int(mask.sum())
+                if rows < ntotal:
+                    # params only hold raw pointers, the python objects must outlive the search
+                    bitmap = np.packbits(mask, bitorder="little")
+                    selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+                    params = faiss.SearchParameters(sel=selector)
+            if not rows:
+                return [[] for _ in queries]
+
+            scores, found = self.index.search(
+                np.array(vectors, dtype=np.float32), min(limit, rows), params=params
+            )
+            results = []
+            for query_scores, query_rows in zip(scores, found):
+                docs = []
+                for score, row in zip(query_scores, query_rows):
+                    if row < 0 or cosine_normalizer(score) < threshold:
+                        break
+                    docs.append(self.db.docstore.search(self.db.index_to_docstore_id[row]))
+                results.append(docs)
+            return results
+
+        return await asyncio.to_thread(search)
+
     async def search_by_metadata(self, filter: str, limit: int = 0) -> list[Document]:
         comparator = get_comparator(filter)
         all_docs = self.db.get_all_docs()
@@ -97,14 +145,22 @@ class VectorDB:
                     break
         return result
 
-    async def insert_documents(self, docs: list[Document]):
+    async def insert_documents(self, docs: list[Document], vectors: Sequence[Sequence[float]] | None = None):
         ids = [str(uuid.uuid4()) for _ in range(len(docs))]
 
         if ids:
             for doc, id in zip(docs, ids):
                 doc.metadata["id"] = id  # add ids to documents metadata
 
-            self.db.add_documents(documents=docs, ids=ids)
+            if vectors is None:
+                await self.db.aadd_documents(documents=docs, ids=ids)
+            else:
+                # already embedded, e.g. loaded from the document index
+                self.db.add_embeddings(
+                    zip([doc.page_content for doc in docs], [list(vector) for vector in vectors]),
+                    metadatas=[doc.metadata for doc in docs],
+                    ids=ids,
+                )
         return ids
 
     async def delete_documents_by_ids(self, ids: list[str]):
@@ -138,9 +194,15 @@ def cosine_normalizer(val: float) -> float:
 
 
 def get_comparator(condition: str):
+    # compile once, evaluate per document
+    try:
+        code = compile(condition.strip(), "<filter>", "eval")
+    except SyntaxError:
+        return lambda data: False
+
     def comparator(data: dict[str, Any]):
         try:
-            result = eval(condition, {}, data)
+            result = eval(code, {}, data)
             return result
         except Exception as e:
             # PrintStyle.error(f"Error evaluating condition: {e}")
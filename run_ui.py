@@ -9,14 +9,14 @@ from functools import wraps
 import threading
 from flask import Flask, request, Response, session, jsonify
 from flask_basicauth import BasicAuth
-import initialize
-from python.helpers import files, git, mcp_server, fasta2a_server
+from python.helpers import files, dotenv
 from python.helpers.files import get_abs_path
-from python.helpers import runtime, dotenv, process
-from python.helpers.extract_tools import load_classes_from_folder
-from python.helpers.api import ApiHandler
 from python.helpers.print_style import PrintStyle
 
+# Document extraction workers are spawned processes, which import this script again as
+# __mp_main__. The agent framework (initialize, runtime, settings, models...) is therefore
+# only imported inside the functions that run the server, not at module level.
+
 
 # Set the new timezone to 'UTC'
 os.environ["TZ"] = "UTC"
@@ -31,7 +31,6 @@ webapp.secret_key = os.getenv("FLASK_SECRET_KEY") or secrets.token_hex(32)
 thread_lock = threading.Lock()  # Global thread lock for API handlers
 webapp.config.update(
     JSON_SORT_KEYS=False,
-    SESSION_COOKIE_NAME="session_" + runtime.get_runtime_id(),  # bind the session cookie name to runtime id to prevent session collision on same host
     SESSION_COOKIE_SAMESITE="Strict",
     SESSION_PERMANENT=True,
     PERMANENT_SESSION_LIFETIME=timedelta(days=1)
@@ -137,6 +136,7 @@ def requires_auth(f):
 def csrf_protect(f):
     @wraps(f)
     async def decorated(*args, **kwargs):
+        from python.helpers import runtime
         token = session.get("csrf_token")
         header = request.headers.get("X-CSRF-Token")
         cookie = request.cookies.get("csrf_token_" + runtime.get_runtime_id())
@@ -152,6 +152,7 @@ def csrf_protect(f):
 @webapp.route("/", methods=["GET"])
 @requires_auth
 async def serve_index():
+    from python.helpers import git
     gitinfo = None
     try:
         gitinfo = git.get_git_info()
@@ -265,6 +266,13 @@ def save_elevenlabs_agent():
 def run():
     PrintStyle().print("Initializing framework...")
 
+    from python.helpers import runtime, process, mcp_server, fasta2a_server
+    from python.helpers.extract_tools import load_classes_from_folder
+    from python.helpers.api import ApiHandler
+
+    # bind the session cookie name to runtime id to prevent session collision on same host
+    webapp.config["SESSION_COOKIE_NAME"] = "session_" + runtime.get_runtime_id()
+
     # Suppress only request logs but keep the startup messages
     from werkzeug.serving import WSGIRequestHandler
     from werkzeug.serving import make_server
@@ -341,12 +349,16 @@ def run():
 
 
 def init_a0():
+    import initialize
+
     # initialize contexts and MCP
     init_chats = initialize.initialize_chats()
     # only wait for init chats, otherwise they would seem to disappear for a while on restart
     init_chats.result_sync()
 
     initialize.initialize_mcp()
+    # watch prompt files if enabled
+    initialize.initialize_prompt_watcher()
     # start job loop
     initialize.initialize_job_loop()
     # preload
@@ -356,6 +368,7 @@ def init_a0():
 
 # run the internal server
 if __name__ == "__main__":
+    from python.helpers import runtime
     runtime.initialize()
     dotenv.load_dotenv()
     run()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# the tests import the framework the way run_ui does, from the project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: full size benchmark taking a minute or more, deselect with -m 'not slow'"
+    )
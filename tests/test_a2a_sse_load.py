@@ -0,0 +1,127 @@
+"""
+A2A task events over SSE: 200 clients streaming from a server holding 10k tasks while tasks
+complete, and a client too slow to read its events.
+
+Run with -s to see the delivery latency.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+import uvicorn
+from httpx_sse import aconnect_sse
+
+from python.helpers import a2a_handler, a2a_task_store
+from python.helpers.a2a_handler import A2AHandler, TaskState
+from python.helpers.a2a_server import A2AServer
+
+CLIENTS = 200
+TASKS = 10_000
+COMPLETIONS = 100
+DURATION = 5.0  # seconds over which the completions are spread
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(a2a_task_store, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(A2AHandler, "_instance", None)
+    return A2AHandler.get_instance()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def stream(client: httpx.AsyncClient, url: str, latencies: list[float]) -> int:
+    """Completions received by one SSE client, until all of them arrived"""
+    received = 0
+    async with aconnect_sse(client, "GET", url) as events:
+        async for event in events.aiter_sse():
+            if event.event != "TaskStatusUpdateEvent":
+                continue
+            data = json.loads(event.data)
+            if data["state"] == TaskState.COMPLETED.value:
+                latencies.append(time.time() - datetime.fromisoformat(data["timestamp"]).timestamp())
+                received += 1
+                if received == COMPLETIONS:
+                    return received
+    return received
+
+
+def test_200_clients_10k_tasks(handler):
+    server = A2AServer({"auth_required": False, "agent_id": "load", "role": "test"}, None)
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.create_app(), host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+
+    loop = asyncio.new_event_loop()
+    ids = [loop.run_until_complete(handler.create_task("task", {})) for _ in range(TASKS)]
+    loop.close()
+    for task_id in ids:
+        handler.update_task_state(task_id, TaskState.WORKING)
+
+    def complete():
+        while len(server.sse_clients) < CLIENTS:
+            time.sleep(0.05)
+        start = time.time()
+        for i, task_id in enumerate(ids[:COMPLETIONS]):
+            time.sleep(max(0.0, start + DURATION * i / COMPLETIONS - time.time()))
+            handler.add_task_artifact(task_id, "text/plain", f"result {i}")
+            handler.update_task_state(task_id, TaskState.COMPLETED)
+
+    async def run_clients():
+        latencies: list[float] = []
+        limits = httpx.Limits(max_connections=CLIENTS + 10)
+        async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+            clients = [
+                asyncio.create_task(stream(client, f"http://127.0.0.1:{port}/message/stream", latencies))
+                for _ in range(CLIENTS)
+            ]
+            producer = threading.Thread(target=complete, daemon=True)
+            producer.start()
+            done, pending = await asyncio.wait(clients, timeout=DURATION + 30)
+            for task in pending:
+                task.cancel()
+            received = sum(task.result() for task in done)
+        return received, sorted(latencies)
+
+    try:
+        received, latencies = asyncio.run(run_clients())
+    finally:
+        uvicorn_server.should_exit = True
+
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"\n{CLIENTS} clients, {TASKS} tasks: {received}/{CLIENTS * COMPLETIONS} completions, "
+          f"latency p50 {p50:.0f} ms, p99 {p99:.0f} ms")
+    assert received == CLIENTS * COMPLETIONS
+    assert p99 < 1000  # the polling stream delivered after up to 5 s, most events not at all
+
+
+def test_lagging_client_keeps_final_states(handler):
+    async def run():
+        queue = handler.subscribe_task_events()
+        ids = [await handler.create_task("task", {}) for _ in range(3)]
+        for i in range(3 * a2a_handler.EVENT_QUEUE_SIZE):
+            handler.add_task_artifact(ids[i % 3], "text/plain", f"progress {i}")
+            if i == 10:
+                handler.update_task_state(ids[0], TaskState.COMPLETED)
+            if i == 20:
+                handler.update_task_state(ids[1], TaskState.FAILED, error="failed")
+        events = [json.loads(queue.get_nowait().split("data: ", 1)[1]) for _ in range(queue.qsize())]
+        return ids, events
+
+    ids, events = asyncio.run(run())
+    assert len(events) == a2a_handler.EVENT_QUEUE_SIZE
+    final = {event["taskId"]: event["state"] for event in events if event.get("state") in ("COMPLETED", "FAILED")}
+    assert final == {ids[0]: "COMPLETED", ids[1]: "FAILED"}
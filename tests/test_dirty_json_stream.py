@@ -0,0 +1,89 @@
+"""
+Streaming parse of model replies, DirtyJson.feed against re-parsing the whole reply per chunk.
+
+Run with -s to see the timings, the full re-parse of the 20k reply takes about 10 s and is
+marked slow.
+"""
+
+import json
+import time
+
+import pytest
+
+from python.helpers.dirty_json import DirtyJson
+
+CHUNK = 8  # characters per streamed chunk, about one token
+
+
+def make_reply(size: int) -> str:
+    """A tool call reply of about size characters, most of it a code argument"""
+    line = "for i in range(10): print(f'value {i}: {i * i}')  # \"quoted\" \\\\ text\n"
+    code = (line * (size // len(line) + 1))[:size]
+    return json.dumps({
+        "thoughts": ["The user wants squares", "I will run a short script"],
+        "headline": "Printing squares",
+        "tool_name": "code_execution_tool",
+        "tool_args": {"runtime": "python", "session": 0, "code": code},
+    }, indent=4)
+
+
+def chunks(text: str):
+    return [text[i:i + CHUNK] for i in range(0, len(text), CHUNK)]
+
+
+def stream_incremental(text: str):
+    parser = DirtyJson()
+    start = time.perf_counter()
+    for chunk in chunks(text):
+        result = parser.feed(chunk)
+    return time.perf_counter() - start, result
+
+
+def stream_reparse(text: str):
+    stream = ""
+    start = time.perf_counter()
+    for chunk in chunks(text):
+        stream += chunk
+        result = DirtyJson.parse_string(stream)
+    return time.perf_counter() - start, result
+
+
+@pytest.mark.parametrize("size", [2_000, 20_000, 100_000])
+def test_incremental_result_matches_json(size):
+    text = make_reply(size)
+    seconds, result = stream_incremental(text)
+    print(f"\n{size // 1000}k chars: incremental {seconds:.3f} s")
+    assert result == json.loads(text)
+    assert seconds < 2.0  # about 0.2 s at 100k, a re-parse per chunk does not finish in minutes
+
+
+def test_partial_results_follow_the_stream():
+    text = make_reply(2_000)
+    code = json.loads(text)["tool_args"]["code"]
+    parser = DirtyJson()
+    exposed = 0
+    for chunk in chunks(text):
+        partial = parser.feed(chunk)
+        if isinstance(partial, dict) and "code" in partial.get("tool_args", {}):
+            # the code argument is exposed while it streams, as a prefix of the final value
+            assert code.startswith(partial["tool_args"]["code"])
+            exposed += 1
+    assert exposed > len(code) // CHUNK // 2
+    assert partial == json.loads(text)
+
+
+def test_incremental_time_is_linear():
+    small, _ = stream_incremental(make_reply(20_000))
+    large, _ = stream_incremental(make_reply(100_000))
+    print(f"\nincremental 20k {small:.3f} s, 100k {large:.3f} s")
+    assert large < small * 12  # 5x the input, a quadratic parse would take 25x
+
+
+@pytest.mark.parametrize("size", [2_000, pytest.param(20_000, marks=pytest.mark.slow)])
+def test_incremental_against_reparse(size):
+    text = make_reply(size)
+    incremental, result = stream_incremental(text)
+    reparse, expected = stream_reparse(text)
+    print(f"\n{size // 1000}k chars: re-parse {reparse:.3f} s, incremental {incremental:.3f} s")
+    assert result == expected
+    assert incremental * 10 < reparse
@@ -0,0 +1,185 @@
+"""
+Single-file embedding store: 100k cached vectors, migration from the LocalFileStore layout
+and appends from several processes.
+
+Run with -s to see the timings, the comparison with the old one-file-per-vector layout is
+marked slow.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from python.helpers.embedding_cache import CachedEmbeddings, EmbeddingStore, text_key
+
+DIM = 384
+BATCH = 1000
+
+
+def vectors(start: int, count: int) -> np.ndarray:
+    # row i holds i in its first component, so a lookup can be checked against its key
+    rows = np.random.default_rng(start).random((count, DIM), dtype=np.float32)
+    rows[:, 0] = np.arange(start, start + count)
+    return rows
+
+
+def keys(start: int, count: int) -> list[bytes]:
+    return [text_key(f"text {i}") for i in range(start, start + count)]
+
+
+def test_100k_vectors(tmp_path):
+    path = str(tmp_path / "model")
+    count = 100_000
+
+    batches = [(keys(i, BATCH), vectors(i, BATCH).tolist()) for i in range(0, count, BATCH)]
+    start = time.perf_counter()
+    store = EmbeddingStore(path)
+    for batch in batches:
+        store.put(*batch)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = EmbeddingStore(path)
+    reopen = time.perf_counter() - start
+
+    lookups = np.random.default_rng(0).integers(0, count, 10_000)
+    start = time.perf_counter()
+    found = store.get([text_key(f"text {i}") for i in lookups])
+    lookup = time.perf_counter() - start
+
+    print(f"\n100k x {DIM}: write {write:.2f} s, reopen {reopen:.3f} s, 10k lookups {lookup:.3f} s")
+    assert len(store) == count
+    assert [int(vector[0]) for vector in found] == lookups.tolist()  # type: ignore
+    assert reopen < 1.0  # keys are read, vectors are memory-mapped
+
+
+def write_file_store(directory: str, namespace: str, start: int, count: int):
+    # the layout LocalFileStore left under memory/embeddings, one JSON file per vector
+    for key, vector in zip(keys(start, count), vectors(start, count).tolist()):
+        with open(os.path.join(directory, namespace + str(uuid.UUID(bytes=key))), "w") as f:
+            f.write(json.dumps(vector))
+
+
+@pytest.mark.slow
+def test_against_file_store(tmp_path):
+    count = 20_000
+    directory = str(tmp_path)
+
+    start = time.perf_counter()
+    write_file_store(directory, "old", 0, count)
+    file_write = time.perf_counter() - start
+    start = time.perf_counter()
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name)) as f:
+            json.loads(f.read())
+    file_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = EmbeddingStore(str(tmp_path / "new"))
+    for i in range(0, count, BATCH):
+        store.put(keys(i, BATCH), vectors(i, BATCH).tolist())
+    store_write = time.perf_counter() - start
+    start = time.perf_counter()
+    store = EmbeddingStore(str(tmp_path / "new"))
+    store.get(keys(0, count))
+    store_read = time.perf_counter() - start
+
+    print(f"\n20k vectors: files write {file_write:.2f} s, read {file_read:.2f} s | "
+          f"store write {store_write:.2f} s, read {store_read:.2f} s")
+    assert store_write < file_write and store_read < file_read
+
+
+def test_migrate_file_store(tmp_path):
+    directory = str(tmp_path)
+    write_file_store(directory, "model", 0, 3000)
+    with open(os.path.join(directory, "unrelated.txt"), "w") as f:
+        f.write("kept")
+
+    store = EmbeddingStore(os.path.join(directory, "model"))
+    assert store.migrate_file_store(directory, "model") == 3000
+    assert sorted(os.listdir(directory)) == ["model.idx", "model.lock", "model.vec", "unrelated.txt"]
+    found = EmbeddingStore(os.path.join(directory, "model")).get(keys(0, 3000))
+    assert [int(vector[0]) for vector in found] == list(range(3000))  # type: ignore
+
+
+def migrate(directory: str) -> int:
+    return EmbeddingStore(os.path.join(directory, "model")).migrate_file_store(directory, "model")
+
+
+def test_concurrent_migration(tmp_path):
+    directory = str(tmp_path)
+    write_file_store(directory, "model", 0, 3000)
+    with multiprocessing.Pool(4) as pool:
+        migrated = pool.map(migrate, [directory] * 4)
+    assert sorted(migrated) == [0, 0, 0, 3000]
+    assert len(EmbeddingStore(os.path.join(directory, "model"))) == 3000
+
+
+def append(path: str, worker: int):
+    store = EmbeddingStore(path)
+    for i in range(300):
+        start = worker * 10_000 + i * 3
+        store.put(keys(start, 3), vectors(start, 3).tolist())
+
+
+def test_appends_from_several_processes(tmp_path):
+    path = str(tmp_path / "model")
+    processes = [multiprocessing.Process(target=append, args=(path, worker)) for worker in range(6)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    store = EmbeddingStore(path)
+    expected = [worker * 10_000 + i for worker in range(6) for i in range(900)]
+    found = store.get([text_key(f"text {i}") for i in expected])
+    assert len(store) == len(expected)
+    assert [int(vector[0]) if vector else None for vector in found] == expected
+
+
+def test_torn_tail_is_cut_off(tmp_path):
+    path = str(tmp_path / "model")
+    EmbeddingStore(path).put(keys(0, 10), vectors(0, 10).tolist())
+    with open(path + ".vec", "ab") as f:
+        f.write(vectors(10, 1).tobytes()[:100])  # crash while appending a vector
+
+    store = EmbeddingStore(path)
+    assert len(store) == 10
+    assert os.path.getsize(path + ".vec") == 16 + 10 * DIM * 4
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [vectors(len(text), 1)[0].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_cached_embeddings(tmp_path):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, EmbeddingStore(str(tmp_path / "model")))
+
+    first = embeddings.embed_documents(["a", "bb", "a"])
+    assert embeddings.embed_documents(["bb", "a"]) == first[1:]
+    assert model.embedded == 3  # duplicates within a call are embedded, not stored twice
+
+    query = asyncio.run(embeddings.aembed_query("ccc"))
+    assert asyncio.run(embeddings.aembed_query("ccc")) == query
+    assert asyncio.run(embeddings.aembed_queries(["ccc", "dddd", "eeeee"]))[0] == query
+    assert model.embedded == 6
+
+    reopened = CachedEmbeddings(model, EmbeddingStore(str(tmp_path / "model")))
+    assert reopened.embed_query("ccc") == query
+    assert model.embedded == 6
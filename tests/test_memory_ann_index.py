@@ -0,0 +1,149 @@
+"""
+Approximate memory indexes against the exact flat index: recall@k and latency per query.
+
+Run with -s to see the numbers. By default hnsw is measured on 20k vectors, the 100k runs
+and ivfpq, whose training takes over a minute on one CPU, are marked slow.
+"""
+
+import time
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.embeddings import Embeddings
+
+from python.helpers.memory import Memory, MyFaiss
+
+DIM = 384
+QUERIES = 200
+K = 10
+CLUSTERS = 200
+AREAS = ["main", "fragments", "solutions"]
+
+
+class NoEmbeddings(Embeddings):
+    # searches go by vector, nothing is embedded
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def normalized(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def make_db(size: int):
+    """Clustered unit vectors like real embeddings, areas split 20/60/20"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((CLUSTERS, DIM)).astype(np.float32)
+    vectors = normalized(
+        centers[rng.integers(0, CLUSTERS, size)] + 0.6 * rng.standard_normal((size, DIM)).astype(np.float32)
+    )
+    queries = normalized(
+        centers[rng.integers(0, CLUSTERS, QUERIES)] + 0.6 * rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+    )
+    areas = rng.choice(AREAS, size, p=[0.2, 0.6, 0.2])
+    ids = [f"id{i}" for i in range(size)]
+
+    db = MyFaiss(
+        embedding_function=NoEmbeddings(),
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+    db.add_embeddings(
+        zip(ids, vectors.tolist()),
+        metadatas=[{"area": area, "id": id} for area, id in zip(areas, ids)],
+        ids=ids,
+    )
+    return db, queries
+
+
+def search(db: MyFaiss, queries: np.ndarray, areas: set[str] | None = None):
+    start = time.perf_counter()
+    results = [
+        [doc.metadata["id"] for doc, _ in db.search_by_vector(query.tolist(), K, 0.0, areas=areas)]
+        for query in queries
+    ]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def recall(results, truth) -> float:
+    return float(np.mean([len(set(found) & set(exact)) / K for found, exact in zip(results, truth)]))
+
+
+def build(db: MyFaiss, index_type: str, threshold: int) -> float:
+    start = time.perf_counter()
+    db.configure_ann(index_type, threshold)
+    assert db._ann_building
+    # searches stay on the flat index and are not blocked while the build runs
+    _, ms = search(db, np.zeros((1, DIM), dtype=np.float32) + 1 / np.sqrt(DIM))
+    assert ms < 1000
+    while db._ann_building:
+        time.sleep(0.05)
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("index_type,size,min_recall", [
+    ("hnsw", 20_000, 0.97),
+    pytest.param("hnsw", 100_000, 0.97, marks=pytest.mark.slow),
+    pytest.param("ivfpq", 20_000, 0.9, marks=pytest.mark.slow),
+    pytest.param("ivfpq", 100_000, 0.9, marks=pytest.mark.slow),
+])
+def test_recall_and_latency(index_type, size, min_recall):
+    db, queries = make_db(size)
+    truth, flat_ms = search(db, queries)
+    filtered_truth, _ = search(db, queries, {"main", "fragments"})
+
+    seconds = build(db, index_type, size // 2)
+    results, ann_ms = search(db, queries)
+    filtered, filtered_ms = search(db, queries, {"main", "fragments"})
+    assert db._ann is not None
+
+    print(
+        f"\n{size // 1000}k {index_type}: built in {seconds:.1f} s, flat {flat_ms:.2f} ms/query, "
+        f"{index_type} {ann_ms:.2f} ms/query recall@{K} {recall(results, truth):.3f}, "
+        f"area-filtered {filtered_ms:.2f} ms/query recall@{K} {recall(filtered, filtered_truth):.3f}"
+    )
+    assert recall(results, truth) >= min_recall
+    assert recall(filtered, filtered_truth) >= min_recall
+    assert ann_ms < flat_ms
+
+
+def test_changes_after_build():
+    db, queries = make_db(20_000)
+    build(db, "hnsw", 10_000)
+
+    # rows added after the build are appended to the approximate index
+    rng = np.random.default_rng(1)
+    extra = normalized(rng.standard_normal((5, DIM)).astype(np.float32))
+    extra_ids = [f"x{i}" for i in range(5)]
+    db.add_embeddings(
+        zip(extra_ids, extra.tolist()), metadatas=[{"area": "main", "id": id} for id in extra_ids], ids=extra_ids
+    )
+    top = db.search_by_vector(extra[2].tolist(), 1, 0.0)
+    assert top[0][0].metadata["id"] == "x2"
+    assert len(db._ann) == 20_005  # type: ignore
+
+    # deleted documents are skipped until the next rebuild
+    db.delete(ids=["x2"])
+    top = db.search_by_vector(extra[2].tolist(), 1, 0.0)
+    assert top[0][0].metadata["id"] != "x2"
+    assert db._ann.deleted == 1  # type: ignore
+
+    # an area smaller than the threshold is searched exactly on the flat index
+    db.configure_ann("hnsw", 8_000)
+    while db._ann_building:
+        time.sleep(0.05)
+    truth, _ = search(db, queries[:20], {"main"})
+    exact = db._ann
+    db._ann = None
+    flat, _ = search(db, queries[:20], {"main"})
+    db._ann = exact
+    assert truth == flat
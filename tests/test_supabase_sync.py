@@ -0,0 +1,237 @@
+"""
+Background Supabase sync against a local stand-in for the PostgREST endpoint of
+ghost_conversations, answering after LATENCY like a remote server.
+
+Run with -s to see the timings.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+
+from python.helpers import supabase_sync
+from python.helpers.log import Log, LogItem
+from python.helpers.supabase_client import SupabaseGhostClient
+from python.helpers.supabase_sync import SupabaseSync
+
+LATENCY = 0.02
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), PostgrestHandler)
+        self.rows: list[dict] = []
+        self.requests: list[str] = []
+        self.failures = 0  # next requests answered with 503
+        self.lock = threading.Lock()
+
+    def row(self, property_id: str) -> dict:
+        return next(row for row in self.rows if row["property_id"] == property_id)
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    server: StandIn
+
+    def log_message(self, format, *args):
+        pass
+
+    def _matching(self) -> list[dict]:
+        filters = [(k, v) for k, v in parse_qsl(urlparse(self.path).query) if k not in ("select", "columns")]
+
+        def match(row):
+            for column, condition in filters:
+                op, _, value = condition.partition(".")
+                if op == "eq" and str(row.get(column)) != value:
+                    return False
+                if op == "in" and row.get(column) not in [v.strip('"') for v in value.strip("()").split(",")]:
+                    return False
+            return True
+
+        return [row for row in self.server.rows if match(row)]
+
+    def _handle(self):
+        time.sleep(LATENCY)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.server.lock:
+            self.server.requests.append(self.command)
+            if self.server.failures:
+                self.server.failures -= 1
+                return self._reply(503, {"message": "unavailable"})
+            if self.command == "GET":
+                return self._reply(200, self._matching())
+            if self.command == "POST":
+                rows = body if isinstance(body, list) else [body]
+                self.server.rows.extend(rows)
+                return self._reply(201, rows)
+            matching = self._matching()
+            for row in matching:
+                if self.command == "PATCH":
+                    row.update(body)
+                else:
+                    self.server.rows.remove(row)
+            return self._reply(200, matching)
+
+    def _reply(self, status: int, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+
+@pytest.fixture
+def server():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(server):
+    return SupabaseGhostClient(url=f"http://127.0.0.1:{server.server_port}")
+
+
+def contents(server: StandIn, property_id: str) -> list[str]:
+    return [message["content"] for message in server.row(property_id)["messages"]]
+
+
+def test_saves_are_batched(server, client):
+    saves = 30
+    start = time.perf_counter()
+    for i in range(saves):
+        client.save_ghost_conversation(f"legacy{i % 5}", "chat", [{"role": "user", "content": f"m{j}"} for j in range(10)])
+    legacy = (time.perf_counter() - start) / saves
+    legacy_requests = len(server.requests)
+
+    server.requests.clear()
+    sync = SupabaseSync(lambda: client, delay=0.3)
+    logs = {f"ctx{c}": Log() for c in range(5)}
+    start = time.perf_counter()
+    for i in range(saves):
+        for context_id, log in logs.items():
+            log.log(type="agent", heading=f"h{i}", content=f"c{i}")
+            sync.submit(context_id, context_id, log)
+    submit = (time.perf_counter() - start) / (saves * len(logs))
+    time.sleep(1.0)
+
+    print(f"\nlegacy save {legacy * 1000:.1f} ms blocking, {legacy_requests} requests for {saves} saves | "
+          f"submit {submit * 1000:.3f} ms, {len(server.requests)} requests for {saves * len(logs)} saves")
+    assert server.requests == ["GET", "POST"]  # one lookup and one insert for all chats
+    assert submit < LATENCY / 10
+    for context_id in logs:
+        assert contents(server, context_id) == [f"h{i}: c{i}" for i in range(saves - 10, saves)]
+
+
+def test_edited_item_replaces_its_message(server, client):
+    sync = SupabaseSync(lambda: client, delay=0.1)
+    log = Log()
+    for i in range(3):
+        log.log(type="agent", heading=f"h{i}", content=f"c{i}")
+    sync.submit("ctx", "ctx", log)
+    sync.flush()
+    ids = [message["id"] for message in server.row("ctx")["messages"]]
+
+    server.requests.clear()
+    log.logs[-1].update(content="edited")
+    sync.submit("ctx", "ctx", log)
+    sync.flush()
+    assert server.requests == ["PATCH"]
+    assert contents(server, "ctx")[-1] == "h2: edited"
+    assert [message["id"] for message in server.row("ctx")["messages"]] == ids
+
+
+def test_failures_are_retried_with_backoff(server, client, monkeypatch):
+    monkeypatch.setattr(supabase_sync, "RETRY_MIN", 0.2)
+    sync = SupabaseSync(lambda: client, delay=0.1)
+    log = Log()
+    log.log(type="user", content="after outage")
+    server.failures = 2
+    start = time.perf_counter()
+    sync.submit("ctx", "ctx", log)
+    while not server.rows and time.perf_counter() - start < 5:
+        time.sleep(0.05)
+    waited = time.perf_counter() - start
+
+    assert contents(server, "ctx") == ["after outage"]
+    assert sync.stats()["failures"] == 2
+    assert waited > 0.1 + 0.2 + 0.4  # delay, then backoff doubling from RETRY_MIN
+
+
+def test_overflowed_chats_are_synced_on_next_save(server, client):
+    sync = SupabaseSync(lambda: client, delay=0.3, max_pending=2)
+    logs = {f"ctx{c}": Log() for c in range(4)}
+    for context_id, log in logs.items():
+        log.log(type="agent", content="one")
+        sync.submit(context_id, context_id, log)
+    assert sync.stats()["dropped"] == 2
+    time.sleep(0.8)
+    assert sorted(row["property_id"] for row in server.rows) == ["ctx2", "ctx3"]
+
+    for context_id, log in logs.items():
+        sync.submit(context_id, context_id, log)
+    sync.flush()
+    for context_id in logs:
+        assert contents(server, context_id) == ["one"]
+
+
+def test_prefetch_in_one_request(server, client):
+    writer = SupabaseSync(lambda: client, delay=0.1)
+    logs = {f"ctx{c}": Log() for c in range(6)}
+    for context_id, log in logs.items():
+        log.log(type="agent", content="saved")
+        writer.submit(context_id, context_id, log)
+    writer.flush()
+
+    server.requests.clear()
+    sync = SupabaseSync(lambda: client, delay=0.1)
+    sync.prefetch({context_id: (context_id, log.guid, len(log.updates)) for context_id, log in logs.items()})
+    time.sleep(0.4)
+    assert server.requests == ["GET"]
+
+    server.requests.clear()
+    for context_id, log in logs.items():
+        sync.attach(context_id, log)  # as persist_chat.load_chat does once a chat is opened
+        sync.submit(context_id, context_id, log)
+    time.sleep(0.4)
+    assert server.requests == []  # unchanged chats are not uploaded again
+
+    logs["ctx2"].log(type="agent", content="new")
+    sync.submit("ctx2", "ctx2", logs["ctx2"])
+    sync.flush()
+    assert server.requests == ["PATCH"]
+    assert contents(server, "ctx2") == ["saved", "new"]
+
+
+def test_chat_loaded_again_uploads_new_items(server, client):
+    sync = SupabaseSync(lambda: client, delay=0.1)
+    log = Log()
+    log.log(type="agent", content="before")
+    sync.submit("ctx", "ctx", log)
+    sync.flush()
+
+    # the same log read back from disk, as persist_chat.load_chat does after an unload
+    loaded = Log()
+    loaded.guid = log.guid
+    for no, item in enumerate(log.logs):
+        loaded.logs.append(LogItem(log=loaded, no=no, type=item.type, heading=item.heading, content=item.content, temp=False))
+        loaded.updates.append(no)
+    sync.attach("ctx", loaded)
+
+    server.requests.clear()
+    loaded.log(type="agent", content="after")
+    sync.submit("ctx", "ctx", loaded)
+    sync.flush()
+    assert server.requests == ["PATCH"]
+    assert contents(server, "ctx") == ["before", "after"]